@@ -6,27 +6,37 @@ Uses Flask Blueprints for a modular architecture:
   - `api`  → /api/*   (REST JSON endpoints)
   - `web`  → /*        (HTML pages)
 
-Connection pooling is configured to handle Render's free-tier SSL drops.
+Engine and pool options come from a configurable profile (see app/pool.py);
+the default one handles Render's free-tier SSL drops. Request, SQL and pool
+metrics are served at /metrics (see app/metrics.py), pool statistics at
+/api/pool. /api/* and POST /refresh are rate limited per client (see
+app/admission.py). With SCHEDULER_ENABLED the ingestion scheduler runs in-process.
 """
 from datetime import date
 from flask import Flask
 from app.config import Config
 from app.models import db
+from app.pool import engine_options, init_pool
+from app.admission import init_admission
 
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    # Connection pooling — prevents stale connections on Render's free tier
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,   # Tests connection before every query
-        'pool_recycle': 300,     # Refreshes connection every 5 minutes
-    }
+    # Connection pooling — sizing, pre-ping strategy and statement timeout
+    # from the DB_ENGINE_PROFILE profile
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 
     # Initialize database ORM
     db.init_app(app)
 
+    # Pool statistics, idle pre-pings and the cached health prober
+    init_pool(app)
+
+    # Per-client rate limits + concurrency gate for /api/* and /refresh
+    init_admission(app)
+
     # Register Blueprints
     from app.api.routes import api_bp
     from app.web.routes import web_bp
@@ -34,6 +44,19 @@ def create_app(config_class=Config):
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(web_bp)
 
+    # Prometheus metrics: request/SQL/pool instrumentation + /metrics
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    # Debug SQL profiler (SQL_PROFILING=1): Server-Timing + N+1/slow logs
+    from app.profiling import init_profiling
+    init_profiling(app)
+
+    # Per-source ingestion scheduler (SCHEDULER_ENABLED=1, see ingestion/scheduler.py)
+    if app.config['SCHEDULER_ENABLED']:
+        from ingestion.scheduler import start_scheduler
+        start_scheduler(app)
+
     # ── Jinja2 context processors ──────────────────────────────
     @app.context_processor
     def inject_globals():
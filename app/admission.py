@@ -0,0 +1,258 @@
+# app/admission.py
+"""
+Admission control: per-client rate limits and a concurrency gate.
+
+Every /api/* request and every POST /refresh takes tokens from a token
+bucket keyed by policy and client. A client is its IP (the PROXY_HOPS-th
+address from the right of X-Forwarded-For, since the app runs behind
+Render's proxy) or, for keys listed in RATE_LIMIT_API_KEYS, its X-API-Key.
+Unknown keys are ignored, so sending random keys can't mint fresh buckets.
+Requests asking for more rows (`?limit=`) cost more tokens. A client out of
+tokens gets 429 with Retry-After and never reaches the database.
+
+Buckets live in process memory (per worker), or with
+RATE_LIMIT_BACKEND=database in the `rate_limit_buckets` table, shared by
+all workers; there each take is one conditional UPDATE, so concurrent
+workers can't both spend the same token.
+
+Expensive endpoints (stats, trends, search, archive, and the HTML listing
+and stats pages with their `?q=` search) are also wrapped in `@gated`, a
+per-process semaphore: once ADMISSION_MAX_CONCURRENT are in flight,
+further requests wait up to ADMISSION_QUEUE_TIMEOUT for a slot and are
+then refused with 429, instead of queueing on the DB pool and
+dragging every other request's latency up with them.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.models import db, RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+RATE_UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+ROWS_PER_TOKEN = 50          # ?limit=200 costs 4 tokens
+MEMORY_MAX_BUCKETS = 10000   # least recently used buckets are evicted beyond this
+PRUNE_EVERY = 1000           # database backend: drop idle buckets every N takes
+GATE_RETRY_AFTER = 1         # seconds suggested to clients refused by the gate
+
+
+def parse_rate(value: str) -> float:
+    """'120/minute' → tokens per second; ValueError when malformed."""
+    count, _, unit = str(value).partition('/')
+    try:
+        rate = float(count) / RATE_UNITS[unit.strip() or 'second']
+    except (KeyError, ValueError):
+        raise ValueError(f"bad rate '{value}' (expected N/second|minute|hour|day)") from None
+    if rate <= 0:
+        raise ValueError(f"bad rate '{value}' (must be positive)")
+    return rate
+
+
+class Policy:
+    """A token bucket shape: refills at `rate` tokens/s up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = float(burst)
+
+    def refill(self, tokens: float, elapsed: float) -> float:
+        return min(self.burst, tokens + max(elapsed, 0.0) * self.rate)
+
+    def wait_for(self, tokens: float, cost: float) -> float:
+        return (cost - tokens) / self.rate
+
+
+class MemoryBackend:
+    """Per-process buckets: fast, but each worker limits on its own."""
+
+    def __init__(self, max_buckets: int = MEMORY_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()   # key → (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, policy: Policy, cost: float, now: float) -> float:
+        """Spends `cost` tokens; returns 0 when admitted, else seconds until it would be."""
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (policy.burst, now))
+            tokens = policy.refill(tokens, now - updated_at)
+            wait = 0.0 if tokens >= cost else policy.wait_for(tokens, cost)
+            self._buckets[key] = (tokens - cost if not wait else tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class DatabaseBackend:
+    """Buckets in `rate_limit_buckets`, shared by every worker on the database."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._takes = 0
+
+    def take(self, key: str, policy: Policy, cost: float, now: float) -> float:
+        table = RateLimitBucket.__table__
+        least = func.least if self.engine.dialect.name == 'postgresql' else func.min
+        refilled = least(policy.burst, table.c.tokens + (now - table.c.updated_at) * policy.rate)
+        with self.engine.begin() as conn:
+            spent = conn.execute(
+                update(table)
+                .where(table.c.key == key, refilled >= cost)
+                .values(tokens=refilled - cost, updated_at=now)
+            ).rowcount
+            if spent:
+                self._maybe_prune(conn, now)
+                return 0.0
+            row = conn.execute(select(table.c.tokens, table.c.updated_at).where(table.c.key == key)).first()
+            if row is not None:
+                return policy.wait_for(policy.refill(row.tokens, now - row.updated_at), cost)
+        # First request from this client: start a full bucket, less this request
+        try:
+            with self.engine.begin() as conn:
+                created = conn.execute(
+                    self._insert(table).values(key=key, tokens=policy.burst - cost, updated_at=now)
+                ).rowcount
+        except IntegrityError:
+            created = 0
+        # 0: another worker created it first; spend from theirs
+        return 0.0 if created else self.take(key, policy, cost, now)
+
+    def _insert(self, table):
+        dialect = self.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            module = postgresql if dialect == 'postgresql' else sqlite
+            return module.insert(table).on_conflict_do_nothing(index_elements=['key'])
+        return insert(table)
+
+    def _maybe_prune(self, conn, now: float) -> None:
+        # A bucket idle for a day has refilled under any sane policy; a missing row is a full bucket
+        self._takes += 1
+        if self._takes % PRUNE_EVERY == 0:
+            table = RateLimitBucket.__table__
+            conn.execute(table.delete().where(table.c.updated_at < now - RATE_UNITS['day']))
+
+
+class ConcurrencyGate:
+    """Caps in-flight expensive requests in this process."""
+
+    def __init__(self, limit: int, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def acquire(self) -> bool:
+        return self._slots.acquire(timeout=self.timeout)
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+class Admission:
+    """The app's policies, bucket backend and gate (app.extensions['admission'])."""
+
+    def __init__(self, app):
+        config = app.config
+        self.enabled = config['ADMISSION_ENABLED']
+        self.policies = {
+            'api': Policy(parse_rate(config['RATE_LIMIT_API']), config['RATE_LIMIT_API_BURST']),
+            'refresh': Policy(parse_rate(config['RATE_LIMIT_REFRESH']), config['RATE_LIMIT_REFRESH_BURST']),
+        }
+        self.api_keys = {key.strip() for key in config['RATE_LIMIT_API_KEYS'].split(',') if key.strip()}
+        self.proxy_hops = config['PROXY_HOPS']
+        backend = config['RATE_LIMIT_BACKEND']
+        if backend not in ('memory', 'database'):
+            raise ValueError(f"RATE_LIMIT_BACKEND must be 'memory' or 'database', not '{backend}'")
+        self._backend = MemoryBackend() if backend == 'memory' else None
+        self.gate = ConcurrencyGate(config['ADMISSION_MAX_CONCURRENT'], config['ADMISSION_QUEUE_TIMEOUT'])
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = DatabaseBackend(db.engine)   # needs the app context
+        return self._backend
+
+    def client(self) -> str:
+        api_key = request.headers.get('X-API-Key')
+        if api_key and api_key in self.api_keys:
+            return 'key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        forwarded = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+        if self.proxy_hops and len(forwarded) >= self.proxy_hops:
+            return 'ip:' + forwarded[-self.proxy_hops]
+        return 'ip:' + (request.remote_addr or 'unknown')
+
+    def take(self, policy_name: str, cost: float = 1.0) -> float:
+        """Seconds the current client must wait before this request is admitted (0 = admitted)."""
+        policy = self.policies[policy_name]
+        cost = min(cost, policy.burst)   # never unadmittable
+        return self.backend.take(f'{policy_name}:{self.client()}', policy, cost, time.time())
+
+
+def request_cost() -> int:
+    """Tokens for the current request: one per ROWS_PER_TOKEN rows asked for."""
+    limit = request.args.get('limit', type=int) or 0
+    return max(1, math.ceil(limit / ROWS_PER_TOKEN))
+
+
+def retry_after_seconds(retry_after: float) -> int:
+    """Whole seconds for a Retry-After header (at least 1)."""
+    return max(1, math.ceil(retry_after))
+
+
+def too_many_requests(retry_after: float, reason: str):
+    seconds = retry_after_seconds(retry_after)
+    response = jsonify({'error': 'Too many requests', 'reason': reason, 'retry_after': seconds})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def admit(policy_name: str, cost: float = 1.0, on_limit=None):
+    """
+    None when the current request may proceed, else the 429 response to
+    send: `on_limit(wait)` when given (e.g. an HTML page), or JSON.
+    """
+    admission = current_app.extensions.get('admission')
+    if admission is None or not admission.enabled:
+        return None
+    wait = admission.take(policy_name, cost)
+    if wait > 0:
+        logger.debug(f"Rate limited {admission.client()} on '{policy_name}' for {wait:.1f}s")
+        return on_limit(wait) if on_limit else too_many_requests(wait, 'rate limit')
+    return None
+
+
+def rate_limited(policy_name: str, on_limit=None):
+    """Apply `policy_name`'s token bucket to this view (`on_limit`: see `admit`)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return admit(policy_name, on_limit=on_limit) or view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def gated(view):
+    """Run this (expensive) view only while the process has a free concurrency slot."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admission = current_app.extensions.get('admission')
+        if admission is None or not admission.enabled:
+            return view(*args, **kwargs)
+        if not admission.gate.acquire():
+            return too_many_requests(GATE_RETRY_AFTER, 'busy')
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission.gate.release()
+    return wrapper
+
+
+def init_admission(app) -> None:
+    app.extensions['admission'] = Admission(app)
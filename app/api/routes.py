@@ -1,55 +1,269 @@
 # app/api/routes.py
 from datetime import datetime
-from flask import Blueprint, jsonify, request
-from app.models import db, Job
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import func, or_, tuple_
+from app.models import db, Job, JobSkill, SavedSearch, AlertOutbox
+from ingestion.skills import get_matcher, skill_label
+from ingestion import archive
+from ingestion.locations import resolve_location, location_label
+from ingestion.rollups import trend_series, CATEGORY_KEYWORDS, TREND_WINDOWS
+from ingestion.similarity import similar_job_ids
+from ingestion.alerts import query_terms, MAX_SEARCH_TERMS
+from app.snapshot import snapshot_reads, precomputed, title_contains
+from app.pool import pool_report
+from app.admission import admit, gated, request_cost
 
 api_bp = Blueprint('api', __name__)
 
+# Max ids + (source, source_job_id) keys per /jobs/status request
+JOB_STATUS_MAX_ITEMS = 500
+
+# Monitoring endpoints exempt from the per-client rate limit
+RATE_LIMIT_EXEMPT = {'api.health_check', 'api.pool_status'}
+
+
+@api_bp.before_request
+def admit_client():
+    """Per-client token bucket for every API route (see app/admission.py)."""
+    if request.endpoint in RATE_LIMIT_EXEMPT:
+        return None
+    return admit('api', cost=request_cost())
+
 
 @api_bp.route('/jobs', methods=['GET'])
+@gated
+@snapshot_reads
 def get_jobs():
     """
     GET /api/jobs
     Query Params:
       - type     : Filter by keyword in title (e.g. ?type=intern)
-      - location : Filter by location (e.g. ?location=durban)
+      - location : Filter by location, resolved through the gazetteer to a
+                   canonical city/province/country (e.g. ?location=joburg)
+      - city / province / country : Exact canonical filters
+                   (e.g. ?city=Cape Town, ?province=Gauteng, ?country=ZA)
+      - remote   : 1 for remote jobs only, 0 to exclude them
       - source   : Filter by data source (e.g. ?source=adzuna_sa)
+      - skill    : Filter by tagged skill or alias (e.g. ?skill=sql, ?skill=powerbi)
+      - min_salary : Annual salary (ZAR) the range must reach (e.g. ?min_salary=300000)
+      - max_salary : Annual salary (ZAR) the range must start at or below
+      - sort     : `date` (default), `salary_desc` or `salary_asc`
       - limit    : Max results to return (default 50, max 200)
+      - include  : `description` to also return descriptions (loaded on demand)
+      - include_duplicates : 1 to also return near-duplicates linked to
+                             another listing (default 0)
     """
     job_type = request.args.get('type')
     location = request.args.get('location')
+    city = request.args.get('city')
+    province = request.args.get('province')
+    country = request.args.get('country')
+    remote = request.args.get('remote', type=int)
     source = request.args.get('source')
+    skill = request.args.get('skill')
+    min_salary = request.args.get('min_salary', type=float)
+    max_salary = request.args.get('max_salary', type=float)
+    sort = request.args.get('sort', 'date')
     limit = min(request.args.get('limit', 50, type=int), 200)
+    include_duplicates = request.args.get('include_duplicates', 0, type=int)
+    with_description = 'description' in request.args.get('include', '').split(',')
 
     query = Job.query.filter_by(is_active=True)
 
+    if with_description:
+        query = query.options(db.undefer(Job.description))
+
+    if not include_duplicates:
+        query = query.filter(Job.canonical_job_id.is_(None))
+
     if job_type:
-        query = query.filter(Job.title.ilike(f'%{job_type}%'))
+        query = query.filter(title_contains(job_type))
 
     if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
+        resolved = resolve_location(location)
+        if resolved.city:
+            query = query.filter(Job.location_city == resolved.city)
+        elif resolved.province:
+            query = query.filter(Job.location_province == resolved.province)
+        elif resolved.country:
+            query = query.filter(Job.location_country == resolved.country)
+        elif not resolved.is_remote:
+            # Not in the gazetteer — fall back to a text match
+            query = query.filter(Job.location.ilike(f'%{location}%'))
+        if resolved.is_remote:
+            query = query.filter(Job.is_remote == True)
+
+    if city:
+        query = query.filter(Job.location_city == city)
+
+    if province:
+        query = query.filter(Job.location_province == province)
+
+    if country:
+        query = query.filter(Job.location_country == country.upper())
+
+    if remote is not None:
+        query = query.filter(Job.is_remote == bool(remote))
 
     if source:
         query = query.filter(Job.source == source)
 
+    if skill:
+        canonical = get_matcher().canonical(skill) or skill.strip().lower()
+        query = query.join(JobSkill, JobSkill.job_id == Job.id).filter(JobSkill.skill == canonical)
+
+    # Range overlap on the indexed annual columns
+    if min_salary is not None:
+        query = query.filter(Job.salary_annual_max >= min_salary)
+
+    if max_salary is not None:
+        query = query.filter(Job.salary_annual_min <= max_salary)
+
+    if sort == 'salary_desc':
+        query = query.order_by(Job.salary_annual_max.is_(None), Job.salary_annual_max.desc())
+    elif sort == 'salary_asc':
+        query = query.order_by(Job.salary_annual_min.is_(None), Job.salary_annual_min.asc())
+    elif sort != 'date':
+        return jsonify({'error': 'sort must be one of date, salary_desc, salary_asc'}), 400
+
     jobs = query.order_by(Job.posted_date.desc()).limit(limit).all()
 
     return jsonify({
         'count': len(jobs),
-        'jobs': [job.to_dict() for job in jobs],
+        'jobs': [job.to_dict(include_description=with_description) for job in jobs],
+    })
+
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    GET /api/jobs/<id>
+    Full detail for one job, including its description and skill tags.
+    """
+    job = Job.query.options(db.undefer(Job.description)).filter_by(id=job_id).first()
+    if job is None:
+        return jsonify({'error': 'job not found'}), 404
+
+    data = job.to_dict(include_description=True)
+    data['skills'] = [
+        row.skill for row in
+        db.session.query(JobSkill.skill).filter(JobSkill.job_id == job.id).order_by(JobSkill.skill).all()
+    ]
+    data['is_active'] = job.is_active
+    return jsonify(data)
+
+
+@api_bp.route('/jobs/<job_id>/similar', methods=['GET'])
+def get_similar_jobs(job_id):
+    """
+    GET /api/jobs/<id>/similar
+    Top-k similar active jobs by cosine similarity over the precomputed
+    TF-IDF index; no table scan, just a primary-key fetch of the k hits.
+    Query params:
+      - limit : Max results to return (default 10, max 50)
+    """
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    hits = similar_job_ids(job_id, k=limit)
+    if hits is None:
+        return jsonify({'error': 'job not found'}), 404
+
+    jobs_by_id = {}
+    if hits:
+        jobs_by_id = {
+            job.id: job for job in
+            Job.query.filter(Job.id.in_([hit_id for hit_id, _ in hits])).filter(Job.is_active == True).all()
+        }
+    similar = []
+    for hit_id, score in hits:
+        job = jobs_by_id.get(hit_id)
+        if job is not None:
+            similar.append({**job.to_dict(), 'score': round(score, 4)})
+    return jsonify({'id': job_id, 'count': len(similar), 'similar': similar})
+
+
+@api_bp.route('/jobs/status', methods=['POST'])
+def get_jobs_status():
+    """
+    POST /api/jobs/status
+    Current status of many jobs in one indexed query (used by the tracker).
+    JSON body (either or both, up to JOB_STATUS_MAX_ITEMS items in total):
+      - ids  : job ids, e.g. ["3f2c…", "9a1b…"]
+      - keys : [source, source_job_id] pairs, e.g. [["careers24", "2154321"]]
+    Jobs removed by retention come back under `missing`.
+    """
+    body = request.get_json(silent=True) or {}
+    ids = body.get('ids') or []
+    keys = body.get('keys') or []
+    if not isinstance(ids, list) or not isinstance(keys, list):
+        return jsonify({'error': 'ids and keys must be lists'}), 400
+    if len(ids) + len(keys) > JOB_STATUS_MAX_ITEMS:
+        return jsonify({'error': f'at most {JOB_STATUS_MAX_ITEMS} ids + keys per request'}), 400
+
+    if not all(isinstance(key, list) and len(key) == 2 for key in keys):
+        return jsonify({'error': 'keys must be [source, source_job_id] pairs'}), 400
+    ids = [str(job_id) for job_id in ids]
+    keys = [(str(source), str(source_job_id)) for source, source_job_id in keys]
+
+    conditions = []
+    if ids:
+        conditions.append(Job.id.in_(ids))
+    if keys:
+        conditions.append(tuple_(Job.source, Job.source_job_id).in_(keys))
+    rows = []
+    if conditions:
+        rows = (
+            db.session.query(
+                Job.id, Job.source, Job.source_job_id, Job.title, Job.company, Job.url,
+                Job.is_active, Job.posted_date, Job.last_seen_at, Job.canonical_job_id,
+            )
+            .filter(or_(*conditions))
+            .all()
+        )
+
+    jobs = [
+        {
+            'id': row.id,
+            'source': row.source,
+            'source_job_id': row.source_job_id,
+            'title': row.title,
+            'company': row.company,
+            'url': row.url,
+            'is_active': bool(row.is_active),
+            'posted_date': row.posted_date.isoformat() if row.posted_date else None,
+            'last_seen_at': row.last_seen_at.isoformat() if row.last_seen_at else None,
+            'canonical_job_id': row.canonical_job_id,
+        }
+        for row in rows
+    ]
+    found_ids = {job['id'] for job in jobs}
+    found_keys = {(job['source'], job['source_job_id']) for job in jobs}
+
+    return jsonify({
+        'count': len(jobs),
+        'jobs': jobs,
+        'missing': {
+            'ids': [job_id for job_id in ids if job_id not in found_ids],
+            'keys': [list(key) for key in keys if key not in found_keys],
+        },
     })
 
 
 @api_bp.route('/stats', methods=['GET'])
+@gated
+@snapshot_reads
 def get_stats():
     """
     GET /api/stats
-    Returns aggregate counts about the current dataset.
+    Returns aggregate counts about the current dataset (as of the last
+    published snapshot when serving from one).
     """
-    from sqlalchemy import func
+    totals = precomputed('totals')
+    if totals is not None:
+        return jsonify({**totals, 'generated_at': datetime.utcnow().isoformat()})
 
     total_jobs = Job.query.count()
-    active_jobs = Job.query.filter_by(is_active=True).count()
+    active_jobs = Job.query.filter_by(is_active=True).filter(Job.canonical_job_id.is_(None)).count()
+    linked_duplicates = Job.query.filter(Job.canonical_job_id.isnot(None)).count()
 
     source_breakdown = dict(
         db.session.query(Job.source, func.count(Job.id))
@@ -60,28 +274,281 @@ def get_stats():
     return jsonify({
         'total_jobs_scraped': total_jobs,
         'active_jobs_now': active_jobs,
+        'linked_duplicates': linked_duplicates,
         'by_source': source_breakdown,
         'generated_at': datetime.utcnow().isoformat(),
     })
 
 
+@api_bp.route('/skills', methods=['GET'])
+@gated
+@snapshot_reads
+def get_skills():
+    """
+    GET /api/skills
+    Skill demand across active listings, from the indexed skill tags.
+    Query Params:
+      - with  : Return skills co-occurring with this skill (e.g. ?with=python)
+      - limit : Max skills to return (default 20, max 100)
+    """
+    with_skill = request.args.get('with')
+    limit = min(request.args.get('limit', 20, type=int), 100)
+
+    if with_skill:
+        anchor = get_matcher().canonical(with_skill) or with_skill.strip().lower()
+        other = db.aliased(JobSkill)
+        query = (
+            db.session.query(other.skill, func.count(other.job_id))
+            .select_from(JobSkill)
+            .join(other, (other.job_id == JobSkill.job_id) & (other.skill != JobSkill.skill))
+            .join(Job, Job.id == JobSkill.job_id)
+            .filter(JobSkill.skill == anchor)
+        )
+        group_col, count_col = other.skill, func.count(other.job_id)
+    else:
+        anchor = None
+        query = (
+            db.session.query(JobSkill.skill, func.count(JobSkill.job_id))
+            .join(Job, Job.id == JobSkill.job_id)
+        )
+        group_col, count_col = JobSkill.skill, func.count(JobSkill.job_id)
+
+    rows = (
+        query
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .group_by(group_col)
+        .order_by(count_col.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return jsonify({
+        'with': anchor,
+        'skills': [
+            {'skill': skill, 'label': skill_label(skill), 'count': count}
+            for skill, count in rows
+        ],
+    })
+
+
+@api_bp.route('/locations', methods=['GET'])
+@gated
+@snapshot_reads
+def get_locations():
+    """
+    GET /api/locations
+    Active job counts per canonical location.
+    Query Params:
+      - by    : city (default), province or country
+      - limit : Max locations to return (default 20, max 100)
+    """
+    columns = {
+        'city': Job.location_city,
+        'province': Job.location_province,
+        'country': Job.location_country,
+    }
+    by = request.args.get('by', 'city')
+    if by not in columns:
+        return jsonify({'error': 'by must be one of city, province, country'}), 400
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    column = columns[by]
+
+    rows = (
+        db.session.query(column, func.count(Job.id))
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .filter(column.isnot(None))
+        .group_by(column)
+        .order_by(func.count(Job.id).desc())
+        .limit(limit)
+        .all()
+    )
+    remote_count = (
+        Job.query.filter_by(is_active=True, is_remote=True)
+        .filter(Job.canonical_job_id.is_(None))
+        .count()
+    )
+
+    return jsonify({
+        'by': by,
+        'remote': remote_count,
+        'locations': [
+            {
+                by: key,
+                'label': location_label(None, None, key, False) if by == 'country' else key,
+                'count': count,
+            }
+            for key, count in rows
+        ],
+    })
+
+
+@api_bp.route('/trends', methods=['GET'])
+@gated
+@snapshot_reads
+def get_trends():
+    """
+    GET /api/trends
+    Daily new / active / deactivated counts from the rollup table.
+    Query Params:
+      - window   : Days to return — 14 (default), 90 or 365
+      - source   : Only this data source (e.g. ?source=careers24)
+      - skill    : Only jobs tagged with this skill or alias (e.g. ?skill=sql)
+      - category : Only this sidebar category (e.g. ?category=graduate)
+    """
+    window = request.args.get('window', TREND_WINDOWS[0], type=int)
+    if window not in TREND_WINDOWS:
+        return jsonify({'error': f'window must be one of {list(TREND_WINDOWS)}'}), 400
+
+    dimension, key = 'all', ''
+    skill = request.args.get('skill')
+    category = request.args.get('category')
+    if skill:
+        dimension, key = 'skill', get_matcher().canonical(skill) or skill.strip().lower()
+    elif category:
+        if category not in CATEGORY_KEYWORDS:
+            return jsonify({'error': f'unknown category: {category}'}), 400
+        dimension, key = 'category', category
+
+    return jsonify({
+        'window': window,
+        'dimension': dimension,
+        'key': key or None,
+        'source': request.args.get('source'),
+        'days': trend_series(window, dimension, key, source=request.args.get('source')),
+    })
+
+
+@api_bp.route('/archive/monthly', methods=['GET'])
+@gated
+def get_archive_monthly():
+    """
+    GET /api/archive/monthly
+    Monthly counts of retired (archived) jobs, read from the archive files —
+    no database queries.
+    Query Params:
+      - by   : source (default), skill or job_type
+      - from : First month, inclusive (e.g. ?from=2025-01)
+      - to   : Last month, inclusive (e.g. ?to=2025-12)
+    """
+    by = request.args.get('by', 'source')
+    if by not in ('source', 'skill', 'job_type'):
+        return jsonify({'error': 'by must be one of source, skill, job_type'}), 400
+
+    counts = archive.monthly_counts(
+        by=by, start=request.args.get('from'), end=request.args.get('to'),
+    )
+    return jsonify({
+        'by': by,
+        'months': [{'month': month, 'counts': values} for month, values in counts.items()],
+    })
+
+
+@api_bp.route('/searches', methods=['POST'])
+def create_saved_search():
+    """
+    POST /api/searches
+    Saves a search; jobs first seen after it was saved that match every
+    term (title or location) are queued as alerts by the pipeline.
+    JSON body:
+      - query  : e.g. "junior python durban" (1 to MAX_SEARCH_TERMS terms)
+      - notify : Optional delivery address
+    """
+    payload = request.get_json(silent=True) or {}
+    query = payload.get('query')
+    notify = payload.get('notify')
+    if not isinstance(query, str) or len(query) > 200:
+        return jsonify({'error': 'query must be a string of at most 200 characters'}), 400
+    if not 1 <= len(query_terms(query)) <= MAX_SEARCH_TERMS:
+        return jsonify({'error': f'query must have between 1 and {MAX_SEARCH_TERMS} terms'}), 400
+    if notify is not None and (not isinstance(notify, str) or len(notify) > 200):
+        return jsonify({'error': 'notify must be a string of at most 200 characters'}), 400
+
+    search = SavedSearch(query=query.strip(), notify=notify)
+    db.session.add(search)
+    db.session.commit()
+    return jsonify(search.to_dict()), 201
+
+
+@api_bp.route('/searches/<search_id>', methods=['GET'])
+def get_saved_search(search_id):
+    """
+    GET /api/searches/<id>
+    A saved search with its most recent alerts.
+    Query Params:
+      - limit : Max alerts to return (default 20, max 100)
+    """
+    search = db.session.get(SavedSearch, search_id)
+    if search is None:
+        return jsonify({'error': 'saved search not found'}), 404
+
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    rows = (
+        db.session.query(AlertOutbox.created_at, AlertOutbox.delivered_at, Job)
+        .join(Job, Job.id == AlertOutbox.job_id)
+        .filter(AlertOutbox.search_id == search.id)
+        .order_by(AlertOutbox.id.desc())
+        .limit(limit)
+        .all()
+    )
+    data = search.to_dict()
+    data['alerts'] = [
+        {
+            **job.to_dict(),
+            'matched_at': created_at.isoformat() if created_at else None,
+            'delivered_at': delivered_at.isoformat() if delivered_at else None,
+        }
+        for created_at, delivered_at, job in rows
+    ]
+    return jsonify(data)
+
+
+@api_bp.route('/searches/<search_id>', methods=['DELETE'])
+def delete_saved_search(search_id):
+    """
+    DELETE /api/searches/<id>
+    Removes a saved search and its queued alerts.
+    """
+    search = db.session.get(SavedSearch, search_id)
+    if search is None:
+        return jsonify({'error': 'saved search not found'}), 404
+    AlertOutbox.query.filter(AlertOutbox.search_id == search.id).delete(synchronize_session=False)
+    db.session.delete(search)
+    db.session.commit()
+    return jsonify({'deleted': search_id})
+
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """
     GET /api/health
     Standard health-check endpoint. Returns 200 if the app and database
     are reachable, or 503 if the database connection fails.
+    The database state comes from the health prober's cached result (at
+    most HEALTH_MAX_STALENESS seconds old), so load-balancer probes don't
+    query the database.
     """
-    try:
-        # A lightweight DB probe — just fetch one row's ID
-        db.session.execute(db.select(Job.id).limit(1))
-        db_ok = True
-    except Exception:
-        db_ok = False
+    health = current_app.extensions['health_prober'].status()
+    db_ok = health['ok']
 
     status_code = 200 if db_ok else 503
     return jsonify({
         'status': 'ok' if db_ok else 'degraded',
         'db_connected': db_ok,
+        'db_checked_at': health['checked_at'],
+        'db_check_age_s': health['age_s'],
+        'db_check': health['method'],
         'timestamp': datetime.utcnow().isoformat(),
-    }), status_code
\ No newline at end of file
+    }), status_code
+
+
+@api_bp.route('/pool', methods=['GET'])
+def pool_status():
+    """
+    GET /api/pool
+    Engine profile, connection-pool occupancy and counters (checkouts, new
+    connections, invalidations, failed idle pings, peak checked out,
+    checkout wait percentiles) for the worker process that answers.
+    """
+    return jsonify(pool_report(db.engine, current_app.extensions['db_profile']))
\ No newline at end of file
@@ -16,4 +16,48 @@ class Config:
         uri = uri.replace("postgres://", "postgresql://", 1)
         
     SQLALCHEMY_DATABASE_URI = uri
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQL PROFILING (debug): Server-Timing headers, N+1 and slow-query logs
+    SQL_PROFILING = os.environ.get('SQL_PROFILING', '0') in ('1', 'true', 'True')
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG')   # JSON-lines file; logger only when unset
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 3))
+
+    # READ SNAPSHOT: serve listings/stats from the pipeline's published SQLite
+    # snapshot (ingestion/snapshot.py); 0 keeps every read on the primary DB
+    READ_SNAPSHOT = os.environ.get('READ_SNAPSHOT', '1') in ('1', 'true', 'True')
+
+    # ENGINE PROFILE: pool sizing, pre-ping strategy and statement timeout
+    # (default / free-tier / dedicated, see app/pool.py); DB_* values override it
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE', 'default')
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')
+    DB_PRE_PING = os.environ.get('DB_PRE_PING')                 # always / idle / never
+    DB_PRE_PING_IDLE_S = os.environ.get('DB_PRE_PING_IDLE_S')
+    DB_STATEMENT_TIMEOUT_MS = os.environ.get('DB_STATEMENT_TIMEOUT_MS')
+
+    # HEALTH: /api/health answers from a cached probe at most this old;
+    # a background prober refreshes it (0 = probe inline only)
+    HEALTH_PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', 10))
+    HEALTH_MAX_STALENESS = float(os.environ.get('HEALTH_MAX_STALENESS', 30))
+
+    # SCHEDULER: run per-source ingestion on a background thread of the web
+    # process (ingestion/scheduler.py); one worker per host holds the lock
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '0') in ('1', 'true', 'True')
+
+    # ADMISSION CONTROL (app/admission.py): per-client token buckets on /api/*
+    # and POST /refresh ('N/second|minute|hour|day' + burst), and a per-process
+    # gate on expensive endpoints. The database backend shares buckets across workers.
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', '1') in ('1', 'true', 'True')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')   # memory / database
+    RATE_LIMIT_API = os.environ.get('RATE_LIMIT_API', '120/minute')
+    RATE_LIMIT_API_BURST = int(os.environ.get('RATE_LIMIT_API_BURST', 40))
+    RATE_LIMIT_REFRESH = os.environ.get('RATE_LIMIT_REFRESH', '4/hour')
+    RATE_LIMIT_REFRESH_BURST = int(os.environ.get('RATE_LIMIT_REFRESH_BURST', 2))
+    RATE_LIMIT_API_KEYS = os.environ.get('RATE_LIMIT_API_KEYS', '')   # comma-separated; own bucket each
+    PROXY_HOPS = int(os.environ.get('PROXY_HOPS', 1))                 # trusted proxies in X-Forwarded-For
+    ADMISSION_MAX_CONCURRENT = int(os.environ.get('ADMISSION_MAX_CONCURRENT', 4))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2.0))
@@ -0,0 +1,214 @@
+# app/metrics.py
+"""
+Prometheus metrics for the web app and the pipeline.
+
+`init_metrics(app)` (called from `create_app`) records, per endpoint:
+request latency histograms, status codes, and the number of SQL statements
+and total SQL time each request spent (SQLAlchemy cursor events). Pool
+checkouts, checkout waits and checked-out connections come from pool
+events, and `track_pipeline_run` publishes gauges for the last ETL run.
+Everything is served in Prometheus text format at `/metrics`.
+
+Under gunicorn each worker is a separate process, so per-process registries
+would report whichever worker answered the scrape. When
+`PROMETHEUS_MULTIPROC_DIR` is set (gunicorn.conf.py sets it), every process
+writes its samples to mmap files in that directory and `/metrics` merges
+them; gunicorn's `child_exit` hook marks dead workers so their live gauges
+drop out. A pipeline run from the CLI with the same directory shows up too.
+
+prometheus_client is optional: without it the hooks are no-ops and
+`/metrics` answers 503.
+"""
+import functools
+import os
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from app.pool import on_checkout_wait, time_checkouts
+
+try:
+    import prometheus_client
+    from prometheus_client import (
+        CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') not in ('0', 'false', 'False')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'jobtracker_http_request_duration_seconds', 'Request latency by endpoint.',
+        ['endpoint', 'method'], buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS = Counter(
+        'jobtracker_http_requests_total', 'Requests by endpoint and status code.',
+        ['endpoint', 'method', 'status'],
+    )
+    REQUEST_QUERIES = Histogram(
+        'jobtracker_db_queries_per_request', 'SQL statements executed per request.',
+        ['endpoint'], buckets=QUERY_COUNT_BUCKETS,
+    )
+    REQUEST_SQL_TIME = Histogram(
+        'jobtracker_db_time_per_request_seconds', 'Total SQL execution time per request.',
+        ['endpoint'], buckets=LATENCY_BUCKETS,
+    )
+    POOL_CHECKOUTS = Counter('jobtracker_db_pool_checkouts_total', 'Connections checked out of the pool.')
+    POOL_CONNECTS = Counter('jobtracker_db_pool_connects_total', 'New DBAPI connections opened by the pool.')
+    POOL_WAIT = Histogram(
+        'jobtracker_db_pool_checkout_wait_seconds', 'Time spent acquiring a pooled connection.',
+        buckets=POOL_WAIT_BUCKETS,
+    )
+    POOL_CHECKED_OUT = Gauge(
+        'jobtracker_db_pool_checked_out', 'Connections currently checked out.',
+        multiprocess_mode='livesum',
+    )
+    PIPELINE_LAST_RUN = Gauge(
+        'jobtracker_pipeline_last_run_timestamp_seconds', 'Unix time the last pipeline run finished.',
+        multiprocess_mode='max',
+    )
+    PIPELINE_DURATION = Gauge(
+        'jobtracker_pipeline_last_run_duration_seconds', 'Duration of the last pipeline run.',
+        multiprocess_mode='mostrecent',
+    )
+    PIPELINE_NEW_JOBS = Gauge(
+        'jobtracker_pipeline_last_run_new_jobs', 'New jobs loaded by the last pipeline run.',
+        multiprocess_mode='mostrecent',
+    )
+    PIPELINE_SUCCESS = Gauge(
+        'jobtracker_pipeline_last_run_success', '1 if the last pipeline run completed, else 0.',
+        multiprocess_mode='mostrecent',
+    )
+    PIPELINE_RUNNING = Gauge(
+        'jobtracker_pipeline_running', 'Pipeline runs currently in progress.',
+        multiprocess_mode='livesum',
+    )
+
+
+def _enabled() -> bool:
+    return prometheus_client is not None and METRICS_ENABLED
+
+
+# ── SQL statements per request ─────────────────────────────────────────────
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    # Pipeline threads and CLI runs have no request to attribute to
+    if has_request_context() and 'metrics_sql_count' in g:
+        g.metrics_sql_count += 1
+        g.metrics_sql_time += elapsed
+
+
+# ── Pool ───────────────────────────────────────────────────────────────────
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    POOL_CHECKOUTS.inc()
+    POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    POOL_CHECKED_OUT.dec()
+
+
+def _on_connect(dbapi_connection, connection_record):
+    POOL_CONNECTS.inc()
+
+
+def _instrument_engine(engine) -> None:
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    # Pool events registered on the engine follow it across pool re-creation
+    event.listen(engine, 'checkout', _on_checkout)
+    event.listen(engine, 'checkin', _on_checkin)
+    event.listen(engine, 'connect', _on_connect)
+    # Checkout waits (pool queueing + pre-ping/connect) are timed in app/pool.py
+    on_checkout_wait(POOL_WAIT.observe)
+    time_checkouts(engine)
+
+
+# ── Requests ───────────────────────────────────────────────────────────────
+
+def _endpoint_label() -> str:
+    # Endpoint names keep label cardinality bounded (URLs carry job ids)
+    return request.endpoint or 'unmatched'
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_sql_time = 0.0
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    endpoint = _endpoint_label()
+    REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+    REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+    REQUEST_QUERIES.labels(endpoint).observe(g.pop('metrics_sql_count', 0))
+    REQUEST_SQL_TIME.labels(endpoint).observe(g.pop('metrics_sql_time', 0.0))
+    return response
+
+
+def metrics_view():
+    if not _enabled():
+        return Response('metrics unavailable (prometheus_client not installed or disabled)\n',
+                        status=503, mimetype='text/plain')
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app) -> None:
+    """Registers request hooks, engine listeners and the `/metrics` route."""
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    if not _enabled():
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    from app.models import db
+    with app.app_context():
+        _instrument_engine(db.engine)
+
+
+# ── Pipeline ───────────────────────────────────────────────────────────────
+
+def track_pipeline_run(func):
+    """Decorator: publishes duration, new-job count and outcome of a pipeline run."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled():
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        PIPELINE_RUNNING.inc()
+        success = False
+        try:
+            result = func(*args, **kwargs)
+            success = True
+            if isinstance(result, int):
+                PIPELINE_NEW_JOBS.set(result)
+            return result
+        finally:
+            PIPELINE_RUNNING.dec()
+            PIPELINE_DURATION.set(time.perf_counter() - start)
+            PIPELINE_SUCCESS.set(1 if success else 0)
+            PIPELINE_LAST_RUN.set(time.time())
+    return wrapper
@@ -1,9 +1,58 @@
 # app/models.py
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from datetime import datetime
+import base64
+import os
 import uuid
+import zlib
+import sqlalchemy as sa
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """
+    Sends a request's ORM reads of snapshot tables to the snapshot pinned
+    for that request (`g.snapshot`, see app/snapshot.py). Flushes and every
+    other table go to the primary database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and mapper is not None and not self._flushing and has_request_context():
+            snapshot = g.get('snapshot')
+            if snapshot is not None and sa.inspect(mapper).local_table.name in snapshot.tables:
+                return snapshot.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Compress long descriptions at rest (existing plain-text rows stay readable)
+DESCRIPTION_COMPRESSION = os.environ.get('DESCRIPTION_COMPRESSION', '0') in ('1', 'true', 'True')
+COMPRESSION_MIN_CHARS = 256
+
+
+class CompressedText(db.TypeDecorator):
+    """
+    TEXT column that optionally stores values as `~z~<base64(zlib)>`.
+    Reads decompress transparently, so compressed and plain rows can mix
+    and compression can be switched on without a migration.
+    """
+    impl = db.Text
+    cache_ok = True
+
+    PREFIX = '~z~'
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not DESCRIPTION_COMPRESSION or len(value) < COMPRESSION_MIN_CHARS:
+            return value
+        packed = self.PREFIX + base64.b64encode(zlib.compress(value.encode('utf-8'), 9)).decode('ascii')
+        return packed if len(packed) < len(value) else value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.startswith(self.PREFIX):
+            return zlib.decompress(base64.b64decode(value[len(self.PREFIX):])).decode('utf-8')
+        return value
 
 class Job(db.Model):
     __tablename__ = 'jobs'
@@ -18,13 +67,24 @@ class Job(db.Model):
     title = db.Column(db.String, nullable=False)
     company = db.Column(db.String)
     location = db.Column(db.String)
+    # Canonical location resolved from `location` (see ingestion/locations.py)
+    location_city = db.Column(db.String(80), nullable=True, index=True)
+    location_province = db.Column(db.String(50), nullable=True, index=True)
+    location_country = db.Column(db.String(2), nullable=True, index=True)
+    is_remote = db.Column(db.Boolean, nullable=True, index=True)
     url = db.Column(db.Text, nullable=False)
-    description = db.Column(db.Text)
+    # Deferred: only loaded for detail views and indexing stages, never for listings
+    description = db.deferred(db.Column(CompressedText))
 
     # Salary Data (from Adzuna API)
     salary_min = db.Column(db.Float, nullable=True)
     salary_max = db.Column(db.Float, nullable=True)
 
+    # Normalized: annual amounts in the base currency (see ingestion/salary.py)
+    salary_currency = db.Column(db.String(3), nullable=True)
+    salary_annual_min = db.Column(db.Float, nullable=True, index=True)
+    salary_annual_max = db.Column(db.Float, nullable=True, index=True)
+
     # Filtering & Logic
     job_type = db.Column(db.String(50))
     posted_date = db.Column(db.Date, index=True)
@@ -34,22 +94,156 @@ class Job(db.Model):
     first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Near-duplicate linking: set to the canonical job's id when this row is
+    # the same posting seen through another source/feed (NULL = canonical)
+    canonical_job_id = db.Column(db.String, nullable=True, index=True)
+
+    # Checksum of the skill dictionary this row was last tagged with
+    skills_version = db.Column(db.Integer, nullable=True)
+
+    # Checksum of the gazetteer this row's location was last resolved with
+    location_version = db.Column(db.Integer, nullable=True)
+
+    # Last link liveness probe (NULL = never checked)
+    last_checked_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    # When retention or the liveness check retired the row (feeds daily rollups)
+    deactivated_at = db.Column(db.DateTime, nullable=True)
+
     # Unique Constraint
     __table_args__ = (
         db.UniqueConstraint('source', 'source_job_id', name='unique_job_source'),
     )
 
-    def to_dict(self):
-        return {
+    def to_dict(self, include_description=False):
+        data = {
             'id': self.id,
             'title': self.title,
             'company': self.company,
             'location': self.location,
+            'location_city': self.location_city,
+            'location_province': self.location_province,
+            'location_country': self.location_country,
+            'is_remote': self.is_remote,
             'url': self.url,
             'source': self.source,
             'posted_date': self.posted_date.isoformat() if self.posted_date else None,
             'salary_min': self.salary_min,
             'salary_max': self.salary_max,
-            'description': self.description,
+            'salary_currency': self.salary_currency,
+            'salary_annual_min': self.salary_annual_min,
+            'salary_annual_max': self.salary_annual_max,
             'first_seen_at': self.first_seen_at.isoformat() if self.first_seen_at else None,
-        }
\ No newline at end of file
+            'canonical_job_id': self.canonical_job_id,
+        }
+        if include_description:
+            data['description'] = self.description
+        return data
+
+
+class JobSignature(db.Model):
+    """MinHash signature of a job's normalized title+company, computed once per row."""
+    __tablename__ = 'job_signatures'
+
+    job_id = db.Column(db.String, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class JobSkill(db.Model):
+    """Normalized skill tag extracted from a job's title + description."""
+    __tablename__ = 'job_skills'
+
+    job_id = db.Column(db.String, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    skill = db.Column(db.String(50), primary_key=True, index=True)
+
+
+class DailyJobRollup(db.Model):
+    """
+    Per-day job counts by source and dimension, maintained incrementally by
+    the pipeline so trend charts never scan (or depend on retaining) jobs.
+    dimension is 'all' (key ''), 'category' or 'skill'.
+    """
+    __tablename__ = 'daily_job_rollups'
+
+    day = db.Column(db.Date, primary_key=True)
+    source = db.Column(db.String(50), primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.String(50), primary_key=True, default='')
+
+    new_jobs = db.Column(db.Integer, nullable=False, default=0)
+    active_jobs = db.Column(db.Integer, nullable=False, default=0)
+    deactivated_jobs = db.Column(db.Integer, nullable=False, default=0)
+
+
+class RollupWatermark(db.Model):
+    """High-water mark of job changes already folded into an incremental stage (rollups, alerts)."""
+    __tablename__ = 'rollup_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.DateTime, nullable=False)
+
+
+class SalaryPercentile(db.Model):
+    """
+    Annual salary percentiles (base currency) over active jobs, recomputed
+    each pipeline run. source/category are 'all' for the overall groups.
+    """
+    __tablename__ = 'salary_percentiles'
+
+    source = db.Column(db.String(50), primary_key=True)
+    category = db.Column(db.String(20), primary_key=True)
+    sample_size = db.Column(db.Integer, nullable=False)
+    p10 = db.Column(db.Float)
+    p25 = db.Column(db.Float)
+    p50 = db.Column(db.Float)
+    p75 = db.Column(db.Float)
+    p90 = db.Column(db.Float)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SavedSearch(db.Model):
+    """
+    A subscriber's saved query. A new job matches when every query term
+    appears in its title or location (see ingestion/alerts.py).
+    """
+    __tablename__ = 'saved_searches'
+
+    id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    query = db.Column(db.String(200), nullable=False)
+    # Delivery address; the local delivery stand-in only records it
+    notify = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'query': self.query,
+            'notify': self.notify,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class AlertOutbox(db.Model):
+    """A (saved search, new job) match waiting for (or done with) delivery."""
+    __tablename__ = 'alert_outbox'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    search_id = db.Column(db.String, db.ForeignKey('saved_searches.id', ondelete='CASCADE'),
+                          nullable=False, index=True)
+    job_id = db.Column(db.String, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('search_id', 'job_id', name='unique_alert_search_job'),
+    )
+
+
+class RateLimitBucket(db.Model):
+    """Token-bucket state shared by all web workers (RATE_LIMIT_BACKEND=database, see app/admission.py)."""
+    __tablename__ = 'rate_limit_buckets'
+
+    key = db.Column(db.String(120), primary_key=True)     # '<policy>:<client>'
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)      # epoch seconds of the last refill
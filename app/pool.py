@@ -0,0 +1,351 @@
+# app/pool.py
+"""
+Database engine profiles, connection-pool statistics and cached health.
+
+Engine options come from a named profile (DB_ENGINE_PROFILE):
+
+  pool_size / max_overflow / pool_timeout / pool_recycle   QueuePool sizing
+  pre_ping               'always' → a round trip on every checkout
+                         'idle'   → ping only connections idle for longer
+                                    than pre_ping_idle_s
+                         'never'  → rely on pool_recycle alone
+  statement_timeout_ms   Postgres `statement_timeout` per connection
+
+Individual DB_* settings override the profile's values. Pool sizing and
+statement timeouts only apply to server databases; SQLite keeps its
+dialect's pool.
+
+`POOL_STATS` counts checkouts, new connections, invalidations and failed
+idle pings, tracks the peak number of checked-out connections and keeps a
+window of checkout waits; `/api/pool` reports them next to the pool's
+current occupancy (per worker process).
+
+`HealthProber` answers `/api/health` from a cached result no older than
+HEALTH_MAX_STALENESS seconds. A statement that succeeded recently is proof
+enough that the database is up; only when the app has been quiet does the
+prober (every HEALTH_PROBE_INTERVAL seconds in a background thread, or
+inline when the cache is stale) issue a `SELECT 1`.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import event, exc
+from app.stats_utils import percentile
+
+logger = logging.getLogger(__name__)
+
+ENGINE_PROFILES = {
+    # The long-standing settings: survives Render's SSL drops with a ping per checkout
+    'default': {
+        'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30, 'pool_recycle': 300,
+        'pre_ping': 'always', 'pre_ping_idle_s': 30, 'statement_timeout_ms': None,
+    },
+    # Free-tier Postgres: a tiny connection budget, pings only after idling
+    'free-tier': {
+        'pool_size': 2, 'max_overflow': 2, 'pool_timeout': 10, 'pool_recycle': 280,
+        'pre_ping': 'idle', 'pre_ping_idle_s': 30, 'statement_timeout_ms': 15000,
+    },
+    # A dedicated database that doesn't drop idle connections
+    'dedicated': {
+        'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30, 'pool_recycle': 1800,
+        'pre_ping': 'never', 'pre_ping_idle_s': 30, 'statement_timeout_ms': 30000,
+    },
+}
+PRE_PING_STRATEGIES = ('always', 'idle', 'never')
+
+# Config key → (profile key, type)
+PROFILE_OVERRIDES = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_PRE_PING': ('pre_ping', str),
+    'DB_PRE_PING_IDLE_S': ('pre_ping_idle_s', float),
+    'DB_STATEMENT_TIMEOUT_MS': ('statement_timeout_ms', int),
+}
+
+CHECKOUT_WAIT_WINDOW = 1000
+
+
+def resolve_profile(config) -> dict:
+    """The selected profile with any DB_* overrides applied."""
+    name = config.get('DB_ENGINE_PROFILE') or 'default'
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"DB_ENGINE_PROFILE must be one of {sorted(ENGINE_PROFILES)}, not {name!r}")
+    profile = dict(ENGINE_PROFILES[name], name=name)
+    for config_key, (key, cast) in PROFILE_OVERRIDES.items():
+        value = config.get(config_key)
+        if value not in (None, ''):
+            profile[key] = cast(value)
+    if profile['pre_ping'] not in PRE_PING_STRATEGIES:
+        raise ValueError(f"pre_ping must be one of {PRE_PING_STRATEGIES}, not {profile['pre_ping']!r}")
+    return profile
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile and database."""
+    profile = resolve_profile(config)
+    options = {
+        'pool_pre_ping': profile['pre_ping'] == 'always',
+        'pool_recycle': profile['pool_recycle'],
+    }
+    if not config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        options.update(
+            pool_size=profile['pool_size'],
+            max_overflow=profile['max_overflow'],
+            pool_timeout=profile['pool_timeout'],
+        )
+        if profile['statement_timeout_ms'] and config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+            options['connect_args'] = {'options': f"-c statement_timeout={profile['statement_timeout_ms']}"}
+    return options
+
+
+# ── Checkout waits ─────────────────────────────────────────────────────────
+
+_wait_observers = []
+
+
+def on_checkout_wait(observer) -> None:
+    """Registers `observer(seconds)`, called after every timed `pool.connect()`."""
+    if observer not in _wait_observers:
+        _wait_observers.append(observer)
+
+
+def _time_pool(pool) -> None:
+    """Times `pool.connect()` — queueing for a free slot plus any pre-ping/connect."""
+    if getattr(pool.connect, '_checkout_timed', False):
+        return
+    connect = pool.connect
+
+    @functools.wraps(connect)
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in _wait_observers:
+                observer(elapsed)
+
+    timed_connect._checkout_timed = True
+    pool.connect = timed_connect
+
+
+def _on_engine_disposed(engine):
+    # dispose() swaps in a fresh pool; time that one too
+    _time_pool(engine.pool)
+
+
+def time_checkouts(engine) -> None:
+    if not event.contains(engine, 'engine_disposed', _on_engine_disposed):
+        event.listen(engine, 'engine_disposed', _on_engine_disposed)
+    _time_pool(engine.pool)
+
+
+# ── Pool statistics ────────────────────────────────────────────────────────
+
+class PoolStats:
+    """Process-wide pool counters (pool events from every instrumented engine)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.ping_failures = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.waits = deque(maxlen=CHECKOUT_WAIT_WINDOW)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.checked_out -= 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
+
+    def observe_wait(self, seconds: float) -> None:
+        self.waits.append(seconds)
+
+    def instrument(self, engine) -> None:
+        if event.contains(engine, 'checkout', self.on_checkout):
+            return
+        event.listen(engine, 'checkout', self.on_checkout)
+        event.listen(engine, 'checkin', self.on_checkin)
+        event.listen(engine, 'connect', self.on_connect)
+        event.listen(engine, 'invalidate', self.on_invalidate)
+        on_checkout_wait(self.observe_wait)
+        time_checkouts(engine)
+
+    def snapshot(self) -> dict:
+        waits = sorted(self.waits)
+        return {
+            'checkouts': self.checkouts,
+            'connects': self.connects,
+            'invalidations': self.invalidations,
+            'ping_failures': self.ping_failures,
+            'checked_out': self.checked_out,
+            'peak_checked_out': self.peak_checked_out,
+            'checkout_wait_ms': {
+                'samples': len(waits),
+                **{
+                    f'p{pct}': round(percentile(waits, pct) * 1000, 3) if waits else None
+                    for pct in (50, 95, 99)
+                },
+                'max': round(waits[-1] * 1000, 3) if waits else None,
+            },
+        }
+
+
+POOL_STATS = PoolStats()
+
+
+def _idle_pinger(idle_seconds: float, stats: PoolStats = POOL_STATS):
+    """Checkout hook for pre_ping='idle': ping only connections idle for too long."""
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info['checked_in_at'] = time.monotonic()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get('checked_in_at')
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        except Exception:
+            with stats.lock:
+                stats.ping_failures += 1
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+
+    return on_checkin, on_checkout
+
+
+def pool_report(engine, profile: dict) -> dict:
+    """Profile, live pool occupancy and counters for `/api/pool`."""
+    pool = engine.pool
+
+    def gauge(method):
+        return getattr(pool, method)() if hasattr(pool, method) else None
+
+    return {
+        'pid': os.getpid(),
+        'profile': profile,
+        'pool': {
+            'class': type(pool).__name__,
+            'size': gauge('size'),
+            'checked_in': gauge('checkedin'),
+            'checked_out': gauge('checkedout'),
+            'overflow': gauge('overflow'),
+        },
+        'counters': POOL_STATS.snapshot(),
+    }
+
+
+# ── Health ─────────────────────────────────────────────────────────────────
+
+class HealthProber:
+    """Cached database health for one app's engine."""
+
+    def __init__(self, engine, interval: float, max_staleness: float):
+        self.engine = engine
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.lock = threading.Lock()
+        self.result = None          # (ok, checked_at monotonic, checked_at datetime, method)
+        self.last_success = None
+        self.last_failure = None
+        self._thread = None
+        self._pid = None
+        event.listen(engine, 'after_cursor_execute', self._on_success)
+        event.listen(engine, 'handle_error', self._on_error)
+
+    def _on_success(self, conn, cursor, statement, parameters, context, executemany):
+        self.last_success = time.monotonic()
+
+    def _on_error(self, context):
+        self.last_failure = time.monotonic()
+
+    def refresh(self) -> tuple:
+        """Re-checks health: passively from recent traffic, else with a ping."""
+        now = time.monotonic()
+        recent = self.last_success is not None and now - self.last_success <= self.max_staleness
+        if recent and (self.last_failure is None or self.last_failure < self.last_success):
+            ok, method = True, 'traffic'
+        else:
+            method = 'ping'
+            try:
+                with self.engine.connect() as conn:
+                    conn.exec_driver_sql('SELECT 1')
+                ok = True
+            except Exception as e:
+                logger.warning(f"Health probe failed: {e}")
+                ok = False
+        self.result = (ok, time.monotonic(), datetime.utcnow(), method)
+        return self.result
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as e:  # never let the prober thread die
+                logger.error(f"Health prober error: {e}")
+
+    def _ensure_thread(self):
+        # Started lazily, so each forked worker gets its own
+        if self.interval <= 0 or (self._thread is not None and self._pid == os.getpid()):
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+        self._thread.start()
+
+    def status(self) -> dict:
+        self._ensure_thread()
+        result = self.result
+        if result is None or time.monotonic() - result[1] > self.max_staleness:
+            with self.lock:
+                result = self.result
+                if result is None or time.monotonic() - result[1] > self.max_staleness:
+                    result = self.refresh()
+        ok, checked_mono, checked_at, method = result
+        return {
+            'ok': ok,
+            'checked_at': checked_at.isoformat(),
+            'age_s': round(time.monotonic() - checked_mono, 3),
+            'method': method,
+        }
+
+
+def init_pool(app) -> None:
+    """Pool statistics, the idle pre-ping hook and the health prober for `app`'s engine."""
+    from app.models import db
+    profile = resolve_profile(app.config)
+    with app.app_context():
+        engine = db.engine
+    POOL_STATS.instrument(engine)
+    if profile['pre_ping'] == 'idle':
+        on_checkin, on_checkout = _idle_pinger(profile['pre_ping_idle_s'])
+        event.listen(engine, 'checkin', on_checkin)
+        # First, so a failed ping never reaches the checkout counters
+        event.listen(engine, 'checkout', on_checkout, insert=True)
+    app.extensions['db_profile'] = profile
+    app.extensions['health_prober'] = HealthProber(
+        engine, app.config.get('HEALTH_PROBE_INTERVAL', 10.0), app.config.get('HEALTH_MAX_STALENESS', 30.0),
+    )
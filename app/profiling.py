@@ -0,0 +1,165 @@
+# app/profiling.py
+"""
+Per-request SQL profiler (debug/profiling mode).
+
+With `SQL_PROFILING` on, every statement a request executes is timed via
+SQLAlchemy's `before/after_cursor_execute` events and normalized into a
+fingerprint (literals, bind parameters and IN-lists collapsed), so
+"SELECT count(*) ... WHERE title LIKE '%python%'" and the same query for
+'%java%' count as one shape. After each request:
+
+  - a `Server-Timing` header reports SQL time, statement count and total
+    time (visible in the browser's network panel);
+  - fingerprints repeated `N_PLUS_ONE_THRESHOLD`+ times are logged as N+1
+    suspects;
+  - statements slower than `SLOW_QUERY_MS` go to the slow-query log (and
+    to `SLOW_QUERY_LOG` as JSON lines when set).
+
+`capture_queries(engine)` records statements outside of requests; tests use
+it to hold each route to a query budget (see tests/test_query_budgets.py).
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\([^)]+\)s|%s|:\w+|\?|\$\d+')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals/parameters replaced by `?`."""
+    text = _STRING_RE.sub('?', statement)
+    text = _PARAM_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _IN_LIST_RE.sub('IN (...)', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+class QueryProfile:
+    """Statements recorded for one request (or one `capture_queries` block)."""
+
+    def __init__(self):
+        self.queries = []      # (fingerprint, statement, duration_ms)
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.queries.append((fingerprint(statement), statement, duration_ms))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(duration for _, _, duration in self.queries)
+
+    def repeated(self, threshold: int) -> dict:
+        """Fingerprints executed at least `threshold` times → count."""
+        counts = Counter(fp for fp, _, _ in self.queries)
+        return {fp: n for fp, n in counts.most_common() if n >= threshold}
+
+    def slow(self, threshold_ms: float) -> list:
+        return [(statement, duration) for _, statement, duration in self.queries if duration >= threshold_ms]
+
+
+# Profiles currently recording outside of a request (capture_queries)
+_captures = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profiling_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('profiling_start')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    for profile in _captures:
+        profile.record(statement, duration_ms)
+    if has_request_context():
+        profile = g.get('sql_profile')
+        if profile is not None:
+            profile.record(statement, duration_ms)
+
+
+def _instrument_engine(engine) -> None:
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries(engine):
+    """Records every statement `engine` executes inside the block."""
+    _instrument_engine(engine)
+    profile = QueryProfile()
+    _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        _captures.remove(profile)
+
+
+def _write_slow_log(path: str, endpoint: str, slow: list) -> None:
+    with open(path, 'a', encoding='utf-8') as fh:
+        for statement, duration in slow:
+            fh.write(json.dumps({
+                'at': datetime.utcnow().isoformat(),
+                'endpoint': endpoint,
+                'ms': round(duration, 2),
+                'fingerprint': fingerprint(statement),
+                'statement': statement,
+            }) + '\n')
+
+
+def init_profiling(app) -> None:
+    """Registers the request hooks when `SQL_PROFILING` is on."""
+    if not app.config.get('SQL_PROFILING'):
+        return
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 3)
+    slow_ms = app.config.get('SLOW_QUERY_MS', 100.0)
+    slow_log = app.config.get('SLOW_QUERY_LOG')
+
+    from app.models import db
+    with app.app_context():
+        _instrument_engine(db.engine)
+
+    @app.before_request
+    def _start_profile():
+        g.sql_profile = QueryProfile()
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        endpoint = request.endpoint or request.path
+        total_ms = (time.perf_counter() - profile.started) * 1000
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={profile.total_ms:.2f};desc="{profile.count} queries", total;dur={total_ms:.2f}',
+        )
+        response.headers['X-SQL-Queries'] = str(profile.count)
+
+        for fp, count in profile.repeated(threshold).items():
+            logger.warning(f"🐢 N+1 suspect on {endpoint}: {count}× {fp[:200]}")
+        slow = profile.slow(slow_ms)
+        for statement, duration in slow:
+            logger.warning(f"🐌 Slow query on {endpoint} ({duration:.1f} ms): {fingerprint(statement)[:200]}")
+        if slow and slow_log:
+            _write_slow_log(slow_log, endpoint, slow)
+        return response
@@ -0,0 +1,71 @@
+"""
+Lightweight schema upgrades.
+
+`db.create_all()` creates missing tables but never alters existing ones, so
+columns/indexes added to models after a table exists in production are
+listed here and applied idempotently on startup (web and pipeline).
+"""
+import logging
+from sqlalchemy import inspect, text
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+# (table, column, SQL type) — added with ALTER TABLE when missing
+COLUMN_UPGRADES = [
+    ('jobs', 'salary_min', 'FLOAT'),
+    ('jobs', 'salary_max', 'FLOAT'),
+    ('jobs', 'canonical_job_id', 'VARCHAR'),
+    ('jobs', 'skills_version', 'INTEGER'),
+    ('jobs', 'last_checked_at', 'TIMESTAMP'),
+    ('jobs', 'deactivated_at', 'TIMESTAMP'),
+    ('jobs', 'salary_currency', 'VARCHAR(3)'),
+    ('jobs', 'salary_annual_min', 'FLOAT'),
+    ('jobs', 'salary_annual_max', 'FLOAT'),
+    ('jobs', 'location_city', 'VARCHAR(80)'),
+    ('jobs', 'location_province', 'VARCHAR(50)'),
+    ('jobs', 'location_country', 'VARCHAR(2)'),
+    ('jobs', 'is_remote', 'BOOLEAN'),
+    ('jobs', 'location_version', 'INTEGER'),
+]
+
+# (index name, table, column) — created when missing
+INDEX_UPGRADES = [
+    ('ix_jobs_canonical_job_id', 'jobs', 'canonical_job_id'),
+    ('ix_jobs_last_checked_at', 'jobs', 'last_checked_at'),
+    ('ix_jobs_salary_annual_min', 'jobs', 'salary_annual_min'),
+    ('ix_jobs_salary_annual_max', 'jobs', 'salary_annual_max'),
+    ('ix_jobs_location_city', 'jobs', 'location_city'),
+    ('ix_jobs_location_province', 'jobs', 'location_province'),
+    ('ix_jobs_location_country', 'jobs', 'location_country'),
+    ('ix_jobs_is_remote', 'jobs', 'is_remote'),
+]
+
+
+def upgrade_schema() -> None:
+    """Create missing tables, then add any missing columns and indexes."""
+    db.create_all()
+
+    inspector = inspect(db.engine)
+    for table, column, sql_type in COLUMN_UPGRADES:
+        existing = {c['name'] for c in inspector.get_columns(table)}
+        if column in existing:
+            continue
+        try:
+            db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {sql_type}'))
+            db.session.commit()
+            logger.info(f"Schema upgrade: added {table}.{column}")
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Schema upgrade failed for {table}.{column}: {e}")
+
+    for name, table, column in INDEX_UPGRADES:
+        existing = {ix['name'] for ix in inspect(db.engine).get_indexes(table)}
+        if name in existing:
+            continue
+        try:
+            db.session.execute(text(f'CREATE INDEX {name} ON {table} ({column})'))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Schema upgrade failed for index {name}: {e}")
@@ -0,0 +1,53 @@
+# app/snapshot.py
+"""
+Serving page and API reads from the pipeline's published SQLite snapshot.
+
+Views decorated with `@snapshot_reads` pin the current snapshot generation
+for the request (when READ_SNAPSHOT is on and one has been published), and
+RoutingSession sends their ORM reads of the snapshot tables to it instead
+of the primary database. `precomputed()` returns aggregates stored at
+build time; `title_contains()` uses the snapshot's trigram FTS index for
+substring searches. Without a snapshot both fall back to the primary.
+"""
+from functools import wraps
+from flask import current_app, g, has_request_context
+from sqlalchemy import text
+from app.models import Job
+from ingestion.snapshot import get_snapshot
+
+# Trigrams need at least three characters to use the index
+FTS_MIN_CHARS = 3
+
+
+def snapshot_reads(view):
+    """Serve this view's reads from the current snapshot, if any."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get('READ_SNAPSHOT'):
+            return view(*args, **kwargs)
+        g.snapshot = get_snapshot()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop('snapshot', None)
+    return wrapper
+
+
+def current_snapshot():
+    return g.get('snapshot') if has_request_context() else None
+
+
+def precomputed(key: str):
+    """A build-time aggregate from the request's snapshot, or None."""
+    snapshot = current_snapshot()
+    return snapshot.stats.get(key) if snapshot is not None else None
+
+
+def title_contains(term: str):
+    """Case-insensitive substring filter on Job.title."""
+    snapshot = current_snapshot()
+    if snapshot is not None and snapshot.has_fts and len(term) >= FTS_MIN_CHARS:
+        return text(
+            'jobs.rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts.title LIKE :title_pattern)'
+        ).bindparams(title_pattern=f'%{term}%')
+    return Job.title.ilike(f'%{term}%')
@@ -0,0 +1,15 @@
+# app/stats_utils.py
+"""
+Small statistics helpers with no app or database imports, so both the
+web app and the ingestion stages can use them without import cycles.
+"""
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
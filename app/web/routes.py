@@ -2,8 +2,14 @@ import threading
 from datetime import datetime, timedelta, date
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from sqlalchemy import func
-from app.models import db, Job
+from app.models import db, Job, JobSkill, SalaryPercentile
 from ingestion.pipeline import run_etl, DISPLAY_MAX_DAYS
+from ingestion.skills import skill_label
+from ingestion.locations import location_label
+from ingestion.rollups import trend_series, TREND_WINDOWS, CATEGORY_KEYWORDS
+from ingestion.snapshot import SA_BOARD_SOURCES, board_key
+from app.snapshot import snapshot_reads, precomputed, title_contains
+from app.admission import gated, rate_limited, retry_after_seconds
 
 web_bp = Blueprint('web', __name__)
 
@@ -20,26 +26,61 @@ def _active_cutoff() -> date:
     """Jobs older than this are considered inactive/ghost — not shown."""
     return (datetime.utcnow() - timedelta(days=DISPLAY_MAX_DAYS)).date()
 
-def _get_category_counts(base_query):
-    """Calculate job counts for the sidebar categories based on the current base query."""
+def _get_category_counts(base_query, board, cutoff):
+    """
+    Job counts for the sidebar categories based on the current base query;
+    read from the snapshot's precomputed stats when it has this cutoff.
+    """
+    counts = precomputed(board_key(board, cutoff))
+    if counts is not None:
+        return counts
     return {
         'all': base_query.count(),
-        'junior_dev': base_query.filter(Job.title.ilike('%junior developer%')).count(),
-        'graduate': base_query.filter(Job.title.ilike('%graduate%')).count(),
-        'intern': base_query.filter(Job.title.ilike('%intern%')).count(),
-        'data': base_query.filter(Job.title.ilike('%data%')).count(),
-        'cyber': base_query.filter(Job.title.ilike('%cyber%')).count(),
-        'cloud': base_query.filter(Job.title.ilike('%cloud%')).count(),
-        'ict_grad': base_query.filter(Job.title.ilike('%ict%')).count(),
-        'is_grad': base_query.filter(Job.title.ilike('%information systems%')).count(),
+        **{
+            category: base_query.filter(Job.title.ilike(f'%{keyword}%')).count()
+            for category, keyword in CATEGORY_KEYWORDS.items()
+        },
     }
 
 
+def _listing_extras(jobs):
+    """
+    Per-page data for the job cards, fetched in two small indexed queries
+    instead of loading every (deferred) description:
+      - ids of jobs with a description worth showing behind "Details"
+      - skill tags per job
+    """
+    ids = [job.id for job in jobs]
+    if not ids:
+        return set(), {}
+
+    described_ids = {
+        row.id for row in
+        db.session.query(Job.id)
+        .filter(Job.id.in_(ids))
+        .filter(func.length(Job.description) > 20)
+        .all()
+    }
+
+    job_skills = {}
+    for job_id, skill in (
+        db.session.query(JobSkill.job_id, JobSkill.skill)
+        .filter(JobSkill.job_id.in_(ids))
+        .order_by(JobSkill.skill)
+        .all()
+    ):
+        job_skills.setdefault(job_id, []).append(skill_label(skill))
+
+    return described_ids, job_skills
+
+
 # ---------------------------------------------------------------------------
 # 1. Standard page routes
 # ---------------------------------------------------------------------------
 
 @web_bp.route('/')
+@gated
+@snapshot_reads
 def index():
     """Home: SA Jobs ONLY — last 5 months, no ghost jobs"""
     search_query = request.args.get('q', '')
@@ -51,20 +92,21 @@ def index():
         Job.query
         .filter(Job.is_active == True)
         .filter(Job.posted_date >= cutoff)         # ← 5-month freshness filter
-        .filter(
-            (Job.source == 'adzuna_sa') | (Job.source == 'careers24')
-        )
+        .filter(Job.canonical_job_id.is_(None))    # ← hide linked near-duplicates
+        .filter(Job.source.in_(SA_BOARD_SOURCES))
     )
 
-    counts = _get_category_counts(query)
+    counts = _get_category_counts(query, 'sa', cutoff)
 
     if search_query:
-        query = query.filter(Job.title.ilike(f'%{search_query}%'))
+        query = query.filter(title_contains(search_query))
 
     pagination = query.order_by(Job.posted_date.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
 
+    described_ids, job_skills = _listing_extras(pagination.items)
+
     return render_template(
         'index.html',
         jobs=pagination.items,
@@ -72,10 +114,14 @@ def index():
         search_query=search_query,
         page_title="🇿🇦 SA Tech Jobs",
         category_counts=counts,
+        described_ids=described_ids,
+        job_skills=job_skills,
     )
 
 
 @web_bp.route('/global')
+@gated
+@snapshot_reads
 def global_jobs():
     """Global: Remote data/tech jobs — last 5 months"""
     search_query = request.args.get('q', '')
@@ -87,20 +133,21 @@ def global_jobs():
         Job.query
         .filter(Job.is_active == True)
         .filter(Job.posted_date >= cutoff)         # ← 5-month freshness filter
-        .filter(
-            (Job.source != 'adzuna_sa') & (Job.source != 'careers24')
-        )
+        .filter(Job.canonical_job_id.is_(None))    # ← hide linked near-duplicates
+        .filter(Job.source.notin_(SA_BOARD_SOURCES))
     )
 
-    counts = _get_category_counts(query)
+    counts = _get_category_counts(query, 'global', cutoff)
 
     if search_query:
-        query = query.filter(Job.title.ilike(f'%{search_query}%'))
+        query = query.filter(title_contains(search_query))
 
     pagination = query.order_by(Job.posted_date.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
 
+    described_ids, job_skills = _listing_extras(pagination.items)
+
     return render_template(
         'index.html',
         jobs=pagination.items,
@@ -108,18 +155,24 @@ def global_jobs():
         search_query=search_query,
         page_title="🌍 Global Remote Data Jobs",
         category_counts=counts,
+        described_ids=described_ids,
+        job_skills=job_skills,
     )
 
 
 @web_bp.route('/stats')
+@gated
+@snapshot_reads
 def stats():
     """Analytics Dashboard — metrics for active + fresh jobs"""
     cutoff = _active_cutoff()
-    total_jobs = Job.query.count()
+    totals = precomputed('totals')
+    total_jobs = totals['total_jobs_scraped'] if totals else Job.query.count()
     active_jobs = (
         Job.query
         .filter(Job.is_active == True)
         .filter(Job.posted_date >= cutoff)
+        .filter(Job.canonical_job_id.is_(None))
         .count()
     )
 
@@ -127,45 +180,55 @@ def stats():
         db.session.query(Job.source, func.count(Job.id))
         .filter(Job.is_active == True)
         .filter(Job.posted_date >= cutoff)
+        .filter(Job.canonical_job_id.is_(None))
         .group_by(Job.source)
         .all()
     )
 
-    location_data = (
-        db.session.query(Job.location, func.count(Job.id))
+    # Grouped on the canonical location columns, so "Johannesburg" and
+    # "Johannesburg, Gauteng" land in one bar
+    location_counts = {}
+    for city, province, country, is_remote, count in (
+        db.session.query(Job.location_city, Job.location_province, Job.location_country,
+                         Job.is_remote, func.count(Job.id))
         .filter(Job.is_active == True)
         .filter(Job.posted_date >= cutoff)
-        .group_by(Job.location)
-        .order_by(func.count(Job.id).desc())
-        .limit(8)
+        .filter(Job.canonical_job_id.is_(None))
+        .group_by(Job.location_city, Job.location_province, Job.location_country, Job.is_remote)
+        .all()
+    ):
+        label = location_label(city, province, country, is_remote)
+        location_counts[label] = location_counts.get(label, 0) + count
+    location_data = sorted(location_counts.items(), key=lambda item: item[1], reverse=True)[:8]
+
+    # Skill demand: one indexed GROUP BY over ingest-time skill tags
+    skill_data = (
+        db.session.query(JobSkill.skill, func.count(JobSkill.job_id))
+        .join(Job, Job.id == JobSkill.job_id)
+        .filter(Job.is_active == True)
+        .filter(Job.posted_date >= cutoff)
+        .filter(Job.canonical_job_id.is_(None))
+        .group_by(JobSkill.skill)
+        .order_by(func.count(JobSkill.job_id).desc())
+        .limit(15)
         .all()
     )
-
-    # Skill demand via SQL LIKE (stays in DB, uses index)
-    skills_to_track = [
-        'python', 'sql', 'java', 'aws', 'azure', 'react',
-        'data engineer', 'analyst', 'cyber', 'intern',
-        'javascript', 'power bi', 'spark', 'docker', 'junior',
-    ]
-    skill_counts = {}
-    for skill in skills_to_track:
-        count = (
-            db.session.query(func.count(Job.id))
-            .filter(Job.is_active == True)
-            .filter(Job.posted_date >= cutoff)
-            .filter(Job.title.ilike(f'%{skill}%'))
-            .scalar()
+    skill_counts = {skill_label(skill): count for skill, count in skill_data}
+
+    # Trend from the daily rollups: O(days), independent of retention
+    trend_window = request.args.get('window', TREND_WINDOWS[0], type=int)
+    if trend_window not in TREND_WINDOWS:
+        trend_window = TREND_WINDOWS[0]
+    trend_data = trend_series(trend_window)
+
+    # Precomputed by the pipeline's salary stage: overall, then sources, then categories
+    salary_bands = (
+        SalaryPercentile.query
+        .order_by(
+            (SalaryPercentile.source != 'all'),
+            (SalaryPercentile.category != 'all'),
+            SalaryPercentile.sample_size.desc(),
         )
-        if count:
-            skill_counts[skill.title()] = count
-
-    # 14-day trend
-    trend_data = (
-        db.session.query(Job.posted_date, func.count(Job.id))
-        .filter(Job.is_active == True)
-        .filter(Job.posted_date >= (datetime.utcnow() - timedelta(days=14)).date())
-        .group_by(Job.posted_date)
-        .order_by(Job.posted_date.asc())
         .all()
     )
 
@@ -182,13 +245,22 @@ def stats():
         loc_values=[l[1] for l in location_data],
         skill_labels=list(skill_counts.keys()),
         skill_values=list(skill_counts.values()),
-        trend_labels=[str(t[0]) for t in trend_data],
-        trend_values=[t[1] for t in trend_data],
+        trend_labels=[t['date'] for t in trend_data],
+        trend_values=[t['new'] for t in trend_data],
+        trend_window=trend_window,
+        trend_windows=TREND_WINDOWS,
+        salary_bands=salary_bands,
         last_run=last_run_str,
         pipeline_running=_pipeline_state['running'],
     )
 
 
+@web_bp.route('/tracker')
+def tracker():
+    """Application tracker — entries live in localStorage; statuses come from /api/jobs/status"""
+    return render_template('tracker.html')
+
+
 # ---------------------------------------------------------------------------
 # 2. Pipeline refresh (background thread)
 # ---------------------------------------------------------------------------
@@ -206,7 +278,20 @@ def _run_pipeline_in_background(app):
             _pipeline_state['last_run'] = datetime.utcnow()
 
 
+def _refresh_throttled(retry_after):
+    """Throttled refresh: back to the index with a flash, but still a 429 with Retry-After."""
+    seconds = retry_after_seconds(retry_after)
+    flash(f"⏳ Refresh limit reached. Try again in {max(1, round(seconds / 60))} min.", "warning")
+    response = redirect(url_for('web.index'))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    # Browsers don't follow Location on a 429; the page sends them on instead
+    response.set_data(f'<meta http-equiv="refresh" content="0; url={response.location}">')
+    return response
+
+
 @web_bp.route('/refresh', methods=['POST'])
+@rate_limited('refresh', on_limit=_refresh_throttled)
 def refresh_data():
     from flask import current_app
     import logging
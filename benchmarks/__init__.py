@@ -0,0 +1,9 @@
+"""
+Performance benchmarks. Not part of the test suite.
+
+    python -m benchmarks run                      # full suite, JSON results
+    python -m benchmarks compare old.json new.json
+
+Standalone micro-benchmarks can also be run directly, e.g.
+`python -m benchmarks.bench_careers24_parse`.
+"""
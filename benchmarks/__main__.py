@@ -0,0 +1,135 @@
+"""
+benchmarks/__main__.py
+
+    python -m benchmarks run                          # full suite → data/benchmarks/<stamp>-<commit>.json
+    python -m benchmarks run --only utils careers24   # subset (substring match on case names)
+    python -m benchmarks run --sizes 1000,10000 --output before.json
+    python -m benchmarks compare before.json after.json --threshold 0.1
+    python -m benchmarks list
+
+    python -m benchmarks seed --jobs 50000            # synthetic rows into DATABASE_URL
+    python -m benchmarks seed --clear
+    python -m benchmarks load --duration 30 --concurrency 8 [--url http://127.0.0.1:8000]
+
+`compare` exits with status 1 when any case regressed beyond the threshold.
+"""
+import argparse
+import json
+import logging
+import sys
+from benchmarks import suite
+
+
+def _sizes(text: str) -> tuple:
+    return tuple(int(part) for part in text.split(',') if part.strip())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run the suite and store JSON results")
+    run.add_argument('--only', nargs='+', help="Only cases whose name contains one of these")
+    run.add_argument('--sizes', type=_sizes, default=suite.DEFAULT_SIZES,
+                     help="Raw record counts for etl.run_etl (default 1000,10000,100000)")
+    run.add_argument('--repeat', type=int, default=suite.DEFAULT_REPEAT)
+    run.add_argument('--pages', help="Directory of saved Careers24 .html pages (default: test fixture)")
+    run.add_argument('--output', help="Results file (default: data/benchmarks/<stamp>-<commit>.json)")
+
+    cmp = commands.add_parser('compare', help="Compare two result files")
+    cmp.add_argument('baseline')
+    cmp.add_argument('candidate')
+    cmp.add_argument('--threshold', type=float, default=suite.DEFAULT_THRESHOLD,
+                     help="Relative slowdown flagged as a regression (default 0.10)")
+
+    commands.add_parser('list', help="List case names")
+
+    seed = commands.add_parser('seed', help="Fill the database with synthetic jobs")
+    seed.add_argument('--jobs', type=int, default=10000)
+    seed.add_argument('--seed', type=int, default=None, help="Random seed (default: the suite seed)")
+    seed.add_argument('--no-derive', action='store_true',
+                      help="Skip the skills/location/salary/rollup stages after inserting")
+    seed.add_argument('--clear', action='store_true', help="Delete previously seeded jobs and exit")
+
+    load = commands.add_parser('load', help="Concurrent mixed-workload load test")
+    load.add_argument('--url', help="Target a running server (default: serve the app locally)")
+    load.add_argument('--concurrency', type=int, default=8)
+    load.add_argument('--duration', type=float, default=30.0, help="Seconds to run (default 30)")
+    load.add_argument('--requests', type=int, help="Stop after this many requests instead")
+    load.add_argument('--output', help="Also write the report as JSON")
+
+    args = parser.parse_args(argv)
+    # Pipeline stages log every batch; keep the benchmark output readable
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command in ('seed', 'load'):
+        return _web_command(args)
+
+    if args.command == 'list':
+        for case in suite.collect_cases(sizes=(1000,)):
+            print(case.name.replace('[1000]', '[N]'))
+        return 0
+
+    if args.command == 'compare':
+        baseline, candidate = suite.load_results(args.baseline), suite.load_results(args.candidate)
+        rows = suite.compare(baseline, candidate, args.threshold)
+        suite.print_comparison(rows, baseline, candidate)
+        regressions = [row for row in rows if row[-1] == 'regression']
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}.")
+            return 1
+        return 0
+
+    sizes = args.sizes
+    if args.only and not any('etl' in pattern for pattern in args.only):
+        sizes = ()   # don't build ETL inputs that won't run
+    cases = suite.collect_cases(sizes=sizes, pages_dir=args.pages)
+    print(f"Running {len(cases)} cases, best of {args.repeat}…")
+    report = suite.run_suite(cases, repeat=args.repeat, only=args.only)
+    print(f"Results written to {suite.save_results(report, args.output)}")
+    return 0
+
+
+def _web_command(args) -> int:
+    from app import create_app
+    from app.schema import upgrade_schema
+    from benchmarks import loadtest, seed as seeding
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema()
+        if args.command == 'seed':
+            if args.clear:
+                print(f"Removed {seeding.clear_synthetic()} synthetic jobs.")
+                return 0
+            kwargs = {'derive': not args.no_derive}
+            if args.seed is not None:
+                kwargs['seed'] = args.seed
+            seeding.seed_jobs(args.jobs, **kwargs)
+            for source, count, share in seeding.summarize():
+                print(f"  {source:<12} {count:>8} {share:>5}")
+            return 0
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        # Every request comes from one local client: per-client limits would throttle the test itself
+        app.extensions['admission'].enabled = False
+        server, base_url = loadtest.serve_app(app)
+    try:
+        print(f"Load testing {base_url} …")
+        report = loadtest.run_load(base_url.rstrip('/'), concurrency=args.concurrency,
+                                   duration=args.duration, total_requests=args.requests)
+    finally:
+        if server is not None:
+            server.shutdown()
+    print(loadtest.format_report(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+benchmarks/bench_careers24_parse.py
+
+Careers24 parse benchmark over saved result pages.
+
+Compares the legacy full-tree parse (whole document, per-field `card.find`
+calls) with the strained single-pass parser, for every installed backend.
+Pages come from a landed pipeline run, a directory of saved .html files,
+or the bundled test fixture.
+
+    python -m benchmarks.bench_careers24_parse
+    python -m benchmarks.bench_careers24_parse --landing latest --max-cards 0
+    python -m benchmarks.bench_careers24_parse --pages saved_pages/ --repeat 50
+"""
+import argparse
+import glob
+import os
+import time
+from bs4 import BeautifulSoup
+from ingestion.extractors import careers24_parser
+from ingestion.extractors.scraper import parse_careers24_page
+from ingestion.landing import LandingZone
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'careers24_search.html')
+
+
+def load_pages(pages_dir=None, landing_run=None) -> list:
+    if landing_run:
+        zone = LandingZone.open(landing_run)
+        return [
+            r['payload'] for r in zone.read('careers24')
+            if r.get('meta', {}).get('status') == 200 and r.get('payload')
+        ]
+    if pages_dir:
+        paths = sorted(glob.glob(os.path.join(pages_dir, '*.html')))
+    else:
+        paths = [FIXTURE]
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as fh:
+            pages.append(fh.read())
+    return pages
+
+
+def legacy_parse(html, max_cards):
+    """The pre-strainer extraction: full tree + repeated per-field finds."""
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = soup.find_all('div', class_='job-card')
+    if not cards:
+        cards = soup.select('.c24-job-card')
+    rows = []
+    for card in (cards[:max_cards] if max_cards else cards):
+        closing = card.find(string=lambda text: text and "closing date" in text.lower())
+        date_tag = card.find('span', class_='job-card-date')
+        title_tag = card.find('h3') or card.find('span', class_='job-card-title')
+        link_tag = card.find('a')
+        company = card.find('span', class_='job-card-company').text if card.find('span', class_='job-card-company') else None
+        location = card.find('span', class_='job-card-location').text if card.find('span', class_='job-card-location') else None
+        rows.append((closing, date_tag, title_tag, link_tag, company, location))
+    return rows
+
+
+def time_variant(fn, pages, repeat) -> float:
+    """Best-of-`repeat` seconds to process every page once."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def available_backends() -> list:
+    backends = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        backends.append('lxml')
+    except ImportError:
+        pass
+    return backends
+
+
+def run(pages, repeat=20, max_cards=careers24_parser.MAX_CARDS_PER_PAGE) -> dict:
+    careers24_parser.MAX_CARDS_PER_PAGE = max_cards
+    variants = {'legacy/html.parser': lambda html: legacy_parse(html, max_cards)}
+    for backend in available_backends():
+        variants[f'strained/{backend}'] = (
+            lambda html, backend=backend: parse_careers24_page(html, set(), parser=backend)
+        )
+    return {name: time_variant(fn, pages, repeat) for name, fn in variants.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', help="Directory of saved Careers24 .html pages")
+    parser.add_argument('--landing', metavar='RUN_ID', help="Use pages from a landed run ('latest' allowed)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-cards', type=int, default=careers24_parser.MAX_CARDS_PER_PAGE,
+                        help="Cards processed per page (0 = no cap)")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pages, args.landing)
+    if not pages:
+        raise SystemExit("No pages to benchmark.")
+    size_kb = sum(len(p) for p in pages) / 1024
+    print(f"{len(pages)} page(s), {size_kb:.0f} KiB, best of {args.repeat}, max_cards={args.max_cards or 'all'}")
+
+    results = run(pages, repeat=args.repeat, max_cards=args.max_cards)
+    baseline = results['legacy/html.parser']
+    for name, seconds in results.items():
+        per_page_ms = seconds / len(pages) * 1000
+        print(f"  {name:<22} {per_page_ms:8.2f} ms/page   {baseline / seconds:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+benchmarks/data.py
+
+Reproducible synthetic inputs for the benchmark suite.
+
+Everything is generated from a seeded `random.Random`, so two runs (on two
+commits) time exactly the same inputs. Descriptions are long HTML blobs
+shaped like real Adzuna/Remotive postings; raw records go through the real
+extractor transforms when fed to the replayers.
+"""
+import random
+from datetime import date, timedelta
+
+SEED = 20260719
+
+ROLES = ['Software Developer', 'Data Analyst', 'IT Support Technician', 'Java Developer',
+         'Python Developer', 'QA Tester', 'Web Designer', 'Data Engineer', 'Network Administrator',
+         'Business Analyst', 'Cloud Engineer', 'Accountant']
+LEVELS = ['Junior', 'Graduate', 'Entry Level', 'Intern', 'Trainee', 'Associate']
+SENIOR_LEVELS = ['Senior', 'Lead', 'Principal']
+COMPANIES = ['Capitec', 'Discovery', 'Standard Bank', 'Takealot', 'Vodacom', 'Absa', 'Dimension Data',
+             'Old Mutual', 'Nedbank', 'MTN', 'Shoprite', 'Sasol']
+LOCATIONS = ['Johannesburg, Gauteng', 'Cape Town, Western Cape', 'Durban, KwaZulu-Natal', 'Pretoria',
+             'Sandton', 'Port Elizabeth', 'Bloemfontein', 'Stellenbosch', 'Remote']
+SKILLS = ['Python', 'SQL', 'Java', 'JavaScript', 'React', 'AWS', 'Azure', 'Docker', 'Excel', 'Power BI',
+          'Git', 'Linux', 'C#', '.NET', 'Tableau', 'Kubernetes', 'Django', 'Flask']
+SENTENCES = [
+    'You will join a friendly team building products used by millions of customers.',
+    'The successful candidate will assist with day-to-day support and maintenance tasks.',
+    'We offer structured mentorship, training and a clear growth path.',
+    'You will work closely with analysts, testers and product owners.',
+    'Exposure to {skill} and {skill} is advantageous but not required.',
+    'A relevant degree or diploma in IT, Computer Science or similar is required.',
+    'Strong communication skills and a willingness to learn are essential.',
+    'Hybrid working: three days in the office and two days from home.',
+    'You will write clean, well-tested code and take part in code reviews.',
+    'Assist with reporting, dashboards and ad-hoc data requests using {skill}.',
+]
+RELATIVE_DATES = ['Today', 'Yesterday', '2 days ago', '5 days ago', '30+ days ago', '3 hours ago',
+                  'Closing date: 30 June 2027', '2026-07-15', '14 March 2026', '']
+
+
+def rng(seed: int = SEED) -> random.Random:
+    return random.Random(seed)
+
+
+def title(r: random.Random) -> str:
+    level = r.choice(SENIOR_LEVELS) if r.random() < 0.1 else r.choice(LEVELS)
+    text = f'{level} {r.choice(ROLES)}'
+    roll = r.random()
+    if roll < 0.05:
+        text += f' Programme {r.choice([2017, 2019, 2021])}'   # outdated
+    elif roll < 0.15:
+        text += f' {date.today().year} Intake'
+    return text
+
+
+def titles(n: int, seed: int = SEED) -> list:
+    r = rng(seed)
+    return [title(r) for _ in range(n)]
+
+
+def relative_dates(n: int, seed: int = SEED) -> list:
+    r = rng(seed)
+    return [r.choice(RELATIVE_DATES) for _ in range(n)]
+
+
+def description(r: random.Random, sentences: int = 40) -> str:
+    """~3-5 KB of HTML with nested lists, entities and ragged whitespace."""
+    parts = ['<div class="job-description">', f'<h2>About the role</h2>\n\n  <p>']
+    for i in range(sentences):
+        sentence = r.choice(SENTENCES).replace('{skill}', r.choice(SKILLS), 1).replace('{skill}', r.choice(SKILLS))
+        parts.append(sentence + ('  \n\t ' if i % 3 == 0 else ' '))
+        if i % 8 == 7:
+            parts.append('</p>\n<ul>' + ''.join(f'<li>{r.choice(SKILLS)} &amp; tooling</li>' for _ in range(4))
+                         + '</ul>\n<p>')
+    parts.append('</p></div>')
+    return ''.join(parts)
+
+
+def descriptions(n: int, seed: int = SEED) -> list:
+    r = rng(seed)
+    return [description(r) for _ in range(n)]
+
+
+def adzuna_items(n: int, seed: int = SEED, start_id: int = 1) -> list:
+    """Raw Adzuna API results (the shape `transform_adzuna_results` takes)."""
+    r = rng(seed)
+    items = []
+    for i in range(n):
+        posted = date.today() - timedelta(days=r.randint(0, 20))
+        items.append({
+            'id': start_id + i,
+            'title': title(r),
+            'company': {'display_name': r.choice(COMPANIES)},
+            'location': {'display_name': r.choice(LOCATIONS)},
+            'redirect_url': f'https://www.adzuna.co.za/details/{start_id + i}',
+            'description': description(r, sentences=r.randint(8, 40)),
+            'created': f'{posted.isoformat()}T08:00:00Z',
+            'salary_min': r.choice([None, 15000, 18000, 240000, 300000]),
+            'salary_max': r.choice([None, 22000, 360000]),
+            'contract_time': 'full_time',
+        })
+    return items
+
+
+def remotive_items(n: int, seed: int = SEED, start_id: int = 1) -> list:
+    """Raw Remotive API results."""
+    r = rng(seed)
+    items = []
+    for i in range(n):
+        posted = date.today() - timedelta(days=r.randint(0, 20))
+        items.append({
+            'id': start_id + i,
+            'title': title(r),
+            'company_name': r.choice(COMPANIES),
+            'candidate_required_location': r.choice(['Worldwide', 'USA Only', 'Europe', '']),
+            'url': f'https://remotive.com/remote-jobs/software-dev/{start_id + i}',
+            'description': description(r, sentences=r.randint(8, 40)),
+            'publication_date': f'{posted.isoformat()}T14:00:00',
+        })
+    return items
+
+
+CARD_TEMPLATE = '''
+  <div class="job-card" data-id="{id}">
+    <div class="job-card-head">
+      <a href="/jobs/adverts/{slug}-{id}/"><h3> {title}
+      </h3></a>
+      <span class="job-card-company">  {company} </span>
+    </div>
+    <ul class="job-card-meta">
+      <li><span class="job-card-location">{location}</span></li>
+      <li>Permanent</li>
+      <li><span class="job-card-date">{posted}</span></li>
+    </ul>
+    <div class="job-card-snippet"><p>We are looking for a motivated candidate to join our growing team.</p></div>
+  </div>'''
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Jobs | Careers24</title>
+<script>{script}</script></head>
+<body><header><nav><ul>{nav}</ul></nav></header>
+<main class="search-results">{cards}
+</main><footer>{footer}</footer></body></html>'''
+
+
+def careers24_pages(cards: int, per_page: int = 25, seed: int = SEED, start_id: int = 3000000) -> list:
+    """Careers24 result pages (with the usual nav/script/footer bulk)."""
+    r = rng(seed)
+    chrome = {
+        'script': 'var x=1;' * 400,
+        'nav': ''.join(f'<li><a href="/jobs/category-{i}/">Category {i}</a></li>' for i in range(60)),
+        'footer': ''.join(f'<a href="/p/{i}">Link {i}</a>' for i in range(80)),
+    }
+    pages, batch = [], []
+    for i in range(cards):
+        text = title(r)
+        batch.append(CARD_TEMPLATE.format(
+            id=start_id + i, slug=text.lower().replace(' ', '-'), title=text,
+            company=r.choice(COMPANIES), location=r.choice(LOCATIONS),
+            posted=r.choice(['Today', 'Yesterday', '2 days ago', '5 days ago']),
+        ))
+        if len(batch) == per_page or i == cards - 1:
+            pages.append(PAGE_TEMPLATE.format(cards=''.join(batch), **chrome))
+            batch = []
+    return pages
+
+
+def landed_records(raw_records: int, seed: int = SEED) -> dict:
+    """
+    `raw_records` raw postings split across sources as landed records
+    (the replayers' input): half Adzuna, a quarter each Remotive and
+    Careers24 cards. Pages/batches are 50 results like the real APIs.
+    """
+    adzuna_n = raw_records // 2
+    remotive_n = raw_records // 4
+    careers24_n = raw_records - adzuna_n - remotive_n
+    countries = ['za', 'gb', 'us', 'au']
+
+    adzuna = adzuna_items(adzuna_n, seed)
+    remotive = remotive_items(remotive_n, seed + 1)
+    return {
+        'adzuna': [
+            {'meta': {'country': countries[(i // 50) % len(countries)]}, 'payload': adzuna[i:i + 50]}
+            for i in range(0, len(adzuna), 50)
+        ],
+        'remotive': [{'meta': {}, 'payload': remotive[i:i + 50]} for i in range(0, len(remotive), 50)],
+        'careers24': [
+            {'meta': {'status': 200}, 'payload': page}
+            for page in careers24_pages(careers24_n, seed=seed + 2)
+        ],
+    }
@@ -0,0 +1,142 @@
+"""
+benchmarks/loadtest.py
+
+Offline load generator for the web tier.
+
+Drives the Flask routes concurrently with a weighted mix of the traffic the
+site actually sees — home-page search and paging, the global board, the
+stats dashboard and the JSON API — and reports throughput plus p50/p95/p99
+latency per route. By default it serves the app itself on a local threaded
+WSGI server against the configured database (DATABASE_URL: the local
+SQLite file or a local Postgres); `--url` points it at an already running
+server instead (e.g. gunicorn, to include worker behaviour).
+
+    python -m benchmarks seed --jobs 50000
+    python -m benchmarks load --duration 30 --concurrency 8
+    python -m benchmarks load --url http://127.0.0.1:8000 --requests 2000
+"""
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from benchmarks import data
+from app.stats_utils import percentile
+
+SEARCH_TERMS = ['junior', 'graduate', 'intern', 'data', 'developer', 'python', 'support', 'analyst',
+                'cloud', 'java', 'accountant', 'trainee']
+API_FILTERS = [
+    '', 'type=python', 'type=data', 'location=johannesburg', 'location=cape town', 'remote=1',
+    'source=careers24', 'skill=sql', 'min_salary=200000', 'sort=salary_desc', 'province=Gauteng',
+]
+
+# route label → (weight, request path builder)
+WORKLOAD = {
+    'home': (14, lambda r: '/'),
+    'home:search': (14, lambda r: f'/?q={r.choice(SEARCH_TERMS)}'),
+    'home:page': (12, lambda r: f'/?page={r.randint(2, 8)}'),
+    'global': (8, lambda r: f'/global?page={r.randint(1, 3)}'),
+    'stats': (8, lambda r: r.choice(['/stats', '/stats?window=90'])),
+    'api:jobs': (20, lambda r: f'/api/jobs?limit=50&{r.choice(API_FILTERS)}'),
+    'api:stats': (6, lambda r: '/api/stats'),
+    'api:skills': (6, lambda r: '/api/skills'),
+    'api:locations': (4, lambda r: '/api/locations?by=province'),
+    'api:trends': (4, lambda r: '/api/trends'),
+    'api:health': (4, lambda r: '/api/health'),
+}
+
+
+def serve_app(app):
+    """Starts `app` on a threaded local WSGI server; returns (server, base_url)."""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)   # no per-request access log
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def _worker(base_url: str, seed: int, deadline: float, budget: list, lock, samples: list, timeout: float):
+    r = random.Random(seed)
+    labels = list(WORKLOAD)
+    weights = [WORKLOAD[label][0] for label in labels]
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        with lock:
+            if budget[0] is not None:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+        label = r.choices(labels, weights=weights)[0]
+        path = WORKLOAD[label][1](r)
+        start = time.perf_counter()
+        try:
+            status = session.get(base_url + path, timeout=timeout).status_code
+        except requests.RequestException:
+            status = 0
+        samples.append((label, time.perf_counter() - start, status))
+
+
+def run_load(base_url: str, concurrency: int = 8, duration: float = 30.0, total_requests: int = None,
+             seed: int = data.SEED, timeout: float = 30.0) -> dict:
+    """
+    Runs the mixed workload for `duration` seconds (or until
+    `total_requests` are sent) and returns the report (see `summarize`).
+    """
+    samples = []        # list.append is atomic; no lock needed for results
+    lock = threading.Lock()
+    budget = [total_requests]
+    started = time.perf_counter()
+    deadline = started + (duration if total_requests is None else float('inf'))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for worker in range(concurrency):
+            executor.submit(_worker, base_url, seed + worker, deadline, budget, lock, samples, timeout)
+    return summarize(samples, time.perf_counter() - started, concurrency)
+
+
+def summarize(samples: list, elapsed: float, concurrency: int) -> dict:
+    """Per-route count, errors, throughput and latency percentiles (ms)."""
+    by_route = defaultdict(list)
+    errors = defaultdict(int)
+    limited = defaultdict(int)
+    for label, seconds, status in samples:
+        by_route[label].append(seconds * 1000)
+        if status == 0 or status >= 500:
+            errors[label] += 1
+        elif status == 429:     # refused by admission control (app/admission.py)
+            limited[label] += 1
+
+    def stats(latencies, errors_count, limited_count):
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors_count,
+            'limited': limited_count,
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': latencies[-1],
+        }
+
+    routes = {label: stats(latencies, errors[label], limited[label]) for label, latencies in sorted(by_route.items())}
+    overall = stats([ms for latencies in by_route.values() for ms in latencies], sum(errors.values()),
+                    sum(limited.values())) if samples else None
+    return {'elapsed_s': elapsed, 'concurrency': concurrency, 'overall': overall, 'routes': routes}
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['concurrency']} workers, {report['elapsed_s']:.1f}s",
+        f"  {'route':<16} {'reqs':>7} {'err':>5} {'429':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)",
+    ]
+    rows = list(report['routes'].items())
+    if report['overall']:
+        rows.append(('TOTAL', report['overall']))
+    for label, s in rows:
+        lines.append(
+            f"  {label:<16} {s['requests']:>7} {s['errors']:>5} {s['limited']:>5} {s['rps']:>8.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+    return '\n'.join(lines)
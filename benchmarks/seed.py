@@ -0,0 +1,191 @@
+"""
+benchmarks/seed.py
+
+Fills the configured database (DATABASE_URL, default the local SQLite
+file) with N synthetic jobs, distributed like production data, for load
+testing the web tier at scale.
+
+  - sources: mostly Careers24 / Adzuna SA, then Remotive and Adzuna global
+  - titles: entry-level vocabulary with per-source role mixes
+  - locations: weighted towards the big metros; global sources are remote
+  - posted dates: skewed recent (exponential over the 5-month window)
+  - salaries: Adzuna only, ~half populated, monthly and annual amounts
+
+Rows are bulk-inserted in batches and tagged `source_job_id = synthetic-<n>`
+so `--clear` removes exactly them. The derived columns (skills, canonical
+locations, annual salaries, rollups) are then filled by the pipeline's own
+stages, so pages see what a real run would produce.
+
+    python -m benchmarks seed --jobs 50000
+    python -m benchmarks seed --clear
+"""
+import logging
+import random
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert
+from app.models import db, Job
+from benchmarks import data
+
+logger = logging.getLogger(__name__)
+
+SEED_BATCH_SIZE = 5000
+SYNTHETIC_PREFIX = 'synthetic-'
+
+# source → share of rows
+SOURCE_MIX = {
+    'careers24': 0.38,
+    'adzuna_sa': 0.30,
+    'remotive': 0.14,
+    'adzuna_gb': 0.06,
+    'adzuna_us': 0.06,
+    'adzuna_au': 0.03,
+    'adzuna_ca': 0.03,
+}
+SA_LOCATIONS = {
+    'Johannesburg, Gauteng': 0.24, 'Sandton': 0.10, 'Pretoria': 0.14, 'Midrand, Gauteng': 0.05,
+    'Cape Town, Western Cape': 0.22, 'Stellenbosch': 0.03, 'Durban, KwaZulu-Natal': 0.09,
+    'Port Elizabeth': 0.04, 'Bloemfontein': 0.03, 'East London': 0.02, 'South Africa': 0.04,
+}
+REMOTIVE_LOCATIONS = {'Remote — Worldwide': 0.5, 'Remote — USA Only': 0.2, 'Remote — Europe': 0.2,
+                      'Remote — South Africa': 0.1}
+ROLE_MIX = {
+    'sa': {'Software Developer': 3, 'Data Analyst': 2, 'IT Support Technician': 3, 'Java Developer': 1,
+           'Python Developer': 1, 'QA Tester': 1, 'Web Designer': 1, 'Network Administrator': 1,
+           'Business Analyst': 1, 'Accountant': 2},
+    'global': {'Data Engineer': 3, 'Data Analyst': 3, 'Python Developer': 2, 'Cloud Engineer': 1,
+               'Software Developer': 2, 'QA Tester': 1},
+}
+WINDOW_DAYS = 150
+MEAN_AGE_DAYS = 25
+
+
+def _weighted(r: random.Random, weights: dict):
+    return r.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _posted(r: random.Random, today: date) -> date:
+    # Exponential age, folded into the display window
+    age = min(int(r.expovariate(1 / MEAN_AGE_DAYS)), WINDOW_DAYS + 20)
+    return today - timedelta(days=age)
+
+
+def _salary(r: random.Random, source: str):
+    if not source.startswith('adzuna') or r.random() < 0.5:
+        return None, None
+    if source == 'adzuna_sa':
+        if r.random() < 0.6:
+            low = r.choice(range(8000, 35000, 500))             # monthly ZAR
+        else:
+            low = r.choice(range(120000, 480000, 5000))         # annual ZAR
+    else:
+        low = r.choice(range(25000, 90000, 1000))               # annual local currency
+    return float(low), float(low * r.uniform(1.0, 1.4))
+
+
+def synthetic_job(n: int, r: random.Random, today: date) -> dict:
+    source = _weighted(r, SOURCE_MIX)
+    is_sa = source in ('careers24', 'adzuna_sa')
+    role = _weighted(r, ROLE_MIX['sa' if is_sa else 'global'])
+    level = r.choice(data.LEVELS)
+    if is_sa:
+        location = _weighted(r, SA_LOCATIONS)
+    elif source == 'remotive':
+        location = _weighted(r, REMOTIVE_LOCATIONS)
+    else:
+        country = source.split('_')[1].upper()
+        location = f'Remote ({country})' if r.random() < 0.6 else country
+    salary_min, salary_max = _salary(r, source)
+    posted = _posted(r, today)
+    return {
+        'source': source,
+        'source_job_id': f'{SYNTHETIC_PREFIX}{n}',
+        'title': f'{level} {role}',
+        'company': r.choice(data.COMPANIES),
+        'location': location,
+        'url': f'https://example.com/{source}/{n}',
+        'description': (
+            'Apply on Careers24' if source == 'careers24'
+            else data.description(r, sentences=r.randint(4, 14))
+        ),
+        'job_type': 'entry_level',
+        'posted_date': posted,
+        # Spread first-seen over the window so rollups/trends have history
+        'first_seen_at': datetime.combine(posted, time(8)),
+        'last_seen_at': datetime.combine(today, time(8)),
+        'is_active': posted >= today - timedelta(days=WINDOW_DAYS),
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+    }
+
+
+def existing_synthetic() -> int:
+    return Job.query.filter(Job.source_job_id.like(f'{SYNTHETIC_PREFIX}%')).count()
+
+
+def seed_jobs(count: int, seed: int = data.SEED, derive: bool = True,
+              batch_size: int = SEED_BATCH_SIZE) -> int:
+    """Bulk-inserts `count` synthetic jobs (continuing any earlier numbering)."""
+    r = random.Random(seed)
+    today = date.today()
+    start = existing_synthetic()
+    for offset in range(0, count, batch_size):
+        rows = [synthetic_job(start + n, r, today) for n in range(offset, min(offset + batch_size, count))]
+        db.session.execute(insert(Job), rows)
+        db.session.commit()
+        logger.info(f"🌱 Seeded {offset + len(rows)}/{count} jobs.")
+
+    if derive:
+        derive_columns()
+    return count
+
+
+def derive_columns() -> None:
+    """Runs the pipeline stages that fill derived columns/tables, then republishes the read snapshot."""
+    from ingestion.pipeline import (
+        link_duplicates, tag_skills, normalize_locations, normalize_salaries, update_rollups, publish_snapshot,
+    )
+    for stage in (link_duplicates, tag_skills, normalize_locations, normalize_salaries, update_rollups,
+                  publish_snapshot):
+        stage()
+
+
+def clear_synthetic(batch_size: int = 1000) -> int:
+    """Deletes every synthetic job (and its dependents) without archiving."""
+    from ingestion import archive
+    from ingestion.pipeline import delete_jobs, publish_snapshot
+    enabled, archive.ARCHIVE_ENABLED = archive.ARCHIVE_ENABLED, False
+    removed = 0
+    try:
+        while True:
+            ids = [
+                row.id for row in
+                db.session.query(Job.id)
+                .filter(Job.source_job_id.like(f'{SYNTHETIC_PREFIX}%'))
+                .limit(batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+            removed += delete_jobs(ids)
+            db.session.commit()
+    finally:
+        archive.ARCHIVE_ENABLED = enabled
+    publish_snapshot()
+    return removed
+
+
+def percent(part: int, whole: int) -> str:
+    return f'{part / whole:.0%}' if whole else '0%'
+
+
+def summarize() -> list:
+    """(source, jobs, share) rows for the synthetic data currently stored."""
+    total = existing_synthetic()
+    rows = (
+        db.session.query(Job.source, db.func.count(Job.id))
+        .filter(Job.source_job_id.like(f'{SYNTHETIC_PREFIX}%'))
+        .group_by(Job.source)
+        .order_by(db.func.count(Job.id).desc())
+        .all()
+    )
+    return [(source, count, percent(count, total)) for source, count in rows]
@@ -0,0 +1,244 @@
+"""
+benchmarks/suite.py
+
+The benchmark suite: cases, runner, JSON results and comparison.
+
+Each case times a fixed synthetic workload (see benchmarks/data.py) and
+reports the best of `repeat` runs, which is the most stable number on a
+noisy machine. Results are written as JSON together with the commit and
+interpreter they were measured on; `compare` diffs two result files and
+flags cases that got slower than the threshold.
+
+Cases:
+  utils.*        is_title_outdated, parse_relative_date(s), clean_text,
+                 prepare_description over generated titles/dates/descriptions
+  adzuna.*       is_entry_level / is_truly_remote on long descriptions
+  careers24.*    card parsing of saved (fixture) and generated result pages
+  etl.run_etl[N] the full run_etl (transform + load + every later stage)
+                 against a fresh SQLite file, extractors replaced by the
+                 replayers over N generated raw records — no HTTP
+"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+from benchmarks import data
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+RESULTS_DIR = os.path.join('data', 'benchmarks')
+
+
+class Case:
+    """One timed workload. `setup()` runs untimed before every repetition."""
+
+    def __init__(self, name, fn, ops, setup=None, teardown=None, repeat=None):
+        self.name = name
+        self.fn = fn
+        self.ops = ops
+        self.setup = setup
+        self.teardown = teardown
+        self.repeat = repeat
+
+    def run(self, repeat: int) -> dict:
+        best = float('inf')
+        repeat = self.repeat or repeat
+        for _ in range(repeat):
+            state = self.setup() if self.setup else None
+            try:
+                start = time.perf_counter()
+                self.fn(state)
+                best = min(best, time.perf_counter() - start)
+            finally:
+                if self.teardown:
+                    self.teardown(state)
+        return {
+            'seconds': best,
+            'ops': self.ops,
+            'us_per_op': best / self.ops * 1e6,
+            'repeat': repeat,
+        }
+
+
+# ── Cases ──────────────────────────────────────────────────────────────────
+
+def utils_cases() -> list:
+    from ingestion.utils import (
+        is_title_outdated, parse_relative_date, parse_relative_dates, clean_text, prepare_description,
+    )
+    titles = data.titles(10000)
+    dates = data.relative_dates(10000)
+    descriptions = data.descriptions(1000)
+    return [
+        Case('utils.is_title_outdated', lambda _: [is_title_outdated(t) for t in titles], len(titles)),
+        Case('utils.parse_relative_date', lambda _: [parse_relative_date(d) for d in dates], len(dates)),
+        Case('utils.parse_relative_dates[batch]', lambda _: parse_relative_dates(dates), len(dates)),
+        Case('utils.clean_text', lambda _: [clean_text(d) for d in descriptions], len(descriptions)),
+        Case('utils.prepare_description', lambda _: [prepare_description(d) for d in descriptions],
+             len(descriptions)),
+    ]
+
+
+def adzuna_cases() -> list:
+    from ingestion.extractors.adzuna import is_entry_level, is_truly_remote
+    items = data.adzuna_items(2000)
+    return [
+        Case('adzuna.is_entry_level', lambda _: [is_entry_level(i) for i in items], len(items)),
+        Case('adzuna.is_truly_remote', lambda _: [is_truly_remote(i) for i in items], len(items)),
+    ]
+
+
+def careers24_cases(pages_dir: str = None) -> list:
+    from benchmarks.bench_careers24_parse import load_pages
+    from ingestion.extractors.scraper import parse_careers24_page
+    saved = load_pages(pages_dir)
+    generated = data.careers24_pages(500)
+    return [
+        Case('careers24.parse_page[saved]', lambda _: [parse_careers24_page(p, set()) for p in saved], len(saved)),
+        Case('careers24.parse_page[generated]', lambda _: [parse_careers24_page(p, set()) for p in generated],
+             len(generated)),
+    ]
+
+
+def etl_case(size: int) -> Case:
+    """run_etl against a fresh SQLite file per repetition, extractors mocked."""
+    from app import create_app
+    from app.config import Config
+    from app.models import db
+    from ingestion import pipeline, archive, similarity, snapshot
+    from ingestion.extractors.adzuna import replay_adzuna
+    from ingestion.extractors.remotive import replay_remotive
+    from ingestion.extractors.scraper import replay_careers24
+
+    records = data.landed_records(size)
+
+    def setup():
+        workdir = tempfile.mkdtemp(prefix='bench-etl-')
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+        patches = [
+            mock.patch.object(pipeline, 'fetch_adzuna_jobs',
+                              lambda landing=None, countries=None: replay_adzuna(records['adzuna'])),
+            mock.patch.object(pipeline, 'scrape_careers24',
+                              lambda landing=None, pool=None: replay_careers24(records['careers24'], pool=pool)),
+            mock.patch.object(pipeline, 'fetch_remotive_jobs',
+                              lambda landing=None: replay_remotive(records['remotive'])),
+            mock.patch.object(pipeline, 'check_links', lambda: {}),     # no HTTP probes
+            mock.patch.object(pipeline, 'LANDING_ENABLED', False),
+            mock.patch.object(archive, 'ARCHIVE_DIR', os.path.join(workdir, 'archive')),
+            mock.patch.object(similarity, 'SIMILARITY_DIR', os.path.join(workdir, 'similarity')),
+            mock.patch.object(snapshot, 'SNAPSHOT_DIR', os.path.join(workdir, 'snapshot')),
+        ]
+        for patch in patches:
+            patch.start()
+        app = create_app(BenchConfig)
+        context = app.app_context()
+        context.push()
+        db.create_all()
+        return workdir, patches, context
+
+    def teardown(state):
+        workdir, patches, context = state
+        db.session.remove()
+        db.engine.dispose()
+        context.pop()
+        for patch in reversed(patches):
+            patch.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return Case(
+        f'etl.run_etl[{size}]', lambda _: pipeline.run_etl(), size,
+        setup=setup, teardown=teardown, repeat=None if size <= 1000 else 1,
+    )
+
+
+def collect_cases(sizes=DEFAULT_SIZES, pages_dir: str = None) -> list:
+    return (
+        utils_cases() + adzuna_cases() + careers24_cases(pages_dir)
+        + [etl_case(size) for size in sizes]
+    )
+
+
+# ── Results ────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def run_suite(cases, repeat: int = DEFAULT_REPEAT, only=None, log=print) -> dict:
+    results = {}
+    for case in cases:
+        if only and not any(pattern in case.name for pattern in only):
+            continue
+        results[case.name] = case.run(repeat)
+        r = results[case.name]
+        log(f"  {case.name:<34} {r['seconds'] * 1000:10.2f} ms  {r['us_per_op']:10.2f} µs/op  (×{r['ops']})")
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': data.SEED,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def save_results(report: dict, path: str = None) -> str:
+    if path is None:
+        stamp = report['meta']['created_at'].replace(':', '').replace('-', '')
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+    return path
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    [(name, baseline_seconds, candidate_seconds, ratio, verdict)] for cases
+    in both reports. verdict is 'regression' when the candidate is slower
+    than `threshold` (0.10 = 10%), 'improvement' when faster by as much.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        new = candidate['results'].get(name)
+        if new is None:
+            continue
+        ratio = new['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        if ratio > 1 + threshold:
+            verdict = 'regression'
+        elif ratio < 1 - threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'ok'
+        rows.append((name, base['seconds'], new['seconds'], ratio, verdict))
+    return rows
+
+
+def print_comparison(rows, baseline: dict, candidate: dict, out=sys.stdout) -> None:
+    out.write(f"baseline {baseline['meta']['commit']} → candidate {candidate['meta']['commit']}\n")
+    marks = {'regression': '❌ slower', 'improvement': '✅ faster', 'ok': ''}
+    for name, base, new, ratio, verdict in rows:
+        out.write(f"  {name:<34} {base * 1000:10.2f} → {new * 1000:10.2f} ms  {ratio:6.2f}x  {marks[verdict]}\n")
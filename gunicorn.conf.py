@@ -0,0 +1,28 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings, picked up automatically by `gunicorn run:app`.
+
+Workers are separate processes, so Prometheus metrics use the client's
+multiprocess mode: every worker writes samples to PROMETHEUS_MULTIPROC_DIR
+and /metrics merges them. The directory is wiped when the master starts
+and dead workers are marked so their live gauges drop out.
+"""
+import os
+import shutil
+
+# Must be set before workers import prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/jobtracker-metrics')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
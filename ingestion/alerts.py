@@ -0,0 +1,212 @@
+"""
+ingestion/alerts.py
+
+Saved-search alerts.
+
+Subscribers save free-text searches ("junior python durban"); each pipeline
+run matches the canonical jobs first seen since the last run against all
+of them. A job matches a search when every query term appears in the job's
+title or location (free text plus the resolved city/province, and "remote").
+
+Rather than testing every query against every job, searches are compiled
+into an inverted index (term → search ids) plus the number of distinct
+terms each search needs. Matching a job walks only the postings of the
+job's own terms and counts hits, so the cost is new jobs × matching
+postings and stays flat as saved searches grow into the thousands.
+
+Matches go to the `alert_outbox` table (one row per search/job, unique) and
+a delivery step drains undelivered rows. Delivery is a local stand-in:
+`console` logs a digest per search, `file` appends JSON lines to
+`ALERT_OUTBOX_FILE`.
+"""
+import json
+import logging
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from app.models import db, Job, SavedSearch, AlertOutbox, RollupWatermark
+from ingestion.locks import watermark_lock
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = 'alerts'
+MAX_SEARCH_TERMS = 8
+ALERT_DELIVERY = os.environ.get('ALERT_DELIVERY', 'console')   # console | file
+ALERT_OUTBOX_FILE = os.environ.get('ALERT_OUTBOX_FILE', os.path.join('data', 'alerts', 'outbox.jsonl'))
+ALERT_DELIVERY_BATCH = 1000
+
+_TERM_RE = re.compile(r'[a-z0-9][a-z0-9#+]*')
+STOPWORDS = frozenset('a an and at for in of on or the to with'.split())
+
+
+def query_terms(text: str) -> frozenset:
+    """Normalized, de-duplicated terms of a query or a job field."""
+    return frozenset(t for t in _TERM_RE.findall((text or '').lower()) if t not in STOPWORDS)
+
+
+def job_terms(title, location=None, city=None, province=None, is_remote=False) -> frozenset:
+    terms = set(query_terms(title))
+    for text in (location, city, province):
+        terms |= query_terms(text)
+    if is_remote:
+        terms.add('remote')
+    return frozenset(terms)
+
+
+class SearchIndex:
+    """Inverted index over saved-search terms."""
+
+    def __init__(self, searches):
+        """searches: iterable of (id, query, created_at)."""
+        self.postings = defaultdict(list)
+        self.required = {}
+        self.created_at = {}
+        for search_id, query, created_at in searches:
+            terms = query_terms(query)
+            if not terms:
+                continue
+            self.required[search_id] = len(terms)
+            self.created_at[search_id] = created_at
+            for term in terms:
+                self.postings[term].append(search_id)
+
+    def __len__(self):
+        return len(self.required)
+
+    def match(self, terms) -> list:
+        """Ids of the searches whose terms are all in `terms`."""
+        hits = Counter()
+        for term in terms:
+            for search_id in self.postings.get(term, ()):
+                hits[search_id] += 1
+        return [search_id for search_id, count in hits.items() if count == self.required[search_id]]
+
+
+def _advance_watermark(now: datetime) -> None:
+    db.session.merge(RollupWatermark(name=WATERMARK, value=now))
+
+
+def match_new_jobs(now: datetime = None) -> int:
+    """
+    Matches canonical jobs first seen since the last watermark against all
+    saved searches and queues the hits in the outbox. The first run only
+    starts the clock, so existing jobs are never alerted. Returns the
+    number of outbox rows written. Holds the watermark lock exclusively,
+    like the rollups.
+    """
+    with watermark_lock(exclusive=True):
+        return _match_since_watermark(now or datetime.utcnow())
+
+
+def _match_since_watermark(now: datetime) -> int:
+    since = db.session.get(RollupWatermark, WATERMARK)
+    if since is None:
+        _advance_watermark(now)
+        db.session.commit()
+        return 0
+
+    index = SearchIndex(db.session.query(SavedSearch.id, SavedSearch.query, SavedSearch.created_at).all())
+    if not len(index):
+        _advance_watermark(now)
+        db.session.commit()
+        return 0
+
+    new_jobs = (
+        db.session.query(
+            Job.id, Job.title, Job.location, Job.location_city, Job.location_province,
+            Job.is_remote, Job.first_seen_at,
+        )
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .filter(Job.first_seen_at > since.value)
+        .filter(Job.first_seen_at <= now)
+        .all()
+    )
+
+    matches = []
+    for job in new_jobs:
+        terms = job_terms(job.title, job.location, job.location_city, job.location_province, job.is_remote)
+        for search_id in index.match(terms):
+            # A search only hears about jobs that arrived after it was saved
+            created_at = index.created_at[search_id]
+            if created_at is None or job.first_seen_at >= created_at:
+                matches.append((search_id, job.id))
+
+    if matches:
+        queued = set(
+            db.session.query(AlertOutbox.search_id, AlertOutbox.job_id)
+            .filter(AlertOutbox.job_id.in_({job_id for _, job_id in matches}))
+            .all()
+        )
+        matches = [pair for pair in matches if pair not in queued]
+        db.session.add_all(
+            AlertOutbox(search_id=search_id, job_id=job_id, created_at=now) for search_id, job_id in matches
+        )
+
+    _advance_watermark(now)
+    db.session.commit()
+    logger.info(
+        f"🔔 Matched {len(new_jobs)} new jobs against {len(index)} saved searches: "
+        f"{len(matches)} alerts queued."
+    )
+    return len(matches)
+
+
+def _deliver_console(search, jobs) -> None:
+    lines = '\n'.join(f"    • {job['title']} — {job['company'] or 'Unknown'} ({job['url']})" for job in jobs)
+    logger.info(f"📬 {len(jobs)} new jobs for \"{search['query']}\" → {search['notify'] or 'no address'}\n{lines}")
+
+
+def _deliver_file(search, jobs) -> None:
+    os.makedirs(os.path.dirname(ALERT_OUTBOX_FILE) or '.', exist_ok=True)
+    with open(ALERT_OUTBOX_FILE, 'a', encoding='utf-8') as fh:
+        fh.write(json.dumps({'search': search, 'jobs': jobs}) + '\n')
+
+
+DELIVERY_BACKENDS = {
+    'console': _deliver_console,
+    'file': _deliver_file,
+}
+
+
+def deliver_alerts(batch_size: int = ALERT_DELIVERY_BATCH) -> int:
+    """
+    Drains undelivered outbox rows, one digest per saved search, and marks
+    them delivered. Returns the number of alerts delivered.
+    """
+    deliver = DELIVERY_BACKENDS[ALERT_DELIVERY]
+    delivered = 0
+
+    while True:
+        rows = (
+            db.session.query(
+                AlertOutbox.id, SavedSearch.id.label('search_id'), SavedSearch.query, SavedSearch.notify,
+                Job.title, Job.company, Job.url,
+            )
+            .join(SavedSearch, SavedSearch.id == AlertOutbox.search_id)
+            .join(Job, Job.id == AlertOutbox.job_id)
+            .filter(AlertOutbox.delivered_at.is_(None))
+            .order_by(AlertOutbox.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        digests = {}
+        for row in rows:
+            search = {'id': row.search_id, 'query': row.query, 'notify': row.notify}
+            digests.setdefault(row.search_id, (search, []))[1].append(
+                {'title': row.title, 'company': row.company, 'url': row.url}
+            )
+        for search, jobs in digests.values():
+            deliver(search, jobs)
+
+        AlertOutbox.query.filter(AlertOutbox.id.in_([row.id for row in rows])).update(
+            {'delivered_at': datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+        delivered += len(rows)
+
+    return delivered
@@ -0,0 +1,198 @@
+"""
+ingestion/archive.py
+
+Cold archive tier for retired jobs.
+
+Retention (`cleanup_old_jobs`) keeps the hot `jobs` table small for the
+free-tier database. Before any row is deleted, `delete_jobs` hands it here
+and it is written — with its skill tags — to an immutable, compressed part
+file partitioned by posting month:
+
+    data/archive/year=2026/month=03/part-20260719T101500Z-<n>.parquet
+
+Parquet (zstd) is used when pyarrow is installed, gzip JSONL otherwise;
+readers handle both. `monthly_counts` aggregates straight from the files,
+skipping partitions outside the requested range, so long-term trends never
+touch the database.
+"""
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from datetime import datetime
+from app.models import db, Job, JobSkill
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join('data', 'archive'))
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', '1') not in ('0', 'false', 'False')
+# 'auto' = parquet when pyarrow is installed, else jsonl
+ARCHIVE_FORMAT = os.environ.get('ARCHIVE_FORMAT', 'auto')
+ARCHIVE_BATCH_SIZE = 500
+
+ARCHIVE_COLUMNS = (
+    'id', 'source', 'source_job_id', 'title', 'company', 'location', 'url',
+    'description', 'salary_min', 'salary_max', 'job_type', 'posted_date',
+    'is_active', 'first_seen_at', 'last_seen_at', 'canonical_job_id',
+)
+
+_PARTITION_RE = re.compile(r'^year=(\d{4})$|^month=(\d{2})$')
+_part_counter = itertools.count()
+
+
+def _format(fmt: str = None) -> str:
+    fmt = fmt or ARCHIVE_FORMAT
+    if fmt == 'auto':
+        return 'parquet' if pq is not None else 'jsonl'
+    if fmt == 'parquet' and pq is None:
+        raise RuntimeError("ARCHIVE_FORMAT=parquet requires pyarrow")
+    return fmt
+
+
+def _month_of(record: dict) -> str:
+    """'YYYY-MM' partition key: posting month, else first-seen month."""
+    stamp = record.get('posted_date') or record.get('first_seen_at') or datetime.utcnow().isoformat()
+    return stamp[:7]
+
+
+def _serialize(job, skills: list, archived_at: str) -> dict:
+    record = {}
+    for column in ARCHIVE_COLUMNS:
+        value = getattr(job, column)
+        record[column] = value.isoformat() if hasattr(value, 'isoformat') else value
+    record['skills'] = sorted(skills)
+    record['archived_at'] = archived_at
+    return record
+
+
+def _write_part(directory: str, records: list, fmt: str, run_stamp: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{run_stamp}-{os.getpid()}-{next(_part_counter)}"
+    if fmt == 'parquet':
+        path = os.path.join(directory, name + '.parquet')
+        pq.write_table(pa.Table.from_pylist(records), path, compression='zstd')
+    else:
+        path = os.path.join(directory, name + '.jsonl.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as fh:
+            for record in records:
+                fh.write(json.dumps(record, default=str) + '\n')
+    return path
+
+
+def archive_jobs(ids: list, root: str = None, fmt: str = None) -> int:
+    """
+    Writes the given jobs (and their skill tags) to the archive, one new
+    part file per posting month. Raises on failure so the caller can
+    abort the deletion. Returns the number of rows archived.
+    """
+    if not ids:
+        return 0
+    root = root or ARCHIVE_DIR
+    fmt = _format(fmt)
+    now = datetime.utcnow()
+    archived_at, run_stamp = now.isoformat(), now.strftime('%Y%m%dT%H%M%SZ')
+
+    by_month = defaultdict(list)
+    for start in range(0, len(ids), ARCHIVE_BATCH_SIZE):
+        chunk = ids[start:start + ARCHIVE_BATCH_SIZE]
+        skills = defaultdict(list)
+        for job_id, skill in (
+            db.session.query(JobSkill.job_id, JobSkill.skill)
+            .filter(JobSkill.job_id.in_(chunk))
+            .all()
+        ):
+            skills[job_id].append(skill)
+        jobs = (
+            Job.query.options(db.undefer(Job.description))
+            .filter(Job.id.in_(chunk))
+            .all()
+        )
+        for job in jobs:
+            record = _serialize(job, skills.get(job.id, []), archived_at)
+            by_month[_month_of(record)].append(record)
+
+    archived = 0
+    for month, records in sorted(by_month.items()):
+        year, mm = month.split('-')
+        directory = os.path.join(root, f'year={year}', f'month={mm}')
+        _write_part(directory, records, fmt, run_stamp)
+        archived += len(records)
+
+    logger.info(f"🧊 Archived {archived} jobs to {root} ({fmt}).")
+    return archived
+
+
+def list_partitions(root: str = None, start: str = None, end: str = None) -> list:
+    """('YYYY-MM', directory) pairs within [start, end] (inclusive), oldest first."""
+    root = root or ARCHIVE_DIR
+    partitions = []
+    if not os.path.isdir(root):
+        return partitions
+    for year_dir in sorted(os.listdir(root)):
+        year = _PARTITION_RE.match(year_dir)
+        if not year or not year.group(1):
+            continue
+        for month_dir in sorted(os.listdir(os.path.join(root, year_dir))):
+            month = _PARTITION_RE.match(month_dir)
+            if not month or not month.group(2):
+                continue
+            key = f"{year.group(1)}-{month.group(2)}"
+            if (start and key < start) or (end and key > end):
+                continue
+            partitions.append((key, os.path.join(root, year_dir, month_dir)))
+    return partitions
+
+
+def _read_part(path: str, columns: list = None):
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise RuntimeError(f"Reading {path} requires pyarrow")
+        yield from pq.read_table(path, columns=columns).to_pylist()
+    elif path.endswith('.jsonl.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {c: record.get(c) for c in columns} if columns else record
+
+
+def iter_archive(root: str = None, start: str = None, end: str = None, columns: list = None):
+    """
+    Yields archived records from the partitions in range. A job archived
+    twice (a deletion that was rolled back and retried) is yielded once.
+    """
+    read_columns = sorted(set(columns) | {'id'}) if columns else None
+    seen = set()
+    for _, directory in list_partitions(root, start, end):
+        for name in sorted(os.listdir(directory)):
+            for record in _read_part(os.path.join(directory, name), read_columns):
+                if record['id'] in seen:
+                    continue
+                seen.add(record['id'])
+                yield record
+
+
+def monthly_counts(by: str = 'source', root: str = None, start: str = None, end: str = None) -> dict:
+    """
+    {'YYYY-MM': {key: jobs}} for `by` in ('source', 'skill', 'job_type'),
+    computed from the archive files only.
+    """
+    if by not in ('source', 'skill', 'job_type'):
+        raise ValueError(f"Unsupported archive dimension: {by}")
+    column = 'skills' if by == 'skill' else by
+    counts = defaultdict(lambda: defaultdict(int))
+    for record in iter_archive(root, start, end, columns=['posted_date', 'first_seen_at', column]):
+        keys = (record.get(column) or []) if by == 'skill' else [record.get(column) or 'unknown']
+        month = _month_of(record)
+        for key in keys:
+            counts[month][key] += 1
+    return {month: dict(values) for month, values in sorted(counts.items())}
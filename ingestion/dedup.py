@@ -0,0 +1,219 @@
+"""
+ingestion/dedup.py
+
+Cross-source near-duplicate detection with MinHash + LSH banding.
+
+The same posting often arrives through several feeds (Adzuna SA and
+Careers24, or several `adzuna_{country}` searches). Exact dedup on
+(source, source_job_id) can't see that, so after each load we:
+
+  1. Shingle the normalized title + company (optionally + description)
+     into character k-grams and compute a MinHash signature — only for
+     rows that don't have a stored signature yet.
+  2. Split every signature into bands and bucket rows by band hash;
+     only rows sharing a bucket are compared (sub-quadratic).
+  3. Confirm candidates by estimated Jaccard similarity and point the
+     newer row's `canonical_job_id` at the canonical (earliest) job.
+
+Duplicates are linked, never deleted — listing and stats queries filter on
+`canonical_job_id IS NULL`. Only active rows can be canonical: new rows
+are never linked to a deactivated job, and when a canonical is deleted or
+deactivated (age, dead link) its earliest live duplicate takes over.
+"""
+import logging
+import os
+import random
+import re
+import zlib
+from array import array
+from collections import defaultdict
+from app.models import db, Job, JobSignature
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM   = 64     # signature length
+LSH_BANDS  = 16     # 16 bands × 4 rows → candidate threshold ≈ 0.5
+SHINGLE_K  = 5      # character k-grams
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+DEDUP_INCLUDE_DESCRIPTION = os.environ.get('DEDUP_INCLUDE_DESCRIPTION', '0') in ('1', 'true', 'True')
+
+_ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures are persisted, so the permutations must never change
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_COMPANY_SUFFIXES = re.compile(r'\b(pty|ltd|limited|inc|llc|gmbh|plc|co|sa|za)\b')
+
+
+def normalize_text(title, company=None, description=None) -> str:
+    """Lowercased alphanumeric text used for shingling."""
+    company = _COMPANY_SUFFIXES.sub(' ', (company or '').lower())
+    parts = [title or '', company]
+    if DEDUP_INCLUDE_DESCRIPTION and description:
+        parts.append(description[:500])
+    text = ' '.join(parts).lower()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def shingles(text: str, k: int = SHINGLE_K) -> set:
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def minhash(shingle_set: set) -> list:
+    """MinHash signature: per permutation, the minimum hashed shingle."""
+    if not shingle_set:
+        return [_MAX_HASH] * NUM_PERM
+    hashed = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def signature_for(title, company=None, description=None) -> list:
+    return minhash(shingles(normalize_text(title, company, description)))
+
+
+def pack(signature: list) -> bytes:
+    return array('I', signature).tobytes()
+
+
+def unpack(blob: bytes) -> list:
+    sig = array('I')
+    sig.frombytes(blob)
+    return sig.tolist()
+
+
+def similarity(sig_a: list, sig_b: list) -> float:
+    """Estimated Jaccard similarity from two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def band_keys(signature: list) -> list:
+    return [
+        (band, tuple(signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]))
+        for band in range(LSH_BANDS)
+    ]
+
+
+class LSHIndex:
+    """In-memory banding index: band bucket → job ids."""
+
+    def __init__(self):
+        self._buckets = defaultdict(list)
+        self._signatures = {}
+
+    def add(self, job_id, signature) -> None:
+        self._signatures[job_id] = signature
+        for key in band_keys(signature):
+            self._buckets[key].append(job_id)
+
+    def query(self, signature, threshold: float = DEDUP_THRESHOLD) -> list:
+        """Ids whose estimated similarity to `signature` is ≥ threshold."""
+        candidates = set()
+        for key in band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        return [
+            job_id for job_id in candidates
+            if similarity(signature, self._signatures[job_id]) >= threshold
+        ]
+
+
+def link_near_duplicates(threshold: float = DEDUP_THRESHOLD) -> int:
+    """
+    Hashes rows without a signature, then links each of them to an earlier
+    near-duplicate's canonical job. Returns the number of rows linked.
+    """
+    description_col = Job.description if DEDUP_INCLUDE_DESCRIPTION else db.null()
+    new_rows = (
+        db.session.query(Job.id, Job.title, Job.company, description_col, Job.is_active)
+        .outerjoin(JobSignature, JobSignature.job_id == Job.id)
+        .filter(JobSignature.job_id.is_(None))
+        .order_by(Job.first_seen_at.asc(), Job.id.asc())
+        .all()
+    )
+    if not new_rows:
+        return 0
+
+    # Index every previously hashed active row (signatures only, no text
+    # reloaded): linking a live posting to a deactivated canonical would
+    # hide it, since listings only show canonical rows.
+    # `rank` records first-seen order so the earliest cluster wins ties.
+    index = LSHIndex()
+    canonical_of, rank = {}, {}
+    stored = (
+        db.session.query(JobSignature.job_id, JobSignature.signature, Job.canonical_job_id)
+        .join(Job, Job.id == JobSignature.job_id)
+        .filter(Job.is_active == True)
+        .order_by(Job.first_seen_at.asc(), Job.id.asc())
+        .all()
+    )
+    for job_id, blob, canonical_id in stored:
+        index.add(job_id, unpack(blob))
+        canonical_of[job_id] = canonical_id or job_id
+        rank[job_id] = len(rank)
+    # A duplicate whose canonical is no longer active stands for its cluster itself
+    for job_id, canonical_id in canonical_of.items():
+        if canonical_id not in rank:
+            canonical_of[job_id] = job_id
+
+    linked = 0
+    for job_id, title, company, description, is_active in new_rows:
+        signature = signature_for(title, company, description)
+        matches = index.query(signature, threshold)
+        canonical_id = job_id
+        if matches:
+            canonical_id = min(
+                (canonical_of[m] for m in matches),
+                key=lambda c: rank.get(c, len(rank)),
+            )
+            Job.query.filter_by(id=job_id).update(
+                {'canonical_job_id': canonical_id}, synchronize_session=False
+            )
+            linked += 1
+
+        if is_active:
+            canonical_of[job_id] = canonical_id
+            rank[job_id] = len(rank)
+            index.add(job_id, signature)
+        db.session.add(JobSignature(job_id=job_id, signature=pack(signature)))
+
+    db.session.commit()
+    logger.info(f"🔗 Hashed {len(new_rows)} new jobs, linked {linked} near-duplicates.")
+    return linked
+
+
+def release_canonicals(retired_ids: list) -> None:
+    """
+    Before canonical rows are deleted or deactivated, promote the earliest
+    surviving (preferably active) duplicate of each to canonical and
+    re-point the rest at it, so live duplicates don't vanish with it.
+    Does not commit.
+    """
+    if not retired_ids:
+        return
+    retired = set(retired_ids)
+    orphans = (
+        db.session.query(Job.id, Job.canonical_job_id)
+        .filter(Job.canonical_job_id.in_(retired_ids))
+        .order_by(Job.is_active.desc(), Job.first_seen_at.asc(), Job.id.asc())
+        .all()
+    )
+    promoted = {}
+    for job_id, old_canonical in orphans:
+        if job_id in retired:
+            continue
+        new_canonical = promoted.setdefault(old_canonical, job_id)
+        Job.query.filter_by(id=job_id).update(
+            {'canonical_job_id': None if new_canonical == job_id else new_canonical},
+            synchronize_session=False,
+        )
@@ -3,7 +3,9 @@ import os
 import time
 import logging
 from datetime import datetime, date
-from ingestion.utils import is_title_outdated
+from functools import partial
+from ingestion.utils import titles_outdated, utc_today
+from ingestion.parallel import transform_map
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +123,8 @@ SA_SEARCH_TERMS = [
 # GLOBAL SEARCH TERMS
 # ---------------------------------------------------------------------------
 GLOBAL_COUNTRIES = ['gb', 'us', 'au', 'de', 'nl', 'ca']
+# Every country a run can be sliced to ('za' selects the SA search below)
+ADZUNA_COUNTRIES = ['za'] + GLOBAL_COUNTRIES
 GLOBAL_SEARCH_TERMS = [
     'data engineer intern',
     'data engineer entry level',
@@ -155,7 +159,14 @@ SENIOR_KEYWORDS = [
 # Main extraction function
 # ---------------------------------------------------------------------------
 
-def fetch_adzuna_jobs():
+def fetch_adzuna_jobs(landing=None, countries=None):
+    """
+    Query Adzuna for SA + global entry-level roles.
+    When a `LandingZone` is given, every raw API response is persisted to it
+    before filtering so the run can be replayed later without HTTP.
+    `countries` limits the run to a slice of ADZUNA_COUNTRIES (default all);
+    the per-run cap applies to each call, i.e. to each slice.
+    """
     if not ADZUNA_APP_ID:
         logger.error("No Adzuna API keys found in environment. Skipping.")
         return []
@@ -165,29 +176,27 @@ def fetch_adzuna_jobs():
     # Increased cap now that retention is 5 months
     MAX_JOBS_PER_RUN = 100
 
-    # ── Part A: South Africa (targeted junior/graduate search) ────────────
-    logger.info("  - [SA] Fetching Junior/Graduate IT jobs...")
-    for term in SA_SEARCH_TERMS:
-        if len(all_jobs) >= MAX_JOBS_PER_RUN:
-            break
+    wanted = set(countries or ADZUNA_COUNTRIES)
 
-        results = query_adzuna(country='za', what=term, max_days_old=MAX_DAYS_OLD_SA)
-        for item in results:
-            title = item.get('title', '')
-            if is_title_outdated(title):
-                continue
+    # ── Part A: South Africa (targeted junior/graduate search) ────────────
+    if 'za' in wanted:
+        logger.info("  - [SA] Fetching Junior/Graduate IT jobs...")
+        for term in SA_SEARCH_TERMS:
+            if len(all_jobs) >= MAX_JOBS_PER_RUN:
+                break
 
-            if is_entry_level(item):
-                job = normalize(item, 'adzuna_sa', 'South Africa')
-                if job['source_job_id'] not in seen_ids:
-                    all_jobs.append(job)
-                    seen_ids.add(job['source_job_id'])
+            results = query_adzuna(country='za', what=term, max_days_old=MAX_DAYS_OLD_SA)
+            if landing is not None:
+                landing.append('adzuna', results, country='za', what=term, max_days_old=MAX_DAYS_OLD_SA)
+            _collect(all_jobs, seen_ids, transform_adzuna_results(results, 'za'))
 
-        time.sleep(0.2)
+            time.sleep(0.2)
 
     # ── Part B: Global remote ─────────────────────────────────────────────
     logger.info("  - [GLOBAL] Fetching Data Engineering Internships/Entry...")
     for country in GLOBAL_COUNTRIES:
+        if country not in wanted:
+            continue
         if len(all_jobs) >= MAX_JOBS_PER_RUN:
             break
         for term in GLOBAL_SEARCH_TERMS:
@@ -195,23 +204,66 @@ def fetch_adzuna_jobs():
                 break
 
             results = query_adzuna(country=country, what=term, max_days_old=MAX_DAYS_OLD_GLOBAL)
-            for item in results:
-                title = item.get('title', '')
-                if is_title_outdated(title):
-                    continue
-                if is_entry_level(item):
-                    is_remote = is_truly_remote(item)
-                    location_tag = f"Remote ({country.upper()})" if is_remote else f"{country.upper()}"
-                    job = normalize(item, f'adzuna_{country}', location_tag)
-                    if job['source_job_id'] not in seen_ids:
-                        all_jobs.append(job)
-                        seen_ids.add(job['source_job_id'])
+            if landing is not None:
+                landing.append('adzuna', results, country=country, what=term, max_days_old=MAX_DAYS_OLD_GLOBAL)
+            _collect(all_jobs, seen_ids, transform_adzuna_results(results, country))
             time.sleep(0.2)
 
     logger.info(f"  - Total Adzuna Jobs Found: {len(all_jobs)}")
     return all_jobs
 
 
+def replay_adzuna(records, pool=None):
+    """Re-run the Adzuna transform over landed records (no HTTP)."""
+    all_jobs = []
+    seen_ids = set()
+    tasks = [
+        (record.get('payload') or [], record.get('meta', {}).get('country', 'za'))
+        for record in records
+    ]
+    # Pool workers don't see reference_date(); hand them this run's "today"
+    for jobs in transform_map(partial(transform_adzuna_task, today=utc_today()), tasks, pool):
+        _collect(all_jobs, seen_ids, jobs)
+    return all_jobs
+
+
+def transform_adzuna_task(task, today=None):
+    """Transform-pool task: `(results, country)` → normalized jobs."""
+    results, country = task
+    return transform_adzuna_results(results, country, today)
+
+
+def _collect(all_jobs, seen_ids, jobs):
+    for job in jobs:
+        if job['source_job_id'] not in seen_ids:
+            all_jobs.append(job)
+            seen_ids.add(job['source_job_id'])
+
+
+def transform_adzuna_results(results, country, today=None):
+    """
+    Filter + normalize one page of raw Adzuna results for `country`.
+    'za' results become `adzuna_sa`; everything else `adzuna_{country}`
+    with a remote-aware location tag. `today` defaults to `utc_today()`.
+    """
+    jobs = []
+    current_year = (today or utc_today()).year
+    outdated = titles_outdated([item.get('title', '') for item in results], current_year)
+    for item, is_outdated in zip(results, outdated):
+        if is_outdated:
+            continue
+        if not is_entry_level(item):
+            continue
+
+        if country == 'za':
+            jobs.append(normalize(item, 'adzuna_sa', 'South Africa'))
+        else:
+            is_remote = is_truly_remote(item)
+            location_tag = f"Remote ({country.upper()})" if is_remote else f"{country.upper()}"
+            jobs.append(normalize(item, f'adzuna_{country}', location_tag))
+    return jobs
+
+
 def query_adzuna(country, what, max_days_old=7):
     """Makes a single request to the Adzuna API and returns results."""
     try:
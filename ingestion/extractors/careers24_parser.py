@@ -0,0 +1,99 @@
+"""
+ingestion/extractors/careers24_parser.py
+
+Selective HTML parsing for Careers24 search result pages.
+
+Only job-card subtrees are built (SoupStrainer), so navigation, footers and
+inline scripts never become Python objects. The fastest installed parser
+backend is used (`lxml` when available, otherwise the stdlib `html.parser`),
+and every card field is pulled out in a single walk over the card.
+"""
+import os
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+
+CARD_CLASSES = {'job-card', 'c24-job-card'}
+
+# Maximum cards processed per results page (0 = every card). The crawler
+# pages through results, so a cap here would silently skip listings.
+MAX_CARDS_PER_PAGE = int(os.environ.get('CAREERS24_MAX_CARDS', 0))
+
+# <span class="..."> → field name
+SPAN_FIELDS = {
+    'job-card-title': 'title_span',
+    'job-card-company': 'company',
+    'job-card-location': 'location',
+    'job-card-date': 'date',
+}
+
+
+def _has_card_class(value) -> bool:
+    # During parsing the class attribute is still the raw "a b c" string
+    if not value:
+        return False
+    tokens = value.split() if isinstance(value, str) else value
+    return any(token in CARD_CLASSES for token in tokens)
+
+
+CARD_STRAINER = SoupStrainer(class_=_has_card_class)
+
+
+def _detect_backend() -> str:
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+PARSER_BACKEND = os.environ.get('HTML_PARSER') or _detect_backend()
+
+
+def parse_cards(html: str, parser: str = None, limit: int = None) -> list:
+    """
+    Returns the job-card tags on a results page, preferring `div.job-card`
+    and falling back to `.c24-job-card` (same precedence as the old scraper).
+    """
+    soup = BeautifulSoup(html, parser or PARSER_BACKEND, parse_only=CARD_STRAINER)
+
+    cards = soup.find_all('div', class_='job-card')
+    if not cards:
+        cards = soup.select('.c24-job-card')
+
+    limit = MAX_CARDS_PER_PAGE if limit is None else limit
+    return cards[:limit] if limit else cards
+
+
+def extract_card_fields(card) -> dict:
+    """
+    Single pass over a card's descendants collecting the raw (uncleaned)
+    text of every field the scraper needs. Missing fields are None.
+    Raises KeyError for a link without an href, like the old scraper did.
+    """
+    fields = {
+        'h3': None, 'title_span': None, 'company': None,
+        'location': None, 'date': None, 'closing': None, 'href': None,
+    }
+    link_seen = False
+
+    for node in card.descendants:
+        if isinstance(node, NavigableString):
+            if fields['closing'] is None and 'closing date' in node.lower():
+                fields['closing'] = str(node)
+            continue
+
+        name = node.name
+        if name == 'h3':
+            if fields['h3'] is None:
+                fields['h3'] = node.get_text()
+        elif name == 'a':
+            if not link_seen:
+                link_seen = True
+                fields['href'] = node['href']
+        elif name == 'span':
+            for cls in node.get('class') or ():
+                key = SPAN_FIELDS.get(cls)
+                if key and fields[key] is None:
+                    fields[key] = node.get_text()
+
+    fields['title'] = fields['h3'] if fields['h3'] is not None else fields['title_span']
+    return fields
@@ -10,6 +10,7 @@ junior/entry-level data and software roles that accept international candidates.
 import requests
 import logging
 from datetime import datetime, date
+from ingestion.parallel import transform_map
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ SENIOR_KEYWORDS = [
 ]
 
 
-def fetch_remotive_jobs():
+def fetch_remotive_jobs(landing=None):
     """
     Pulls entry-level remote jobs from the Remotive API.
     Returns a list of job dicts matching our Job model schema.
@@ -63,30 +64,57 @@ def fetch_remotive_jobs():
             logger.warning(f"Remotive request failed for category={category}: {e}")
             continue
 
-        for item in jobs_raw:
-            job_id = str(item.get('id', ''))
-            if not job_id or job_id in seen_ids:
-                continue
+        if landing is not None:
+            landing.append('remotive', jobs_raw, category=category)
+        all_jobs.extend(transform_remotive_results(jobs_raw, seen_ids))
 
-            title = item.get('title', '')
-            description = item.get('description', '')
-            combined = (title + ' ' + description).lower()
+    logger.info(f"  - Total Remotive Jobs Found: {len(all_jobs)}")
+    return all_jobs
 
-            # Apply entry-level + senior filters
-            if any(k in combined for k in SENIOR_KEYWORDS):
-                continue
-            if not any(k in combined for k in ENTRY_KEYWORDS):
-                continue
 
-            job = normalize_remotive(item)
-            if job:
+def replay_remotive(records, pool=None):
+    """Re-run the Remotive transform over landed records (no HTTP)."""
+    all_jobs = []
+    seen_ids = set()
+    payloads = [record.get('payload') or [] for record in records]
+    for jobs in transform_map(transform_remotive_task, payloads, pool):
+        for job in jobs:
+            if job['source_job_id'] not in seen_ids:
                 all_jobs.append(job)
-                seen_ids.add(job_id)
-
-    logger.info(f"  - Total Remotive Jobs Found: {len(all_jobs)}")
+                seen_ids.add(job['source_job_id'])
     return all_jobs
 
 
+def transform_remotive_task(jobs_raw):
+    """Transform-pool task: one category's raw results → normalized jobs."""
+    return transform_remotive_results(jobs_raw, set())
+
+
+def transform_remotive_results(jobs_raw, seen_ids):
+    """Apply the entry-level/senior filters and normalize one category's results."""
+    jobs = []
+    for item in jobs_raw:
+        job_id = str(item.get('id', ''))
+        if not job_id or job_id in seen_ids:
+            continue
+
+        title = item.get('title', '')
+        description = item.get('description', '')
+        combined = (title + ' ' + description).lower()
+
+        # Apply entry-level + senior filters
+        if any(k in combined for k in SENIOR_KEYWORDS):
+            continue
+        if not any(k in combined for k in ENTRY_KEYWORDS):
+            continue
+
+        job = normalize_remotive(item)
+        if job:
+            jobs.append(job)
+            seen_ids.add(job_id)
+    return jobs
+
+
 def parse_remotive_date(date_str: str) -> date:
     """Parse Remotive's publication date string to a date object."""
     if not date_str:
@@ -117,7 +145,7 @@ def normalize_remotive(item) -> dict | None:
         'company': company,
         'location': f"Remote — {location_hint}",
         'url': url,
-        'description': item.get('description', '')[:500],  # cap description size
+        'description': item.get('description', ''),  # HTML stripped + capped at load
         'job_type': 'entry_level',
         'posted_date': parse_remotive_date(item.get('publication_date', '')),
         'is_active': True,
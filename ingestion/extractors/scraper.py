@@ -1,83 +1,223 @@
+import os
 import requests
-from bs4 import BeautifulSoup
-import time
-from datetime import datetime
-from ingestion.utils import clean_text, parse_relative_date, is_date_valid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from ingestion.utils import clean_text, parse_relative_dates, is_date_valid, utc_today
+from ingestion.extractors.careers24_parser import parse_cards, extract_card_fields
+from ingestion.parallel import transform_map
+from ingestion.ratelimit import HostRateLimiter
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-SEARCH_URLS = [
-    "https://www.careers24.com/jobs/lc-south-africa/kw-software-developer/?sort=dateposted",
-    "https://www.careers24.com/jobs/lc-south-africa/kw-data/?sort=dateposted",
-    "https://www.careers24.com/jobs/lc-south-africa/kw-graduate/?sort=dateposted",
-    "https://www.careers24.com/jobs/lc-south-africa/kw-intern/?sort=dateposted"
+SEARCH_URL_TEMPLATE = "https://www.careers24.com/jobs/lc-south-africa/kw-{keyword}/?sort=dateposted"
+
+# Keyword slugs crawled on Careers24 (override with CAREERS24_KEYWORDS=a,b,c)
+DEFAULT_KEYWORDS = [
+    'software-developer',
+    'data',
+    'graduate',
+    'intern',
+    'junior-developer',
+    'ict-graduate',
+    'it-support',
+    'data-analyst',
+    'learnership',
 ]
+KEYWORDS = [
+    k.strip() for k in os.environ.get('CAREERS24_KEYWORDS', '').split(',') if k.strip()
+] or DEFAULT_KEYWORDS
+
+MAX_PAGES_PER_KEYWORD = int(os.environ.get('CAREERS24_MAX_PAGES', 5))
+FETCH_CONCURRENCY     = int(os.environ.get('CAREERS24_CONCURRENCY', 4))
+MIN_REQUEST_INTERVAL  = float(os.environ.get('CAREERS24_MIN_INTERVAL', 0.5))  # seconds, per host
+DATE_WINDOW_DAYS      = 60
+# Pages per wave needed before parsing is shipped to the transform pool
+PAGE_POOL_MIN_ITEMS   = int(os.environ.get('CAREERS24_POOL_MIN_PAGES', 4))
+
+
+def build_search_url(keyword, page=1):
+    url = SEARCH_URL_TEMPLATE.format(keyword=keyword)
+    return url if page == 1 else f"{url}&page={page}"
+
 
-def scrape_careers24():
+def _fetch_page(session, limiter, url):
+    """GET one results page under the per-host rate limit. Returns (status, html)."""
+    limiter.wait(url)
+    # Added a timeout so the server doesn't hang if Careers24 is slow
+    response = session.get(url, headers=HEADERS, timeout=10)
+    return response.status_code, response.text
+
+
+def scrape_careers24(landing=None, keywords=None, max_pages=None, pool=None):
+    """
+    Crawls keyword × page result listings.
+
+    Pages are fetched in waves: page N of every still-active keyword is
+    requested concurrently (rate limited per host), then parsed — on the
+    transform `pool` when one is given — and deduped in keyword order so
+    `seen_ids` stays deterministic. A keyword stops paging once a page is
+    empty or contains cards older than the date window — results are
+    sorted by date, so later pages would only be older.
+    """
     print("  - Scraping Careers24 (Checking Dates)...")
+    keywords = list(keywords or KEYWORDS)
+    max_pages = max_pages or MAX_PAGES_PER_KEYWORD
     all_jobs = []
     seen_ids = set()
+    limiter = HostRateLimiter(MIN_REQUEST_INTERVAL)
+    # Pool workers don't see reference_date(); hand them this run's "today"
+    parse_task = partial(parse_page_task, today=utc_today())
 
-    for url in SEARCH_URLS:
-        try:
-            # Added a timeout so the server doesn't hang if Careers24 is slow
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            if response.status_code != 200: continue
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            job_cards = soup.find_all('div', class_='job-card') 
-            if not job_cards: job_cards = soup.select('.c24-job-card')
-
-            # SPEED LIMIT: Only process the first 15 cards per page
-            for card in job_cards[:15]:
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as fetchers:
+        active = keywords
+        for page in range(1, max_pages + 1):
+            if not active:
+                break
+            urls = [build_search_url(keyword, page) for keyword in active]
+            futures = [fetchers.submit(_fetch_page, session, limiter, url) for url in urls]
+
+            fetched = []
+            for keyword, url, future in zip(active, urls, futures):
                 try:
-                    date_text = ""
-                    closing_date_tag = card.find(string=lambda text: text and "closing date" in text.lower())
-                    
-                    if closing_date_tag:
-                        clean_str = clean_text(closing_date_tag).lower().replace('closing date:', '').strip()
-                        job_date = parse_relative_date(clean_str)
-                        if job_date < datetime.utcnow().date(): continue 
-                    else:
-                        date_tag = card.find('span', class_='job-card-date')
-                        date_text = date_tag.text if date_tag else "Today"
-                        job_date = parse_relative_date(date_text)
-                        if not is_date_valid(job_date, max_age_days=60): continue
-
-                    title_tag = card.find('h3') or card.find('span', class_='job-card-title')
-                    title = clean_text(title_tag.text) if title_tag else "Unknown"
-                    
-                    if 'senior' in title.lower() or 'lead' in title.lower(): continue
-
-                    link_tag = card.find('a')
-                    relative_link = link_tag['href'] if link_tag else ""
-                    source_id = relative_link.split('-')[-1].replace('/', '')
-                    
-                    if source_id in seen_ids: continue
-                    seen_ids.add(source_id)
-
-                    job = {
-                        'source': 'careers24',
-                        'source_job_id': source_id,
-                        'title': title,
-                        'company': clean_text(card.find('span', class_='job-card-company').text) if card.find('span', class_='job-card-company') else "Unknown",
-                        'location': clean_text(card.find('span', class_='job-card-location').text) if card.find('span', class_='job-card-location') else "SA",
-                        'url': f"https://www.careers24.com{relative_link}",
-                        'description': "Apply on Careers24",
-                        'job_type': 'entry_level',
-                        'posted_date': job_date,
-                        'is_active': True
-                    }
-                    all_jobs.append(job)
-
-                except Exception:
+                    status, html = future.result()
+                except Exception as e:
+                    print(f"Error: {e}")
                     continue
-            time.sleep(0.5)
 
-        except Exception as e:
-            print(f"Error: {e}")
+                if landing is not None:
+                    landing.append('careers24', html, url=url, status=status, keyword=keyword, page=page)
+                if status != 200: continue
+                fetched.append((keyword, html))
+
+            parsed = transform_map(parse_task, [html for _, html in fetched], pool, PAGE_POOL_MIN_ITEMS)
+
+            still_active = []
+            for (keyword, _), (jobs, stats) in zip(fetched, parsed):
+                _collect(all_jobs, seen_ids, jobs)
+                if stats['cards'] and not stats['stale']:
+                    still_active.append(keyword)
+            active = still_active
 
     print(f"  - Total Valid Careers24 jobs: {len(all_jobs)}")
-    return all_jobs
\ No newline at end of file
+    return all_jobs
+
+
+def probe_careers24(keywords=None):
+    """
+    Cheap change probe for the scheduler: parses page 1 of every keyword
+    (one request each instead of up to MAX_PAGES_PER_KEYWORD). Results are
+    sorted by date, so a new posting shows up on its keyword's first page.
+    Raises when a page can't be fetched, so a failed probe never looks
+    like an unchanged listing.
+    """
+    keywords = list(keywords or KEYWORDS)
+    limiter = HostRateLimiter(MIN_REQUEST_INTERVAL)
+    jobs = []
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as fetchers:
+        urls = [build_search_url(keyword) for keyword in keywords]
+        futures = [fetchers.submit(_fetch_page, session, limiter, url) for url in urls]
+        for url, future in zip(urls, futures):
+            status, html = future.result()
+            if status != 200:
+                raise RuntimeError(f"Careers24 probe got HTTP {status} for {url}")
+            jobs.extend(parse_page_task(html)[0])
+    return jobs
+
+
+def replay_careers24(records, pool=None):
+    """Re-parse landed Careers24 pages (no HTTP)."""
+    all_jobs = []
+    seen_ids = set()
+    pages = [
+        record.get('payload') or '' for record in records
+        if record.get('meta', {}).get('status') == 200
+    ]
+    parse_task = partial(parse_page_task, today=utc_today())
+    for jobs, _ in transform_map(parse_task, pages, pool, PAGE_POOL_MIN_ITEMS):
+        _collect(all_jobs, seen_ids, jobs)
+    return all_jobs
+
+
+def parse_page_task(html, today=None):
+    """Transform-pool task: parse one page in isolation → (jobs, stats)."""
+    stats = {}
+    jobs = parse_careers24_page(html, set(), stats=stats, today=today)
+    return jobs, stats
+
+
+def _collect(all_jobs, seen_ids, jobs):
+    for job in jobs:
+        if job['source_job_id'] not in seen_ids:
+            all_jobs.append(job)
+            seen_ids.add(job['source_job_id'])
+
+
+def parse_careers24_page(html, seen_ids, parser=None, stats=None, today=None):
+    """
+    Extract valid job dicts from one Careers24 search results page.
+    If a `stats` dict is passed it receives `cards` (cards examined) and
+    `stale` (cards posted outside the date window), used to stop paging.
+    `today` defaults to `utc_today()`.
+    """
+    jobs = []
+    today = today or utc_today()
+    cards = parse_cards(html, parser=parser)
+    stale = 0
+
+    # Pull every card's fields first so the page's date strings parse as one batch
+    card_fields, date_texts = [], []
+    for card in cards:
+        try:
+            fields = extract_card_fields(card)
+            if fields['closing'] is not None:
+                date_text = clean_text(fields['closing']).lower().replace('closing date:', '').strip()
+            else:
+                date_text = fields['date'] if fields['date'] is not None else "Today"
+        except Exception:
+            continue
+        card_fields.append(fields)
+        date_texts.append(date_text)
+    job_dates = parse_relative_dates(date_texts, today)
+
+    for fields, job_date in zip(card_fields, job_dates):
+        try:
+            if fields['closing'] is not None:
+                if job_date < today: continue
+            else:
+                if not is_date_valid(job_date, max_age_days=DATE_WINDOW_DAYS, today=today):
+                    stale += 1
+                    continue
+
+            title = clean_text(fields['title']) if fields['title'] is not None else "Unknown"
+            title_lower = title.lower()
+            if 'senior' in title_lower or 'lead' in title_lower: continue
+
+            relative_link = fields['href'] or ""
+            source_id = relative_link.split('-')[-1].replace('/', '')
+
+            if source_id in seen_ids: continue
+            seen_ids.add(source_id)
+
+            job = {
+                'source': 'careers24',
+                'source_job_id': source_id,
+                'title': title,
+                'company': clean_text(fields['company']) if fields['company'] is not None else "Unknown",
+                'location': clean_text(fields['location']) if fields['location'] is not None else "SA",
+                'url': f"https://www.careers24.com{relative_link}",
+                'description': "Apply on Careers24",
+                'job_type': 'entry_level',
+                'posted_date': job_date,
+                'is_active': True
+            }
+            jobs.append(job)
+
+        except Exception:
+            continue
+
+    if stats is not None:
+        stats['cards'] = len(cards)
+        stats['stale'] = stale
+    return jobs
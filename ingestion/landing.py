@@ -0,0 +1,158 @@
+"""
+ingestion/landing.py
+
+Raw payload landing zone.
+
+Every extractor hands its untouched upstream response (Adzuna/Remotive JSON,
+Careers24 HTML) to a `LandingZone` before normalizing it. Each pipeline run
+gets its own directory with one append-only `<source>.jsonl.gz` file per
+source, where every line is:
+
+    {"source": ..., "fetched_at": ..., "meta": {...request params...}, "payload": ...}
+
+A stored run can later be replayed through transform + load without any
+HTTP (see `ingestion.pipeline.replay_run`), which makes changes to the
+filters/normalizers cheap to verify and gives a fixed input for benchmarks.
+
+Sliced runs (`run --source`, the scheduler) land under a suffixed run id,
+`<timestamp>-<shard>` (e.g. `20260719T101500Z-adzuna-gb-us`). Retention keeps
+the newest LANDING_KEEP_RUNS runs of each shard, so an hourly Remotive
+shard can't push the daily Adzuna and Careers24 landings out.
+"""
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+LANDING_DIR = os.environ.get('LANDING_DIR', os.path.join('data', 'landing'))
+LANDING_ENABLED = os.environ.get('LANDING_ENABLED', '1') not in ('0', 'false', 'False')
+LANDING_KEEP_RUNS = int(os.environ.get('LANDING_KEEP_RUNS', 14))
+
+RUN_ID_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def new_run_id() -> str:
+    """UTC timestamp id, sortable lexicographically (e.g. 20260719T101500Z)."""
+    return datetime.utcnow().strftime(RUN_ID_FORMAT)
+
+
+def shard_of(run_id: str) -> str:
+    """The shard suffix of a run id ('' for a full run)."""
+    return run_id.partition('-')[2]
+
+
+class LandingZone:
+    """Append-only, gzip-compressed JSONL store for one pipeline run."""
+
+    def __init__(self, run_id: str = None, root: str = None):
+        self.root = root or LANDING_DIR
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(self.root, self.run_id)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, run_id: str = 'latest', root: str = None) -> 'LandingZone':
+        """
+        Open an existing run for reading. `run_id='latest'` picks the newest
+        single run, whatever its shard (see `latest_runs` for all of them).
+        """
+        root = root or LANDING_DIR
+        if run_id == 'latest':
+            runs = list_runs(root)
+            if not runs:
+                raise FileNotFoundError(f"No landed runs found in {root}")
+            run_id = runs[-1]
+        zone = cls(run_id=run_id, root=root)
+        if not os.path.isdir(zone.path):
+            raise FileNotFoundError(f"Landed run not found: {zone.path}")
+        return zone
+
+    def _source_file(self, source: str) -> str:
+        return os.path.join(self.path, f"{source}.jsonl.gz")
+
+    def append(self, source: str, payload, **meta) -> None:
+        """
+        Persist one raw upstream response. Never raises — landing is a
+        side-channel and must not break extraction.
+        """
+        record = {
+            'source': source,
+            'fetched_at': datetime.utcnow().isoformat(),
+            'meta': meta,
+            'payload': payload,
+        }
+        try:
+            line = (json.dumps(record, default=str) + '\n').encode('utf-8')
+            with self._lock:
+                os.makedirs(self.path, exist_ok=True)
+                # Each append writes a new gzip member; gzip readers
+                # transparently concatenate members, so the file stays valid.
+                with gzip.open(self._source_file(source), 'ab') as fh:
+                    fh.write(line)
+        except Exception as e:
+            logger.warning(f"Landing write failed for source={source}: {e}")
+
+    def sources(self) -> list:
+        """Sources that have at least one landed record in this run."""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            name[:-len('.jsonl.gz')]
+            for name in os.listdir(self.path)
+            if name.endswith('.jsonl.gz')
+        )
+
+    def read(self, source: str):
+        """Yield landed records for `source` in the order they were written."""
+        path = self._source_file(source)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def list_runs(root: str = None) -> list:
+    """All landed run ids under `root`, oldest first."""
+    root = root or LANDING_DIR
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if os.path.isdir(os.path.join(root, name))
+    )
+
+
+def latest_runs(root: str = None) -> list:
+    """
+    The newest run of every shard, oldest first, leaving out shards whose
+    newest run predates the newest full run (which covers every source).
+    """
+    newest = {}
+    for run_id in list_runs(root):
+        newest[shard_of(run_id)] = run_id
+    full = newest.get('', '')
+    return sorted(run_id for run_id in newest.values() if run_id >= full)
+
+
+def prune_runs(keep: int = LANDING_KEEP_RUNS, root: str = None) -> int:
+    """Delete all but the newest `keep` runs of each shard. Returns the number removed."""
+    by_shard = {}
+    for run_id in list_runs(root):
+        by_shard.setdefault(shard_of(run_id), []).append(run_id)
+    stale = [
+        run_id for runs in by_shard.values()
+        for run_id in (runs[:-keep] if keep > 0 else runs)
+    ]
+    for run_id in stale:
+        shutil.rmtree(os.path.join(root or LANDING_DIR, run_id), ignore_errors=True)
+    if stale:
+        logger.info(f"🗄️ Pruned {len(stale)} old landing runs.")
+    return len(stale)
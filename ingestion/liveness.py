@@ -0,0 +1,159 @@
+"""
+ingestion/liveness.py
+
+Link liveness checker.
+
+Adzuna `redirect_url` links (and Careers24/Remotive postings) expire long
+before the age-based retention catches them, leaving ghost jobs in the
+listings. Each run probes a bounded slice of active jobs — never-checked
+rows first, then the least recently checked, oldest postings first — with
+concurrent, per-host rate-limited HEAD requests (GET when HEAD isn't
+allowed), and deactivates rows whose link answers 404/410 or redirects to
+a "job not found"/expired page or a bare listing page (a different path,
+with no job identifier left in the query).
+
+Every probed row gets `last_checked_at`, so successive runs rotate through
+the table instead of re-probing the same jobs. Network errors and 5xx/429
+answers are inconclusive: the row is stamped but left active.
+"""
+import logging
+import os
+import re
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlsplit
+from sqlalchemy import or_
+from app.models import db, Job
+from ingestion.dedup import release_canonicals
+from ingestion.locks import watermark_lock
+from ingestion.ratelimit import HostRateLimiter
+from ingestion.extractors.scraper import HEADERS
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_MAX_PROBES   = int(os.environ.get('LIVENESS_MAX_PROBES', 200))    # per run; 0 = stage off
+LIVENESS_CONCURRENCY  = int(os.environ.get('LIVENESS_CONCURRENCY', 8))
+LIVENESS_MIN_INTERVAL = float(os.environ.get('LIVENESS_MIN_INTERVAL', 0.5))  # seconds, per host
+LIVENESS_RECHECK_HOURS = int(os.environ.get('LIVENESS_RECHECK_HOURS', 24))
+LIVENESS_TIMEOUT = 10
+
+ALIVE, DEAD, UNKNOWN = 'alive', 'dead', 'unknown'
+
+DEAD_STATUSES = {404, 410}
+# Servers that reject HEAD outright; retried with a streamed GET
+HEAD_REJECTED = {403, 405, 501}
+# Final URLs (after redirects) that mean the posting is gone
+DEAD_REDIRECT_PATTERN = re.compile(
+    r'not[-_]?found|expired|no[-_]?longer[-_]?available|vacancy[-_]?closed'
+    r'|adzuna\.[a-z.]+/search',
+    re.IGNORECASE,
+)
+# Bare listing pages a removed posting bounces back to...
+LISTING_PATH_PATTERN = re.compile(r'/(jobs|careers|vacancies)/?$', re.IGNORECASE)
+# ...unless a query parameter still names the job (embedded ATS boards: ?gh_jid=123)
+JOB_ID_PARAM_PATTERN = re.compile(r'id$|job|vacanc|posting|req', re.IGNORECASE)
+
+
+def is_listing_redirect(original_url: str, final_url: str) -> bool:
+    """True when a redirect left the posting for a bare job listing page."""
+    final = urlsplit(final_url)
+    if not LISTING_PATH_PATTERN.search(final.path):
+        return False
+    if original_url and urlsplit(original_url).path.rstrip('/') == final.path.rstrip('/'):
+        return False
+    return not any(JOB_ID_PARAM_PATTERN.search(key) for key, _ in parse_qsl(final.query))
+
+
+def classify_response(status: int, final_url: str = '', redirected: bool = False,
+                      original_url: str = '') -> str:
+    """Maps a probe's outcome to ALIVE, DEAD or UNKNOWN."""
+    if status in DEAD_STATUSES:
+        return DEAD
+    if redirected and final_url and (
+            DEAD_REDIRECT_PATTERN.search(final_url) or is_listing_redirect(original_url, final_url)):
+        return DEAD
+    if 200 <= status < 400:
+        return ALIVE
+    return UNKNOWN
+
+
+def probe_url(session, limiter, url: str) -> str:
+    """HEAD (falling back to GET) one job link under the per-host rate limit."""
+    try:
+        limiter.wait(url)
+        response = session.head(url, headers=HEADERS, timeout=LIVENESS_TIMEOUT, allow_redirects=True)
+        if response.status_code in HEAD_REJECTED:
+            limiter.wait(url)
+            # stream=True: only the status line and headers are read
+            response = session.get(url, headers=HEADERS, timeout=LIVENESS_TIMEOUT,
+                                   allow_redirects=True, stream=True)
+            response.close()
+        return classify_response(response.status_code, response.url, bool(response.history), url)
+    except requests.RequestException as e:
+        logger.debug(f"Liveness probe failed for {url}: {e}")
+        return UNKNOWN
+
+
+def select_candidates(limit: int, recheck_hours: int = LIVENESS_RECHECK_HOURS) -> list:
+    """
+    Active jobs due for a check: never checked first, then least recently
+    checked; oldest postings first within each. Returns (id, url) rows.
+    """
+    due_before = datetime.utcnow() - timedelta(hours=recheck_hours)
+    return (
+        db.session.query(Job.id, Job.url)
+        .filter(Job.is_active == True)
+        .filter(or_(Job.last_checked_at.is_(None), Job.last_checked_at < due_before))
+        .order_by(
+            Job.last_checked_at.isnot(None),
+            Job.last_checked_at.asc(),
+            Job.posted_date.asc(),
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def check_job_links(max_probes: int = None, concurrency: int = None) -> dict:
+    """
+    Probes one bounded slice of active jobs and deactivates dead links.
+    Returns counts per outcome.
+    """
+    max_probes = LIVENESS_MAX_PROBES if max_probes is None else max_probes
+    counts = {ALIVE: 0, DEAD: 0, UNKNOWN: 0}
+    if max_probes <= 0:
+        return counts
+
+    candidates = select_candidates(max_probes)
+    if not candidates:
+        return counts
+
+    limiter = HostRateLimiter(LIVENESS_MIN_INTERVAL)
+    with requests.Session() as session, \
+            ThreadPoolExecutor(max_workers=concurrency or LIVENESS_CONCURRENCY) as probers:
+        outcomes = list(probers.map(lambda row: probe_url(session, limiter, row.url), candidates))
+
+    dead_ids = []
+    for row, outcome in zip(candidates, outcomes):
+        counts[outcome] += 1
+        if outcome == DEAD:
+            dead_ids.append(row.id)
+
+    with watermark_lock():
+        checked_at = datetime.utcnow()
+        Job.query.filter(Job.id.in_([row.id for row in candidates])).update(
+            {'last_checked_at': checked_at}, synchronize_session=False
+        )
+        if dead_ids:
+            release_canonicals(dead_ids)
+            Job.query.filter(Job.id.in_(dead_ids)).update(
+                {'is_active': False, 'deactivated_at': checked_at}, synchronize_session=False
+            )
+        db.session.commit()
+
+    logger.info(
+        f"🔎 Probed {len(candidates)} job links: {counts[ALIVE]} alive, "
+        f"{counts[DEAD]} dead (deactivated), {counts[UNKNOWN]} inconclusive."
+    )
+    return counts
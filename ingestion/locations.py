@@ -0,0 +1,163 @@
+"""
+ingestion/locations.py
+
+Canonical locations from a bundled gazetteer.
+
+Every source writes free-text locations — Careers24 cards ("Sandton,
+Gauteng"), Adzuna tags ("Remote (GB)"), Remotive hints ("Remote — USA
+Only") — so filtering and grouping on `jobs.location` splits the same place
+across many strings. This stage resolves each distinct string once against
+`data/gazetteer.json` (city → province → country, plus remote markers) and
+stores the result in indexed `location_city/province/country` and
+`is_remote` columns. Filters and aggregates then compare equal keys.
+
+Resolution picks the most specific match: a known city implies its province
+and country, a province implies its country. The gazetteer can be
+overridden with `GAZETTEER_PATH`; its checksum is stored per row
+(`jobs.location_version`) so editing it re-resolves existing rows on the
+next run — which is also how the initial backfill happens.
+"""
+import json
+import logging
+import os
+import re
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+from sqlalchemy import or_
+from app.models import db, Job
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = os.environ.get(
+    'GAZETTEER_PATH', os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.json')
+)
+LOCATION_BATCH_SIZE = 500
+
+Location = namedtuple('Location', 'city province country is_remote')
+
+
+def _alternation(aliases) -> re.Pattern:
+    # Longest aliases first so "east london" wins over shorter overlaps
+    ordered = sorted(aliases, key=len, reverse=True)
+    return re.compile(r'(?<![a-z0-9])(' + '|'.join(re.escape(a) for a in ordered) + r')(?![a-z0-9])')
+
+
+class Gazetteer:
+    """Compiled alias lookups for every level of the gazetteer."""
+
+    def __init__(self, data: dict):
+        self.countries = data['countries']
+        self.provinces = data['provinces']
+        self.cities = data['cities']
+
+        self.city_of = {a.lower(): name for name, c in self.cities.items() for a in c['aliases']}
+        self.province_of = {a.lower(): name for name, p in self.provinces.items() for a in p['aliases']}
+        self.country_of = {a.lower(): code for code, c in self.countries.items() for a in c['aliases']}
+
+        self.city_pattern = _alternation(self.city_of)
+        self.province_pattern = _alternation(self.province_of)
+        self.country_pattern = _alternation(self.country_of)
+        self.remote_pattern = _alternation(data.get('remote_markers', ['remote']))
+
+        checksum = zlib.crc32(json.dumps(data, sort_keys=True).encode('utf-8'))
+        self.version = checksum & 0x7fffffff
+
+    def resolve(self, text: str) -> Location:
+        text = (text or '').lower()
+        is_remote = bool(self.remote_pattern.search(text))
+        city = province = country = None
+
+        match = self.city_pattern.search(text)
+        if match:
+            city = self.city_of[match.group(1)]
+            province = self.cities[city]['province']
+        else:
+            match = self.province_pattern.search(text)
+            if match:
+                province = self.province_of[match.group(1)]
+
+        if province:
+            country = self.provinces[province]['country']
+        else:
+            match = self.country_pattern.search(text)
+            if match:
+                country = self.country_of[match.group(1)]
+
+        return Location(city, province, country, is_remote)
+
+    def country_name(self, code: str) -> str:
+        return self.countries.get(code, {}).get('name', code)
+
+
+_gazetteer = None
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        with open(GAZETTEER_PATH, encoding='utf-8') as fh:
+            _gazetteer = Gazetteer(json.load(fh))
+    return _gazetteer
+
+
+@lru_cache(maxsize=4096)
+def resolve_location(text: str) -> Location:
+    """Cached: most sources repeat a small set of location strings."""
+    return get_gazetteer().resolve(text)
+
+
+def location_label(city, province, country, is_remote) -> str:
+    """Display label for a canonical location key."""
+    if city:
+        return city
+    if province:
+        return province
+    if country:
+        name = get_gazetteer().country_name(country)
+        return f"Remote ({name})" if is_remote else name
+    return 'Remote' if is_remote else 'Unknown'
+
+
+def normalize_job_locations(batch_size: int = LOCATION_BATCH_SIZE) -> int:
+    """
+    Resolves locations for every job whose `location_version` doesn't match
+    the current gazetteer. Returns the number of jobs updated.
+    """
+    gazetteer = get_gazetteer()
+    updated = 0
+    last_id = ''
+
+    while True:
+        batch = (
+            db.session.query(Job.id, Job.location)
+            .filter(or_(Job.location_version.is_(None), Job.location_version != gazetteer.version))
+            .filter(Job.id > last_id)
+            .order_by(Job.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        # One UPDATE per distinct location string in the batch
+        ids_by_location = {}
+        for job_id, location in batch:
+            ids_by_location.setdefault(location, []).append(job_id)
+        for location, ids in ids_by_location.items():
+            resolved = resolve_location(location)
+            Job.query.filter(Job.id.in_(ids)).update({
+                'location_city': resolved.city,
+                'location_province': resolved.province,
+                'location_country': resolved.country,
+                'is_remote': resolved.is_remote,
+                'location_version': gazetteer.version,
+            }, synchronize_session=False)
+        db.session.commit()
+
+        updated += len(batch)
+        last_id = batch[-1].id
+
+    if updated:
+        logger.info(f"📍 Resolved locations on {updated} jobs.")
+    return updated
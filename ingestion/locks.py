@@ -0,0 +1,65 @@
+"""
+ingestion/locks.py
+
+Advisory lock between job writers and the watermark stages.
+
+Rollups and alerts fold in rows stamped (`first_seen_at`, `deactivated_at`)
+after their stored watermark and then advance it to the stage's `now`. A
+load running in another process (a parallel shard, the scheduler, /refresh)
+can stamp a row before that `now` but commit it after the stage's query,
+and the row would be skipped for good. So writers hold the lock shared
+around stamp-and-commit, and watermark stages hold it exclusively from
+picking `now` to committing the watermark: every row stamped before `now`
+is then committed and visible, and every later one is stamped after it.
+
+On PostgreSQL this is a session advisory lock on its own connection, so it
+covers every host on the database; elsewhere (SQLite) it is an flock on a
+file under LOCK_DIR, which covers the processes on this host.
+
+`build_lock` serializes the builders of on-disk artifacts (the read
+snapshot, the similarity index): the scheduler, /refresh and cron can all
+reach a publish stage at once, and two builders would pick the same
+generation and prune each other's files.
+"""
+import os
+from contextlib import contextmanager
+from sqlalchemy import text
+from app.models import db
+
+try:
+    import fcntl
+except ImportError:   # not on Windows: no cross-process lock
+    fcntl = None
+
+LOCK_DIR = os.environ.get('PIPELINE_LOCK_DIR', os.path.join('data', 'locks'))
+ADVISORY_LOCK_KEY = 48_217   # arbitrary; the same in every process on the database
+
+
+@contextmanager
+def watermark_lock(exclusive: bool = False):
+    """Holds the writers/watermark lock, shared (writers) or exclusive (stages)."""
+    if db.engine.dialect.name == 'postgresql':
+        suffix = '' if exclusive else '_shared'
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(f'SELECT pg_advisory_lock{suffix}(:key)'), {'key': ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text(f'SELECT pg_advisory_unlock{suffix}(:key)'), {'key': ADVISORY_LOCK_KEY})
+        return
+
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(os.path.join(LOCK_DIR, 'watermark.lock'), 'a') as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield   # closing the file releases the flock
+
+
+@contextmanager
+def build_lock(root: str):
+    """Exclusive flock on `root/.build.lock` while an artifact under `root` is rebuilt."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.build.lock'), 'a') as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
@@ -0,0 +1,97 @@
+"""
+ingestion/parallel.py
+
+Optional process-pool transform stage.
+
+HTML parsing and the keyword scans over descriptions are CPU-bound and, run
+in-process, hold the GIL of whatever started the pipeline (the cron process,
+or a gunicorn worker via `/refresh`). `TransformPool.map` fans those tasks
+out to worker processes and transparently falls back to in-process
+execution when the batch is too small to pay for pool startup, when only
+one worker is configured, or when the pool cannot be started at all.
+
+Tasks must be top-level (picklable) functions that take a raw page/record
+and return plain data (normalized job dicts). Cross-batch dedup stays in
+the parent.
+"""
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# 0 = one worker per CPU; 1 = always in-process
+TRANSFORM_WORKERS   = int(os.environ.get('TRANSFORM_WORKERS', 0))
+# Items sent to a worker per round trip; 0 = auto (≈4 chunks per worker)
+TRANSFORM_CHUNKSIZE = int(os.environ.get('TRANSFORM_CHUNKSIZE', 0))
+# Batches smaller than this run in-process — pool startup would dominate
+TRANSFORM_MIN_ITEMS = int(os.environ.get('TRANSFORM_MIN_ITEMS', 32))
+# 'forkserver' avoids forking the (threaded) web process; 'spawn' elsewhere
+TRANSFORM_START_METHOD = os.environ.get('TRANSFORM_START_METHOD') or (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+class TransformPool:
+    """
+    Lazily started process pool shared by every transform in a pipeline run.
+    Use as a context manager so worker processes are always shut down.
+    """
+
+    def __init__(self, workers: int = None, chunksize: int = None, min_items: int = None):
+        workers = TRANSFORM_WORKERS if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = TRANSFORM_CHUNKSIZE if chunksize is None else chunksize
+        self.min_items = TRANSFORM_MIN_ITEMS if min_items is None else min_items
+        self._executor = None
+        self._disabled = self.workers <= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _start(self) -> bool:
+        if self._executor is None and not self._disabled:
+            try:
+                context = multiprocessing.get_context(TRANSFORM_START_METHOD)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Transform pool unavailable, running in-process: {e}")
+                self._disabled = True
+        return self._executor is not None
+
+    def map(self, func, items, min_items: int = None) -> list:
+        """
+        `[func(item) for item in items]`, in order, using worker processes
+        when the batch is at least `min_items` long (defaults to the pool's).
+        """
+        items = list(items)
+        threshold = self.min_items if min_items is None else min_items
+        if len(items) < max(threshold, 2) or not self._start():
+            return [func(item) for item in items]
+
+        chunksize = self.chunksize or max(1, math.ceil(len(items) / (self.workers * 4)))
+        try:
+            return list(self._executor.map(func, items, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            logger.warning(f"Transform pool broke ({e}); finishing batch in-process.")
+            self._executor = None
+            self._disabled = True
+            return [func(item) for item in items]
+
+
+def transform_map(func, items, pool: TransformPool = None, min_items: int = None) -> list:
+    """`pool.map` when a pool is given, plain in-process map otherwise."""
+    if pool is None:
+        return [func(item) for item in items]
+    return pool.map(func, items, min_items=min_items)
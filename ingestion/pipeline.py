@@ -1,9 +1,28 @@
 import logging
+import os
+import time
 from datetime import datetime, timedelta
-from app.models import db, Job
-from ingestion.extractors.adzuna import fetch_adzuna_jobs
-from ingestion.extractors.scraper import scrape_careers24
-from ingestion.extractors.remotive import fetch_remotive_jobs
+from sqlalchemy import insert, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from app.metrics import track_pipeline_run
+from app.models import db, Job, JobSignature, JobSkill, AlertOutbox, DESCRIPTION_COMPRESSION
+from ingestion.dedup import link_near_duplicates, release_canonicals
+from ingestion.skills import tag_job_skills
+from ingestion.liveness import check_job_links
+from ingestion import archive
+from ingestion.rollups import update_daily_rollups
+from ingestion.salary import normalize_job_salaries, refresh_salary_percentiles
+from ingestion.locations import normalize_job_locations
+from ingestion.similarity import build_similarity_index
+from ingestion.snapshot import build_snapshot, SNAPSHOT_ENABLED
+from ingestion.alerts import match_new_jobs, deliver_alerts
+from ingestion.utils import prepare_description, reference_date
+from ingestion.extractors.adzuna import fetch_adzuna_jobs, replay_adzuna, ADZUNA_COUNTRIES
+from ingestion.extractors.scraper import scrape_careers24, replay_careers24, probe_careers24
+from ingestion.extractors.remotive import fetch_remotive_jobs, replay_remotive
+from ingestion.locks import watermark_lock
+from ingestion.landing import LandingZone, LANDING_ENABLED, latest_runs, prune_runs, new_run_id
+from ingestion.parallel import TransformPool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,7 +32,33 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 DISPLAY_MAX_DAYS = 150   # 5 months  — jobs older than this are marked inactive
 DELETE_MAX_DAYS  = 180   # 6 months  — jobs older than this are deleted entirely
-HARD_ROW_LIMIT   = 1500  # Maximum rows to keep on Render free tier
+HARD_ROW_LIMIT   = int(os.environ.get('HARD_ROW_LIMIT', 1500))  # Maximum rows to keep (Render free tier)
+
+LOAD_BATCH_SIZE = 500
+JOB_COLUMNS = frozenset(column.key for column in Job.__table__.columns)
+# Dialects whose INSERT can skip rows that hit the (source, source_job_id) constraint
+CONFLICT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+# Extractor name (the `--source` selector) → function(landing, pool, countries)
+EXTRACTORS = {
+    'adzuna': lambda landing, pool, countries: fetch_adzuna_jobs(landing=landing, countries=countries),
+    'careers24': lambda landing, pool, countries: scrape_careers24(landing=landing, pool=pool),
+    'remotive': lambda landing, pool, countries: fetch_remotive_jobs(landing=landing),
+}
+
+# Source → cheap change probe for the scheduler: (countries) → a sample of the
+# newest jobs, fetched with far fewer requests than the full extract. Adzuna
+# and Remotive have none: their extract already reads one page per query.
+PROBES = {
+    'careers24': lambda countries: probe_careers24(),
+}
+
+# Landed source name → function that re-runs its transform over raw records
+REPLAYERS = {
+    'adzuna': replay_adzuna,
+    'careers24': replay_careers24,
+    'remotive': replay_remotive,
+}
 
 
 def deactivate_old_jobs(max_days: int = DISPLAY_MAX_DAYS) -> int:
@@ -23,132 +68,542 @@ def deactivate_old_jobs(max_days: int = DISPLAY_MAX_DAYS) -> int:
     Returns the count of jobs deactivated.
     """
     cutoff = datetime.utcnow() - timedelta(days=max_days)
-    count = (
-        Job.query
+    ids = [
+        row.id for row in
+        db.session.query(Job.id)
         .filter(Job.is_active == True)
         .filter(Job.posted_date < cutoff.date())
-        .update({'is_active': False}, synchronize_session=False)
-    )
-    if count:
-        db.session.commit()
+        .all()
+    ]
+    count = 0
+    if ids:
+        with watermark_lock():
+            release_canonicals(ids)
+            count = Job.query.filter(Job.id.in_(ids)).update(
+                {'is_active': False, 'deactivated_at': datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
         logger.info(f"🔕 Deactivated {count} jobs older than {max_days} days.")
     return count
 
 
-def cleanup_old_jobs(max_days: int = DELETE_MAX_DAYS, max_rows: int = HARD_ROW_LIMIT) -> None:
+def delete_jobs(ids: list) -> int:
+    """
+    Deletes jobs by id together with their dependent rows, re-pointing any
+    near-duplicates whose canonical job is being removed. Rows are written
+    to the cold archive first; if that fails, nothing is deleted. Does not
+    commit.
+    """
+    if not ids:
+        return 0
+    if archive.ARCHIVE_ENABLED:
+        archive.archive_jobs(ids)
+    release_canonicals(ids)
+    JobSignature.query.filter(JobSignature.job_id.in_(ids)).delete(synchronize_session=False)
+    JobSkill.query.filter(JobSkill.job_id.in_(ids)).delete(synchronize_session=False)
+    AlertOutbox.query.filter(AlertOutbox.job_id.in_(ids)).delete(synchronize_session=False)
+    return Job.query.filter(Job.id.in_(ids)).delete(synchronize_session=False)
+
+
+def _cleanup_old_jobs_core(max_days: int = DELETE_MAX_DAYS, max_rows: int = HARD_ROW_LIMIT) -> int:
     """
     Data Retention Policy:
     1. Deletes jobs older than `max_days` (6 months) to free storage.
     2. Enforces a hard cap of `max_rows` to keep Render's free-tier DB healthy.
 
     Commits date-based deletions FIRST so the subsequent count is accurate.
+    Raises on failure; returns the number of jobs deleted.
     """
     logger.info("--- Starting Database Cleanup ---")
 
-    try:
-        # 1. Delete jobs older than max_days (6 months)
-        cutoff = datetime.utcnow() - timedelta(days=max_days)
-        deleted_by_date = (
-            Job.query
-            .filter(Job.posted_date < cutoff.date())
-            .delete(synchronize_session=False)
-        )
+    # 1. Delete jobs older than max_days (6 months)
+    cutoff = datetime.utcnow() - timedelta(days=max_days)
+    old_ids = [
+        row.id for row in
+        db.session.query(Job.id).filter(Job.posted_date < cutoff.date()).all()
+    ]
+    deleted_by_date = delete_jobs(old_ids)
+    db.session.commit()
+
+    # 2. Enforce the hard row limit on what remains
+    remaining = Job.query.count()
+    deleted_by_limit = 0
+
+    if remaining > max_rows:
+        excess = remaining - max_rows
+        oldest_ids = [
+            row.id for row in
+            db.session.query(Job.id).order_by(Job.posted_date.asc()).limit(excess).all()
+        ]
+        deleted_by_limit = delete_jobs(oldest_ids)
         db.session.commit()
 
-        # 2. Enforce the hard row limit on what remains
-        remaining = Job.query.count()
-        deleted_by_limit = 0
-
-        if remaining > max_rows:
-            excess = remaining - max_rows
-            oldest_ids = [
-                row.id for row in
-                Job.query.order_by(Job.posted_date.asc()).limit(excess).all()
-            ]
-            deleted_by_limit = (
-                Job.query.filter(Job.id.in_(oldest_ids))
-                .delete(synchronize_session=False)
-            )
-            db.session.commit()
+    total = deleted_by_date + deleted_by_limit
+    if total:
+        logger.info(f"🧹 Cleanup done: deleted {deleted_by_date} old + {deleted_by_limit} excess = {total} total.")
+    else:
+        logger.info("🧹 Cleanup done: database is healthy, nothing deleted.")
+    return total
 
-        total = deleted_by_date + deleted_by_limit
-        if total:
-            logger.info(f"🧹 Cleanup done: deleted {deleted_by_date} old + {deleted_by_limit} excess = {total} total.")
-        else:
-            logger.info("🧹 Cleanup done: database is healthy, nothing deleted.")
 
+def cleanup_old_jobs(max_days: int = DELETE_MAX_DAYS, max_rows: int = HARD_ROW_LIMIT) -> None:
+    """Retention stage for run_etl; failures are logged and never abort the run."""
+    try:
+        _cleanup_old_jobs_core(max_days=max_days, max_rows=max_rows)
     except Exception as e:
         db.session.rollback()
         logger.error(f"!!! Cleanup failed: {e}")
 
 
-def run_etl() -> int:
+def compact_descriptions(batch_size: int = 500) -> int:
     """
-    Main ETL (Extract, Transform, Load) pipeline.
-    Sources: Adzuna API (SA + Global) · Careers24 scraper · Remotive.io API
-    Returns the number of new jobs committed to the database.
+    One-off backfill: rewrites stored descriptions as HTML-stripped, capped
+    text (compressed when DESCRIPTION_COMPRESSION is on). Returns rows changed.
     """
-    logger.info("=== Starting ETL Pipeline ===")
+    changed = 0
+    last_id = ''
+    while True:
+        batch = (
+            db.session.query(Job.id, Job.description)
+            .filter(Job.id > last_id)
+            .order_by(Job.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for job_id, description in batch:
+            compact = prepare_description(description)
+            # With compression on, rewrite unchanged rows too so they get compressed
+            if compact != description or (DESCRIPTION_COMPRESSION and compact):
+                Job.query.filter_by(id=job_id).update(
+                    {'description': compact}, synchronize_session=False
+                )
+                changed += 1
+        db.session.commit()
+        last_id = batch[-1].id
+
+    logger.info(f"🗜️ Compacted {changed} stored descriptions.")
+    return changed
 
-    # ── 1. EXTRACT ──────────────────────────────────────────────────────────
-    adzuna_jobs, careers24_jobs, remotive_jobs = [], [], []
 
+def link_duplicates() -> int:
+    """Near-duplicate stage; failures are logged and never abort the run."""
     try:
-        adzuna_jobs = fetch_adzuna_jobs()
+        return link_near_duplicates()
     except Exception as e:
-        logger.error(f"Adzuna extraction failed: {e}")
+        db.session.rollback()
+        logger.error(f"Near-duplicate linking failed: {e}")
+        return 0
+
 
+def tag_skills() -> int:
+    """Skill tagging stage (also backfills untagged rows); never aborts the run."""
     try:
-        careers24_jobs = scrape_careers24()
+        return tag_job_skills()
     except Exception as e:
-        logger.error(f"Careers24 extraction failed: {e}")
+        db.session.rollback()
+        logger.error(f"Skill tagging failed: {e}")
+        return 0
+
 
+def check_links() -> dict:
+    """Link liveness stage; network trouble is logged and never aborts the run."""
     try:
-        remotive_jobs = fetch_remotive_jobs()
+        return check_job_links()
     except Exception as e:
-        logger.error(f"Remotive extraction failed: {e}")
+        db.session.rollback()
+        logger.error(f"Link liveness check failed: {e}")
+        return {}
+
+
+def normalize_locations() -> int:
+    """Location resolution stage (also backfills unresolved rows); never aborts the run."""
+    try:
+        return normalize_job_locations()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Location normalization failed: {e}")
+        return 0
+
+
+def normalize_salaries() -> int:
+    """Salary normalization + percentile stage; never aborts the run."""
+    try:
+        updated = normalize_job_salaries()
+        refresh_salary_percentiles()
+        return updated
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Salary normalization failed: {e}")
+        return 0
+
+
+def update_rollups() -> int:
+    """Daily rollup stage; failures are logged and never abort the run."""
+    try:
+        return update_daily_rollups()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Daily rollup update failed: {e}")
+        return 0
+
+
+def send_alerts() -> int:
+    """Saved-search alert stage; failures are logged and never abort the run."""
+    try:
+        queued = match_new_jobs()
+        deliver_alerts()
+        return queued
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Saved-search alerts failed: {e}")
+        return 0
+
+
+def build_similarity() -> dict:
+    """Similar-jobs index stage; failures are logged and never abort the run."""
+    try:
+        return build_similarity_index()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Similarity index build failed: {e}")
+        return {}
+
+
+def publish_snapshot() -> dict:
+    """Read-snapshot stage; on failure web workers keep the previous generation."""
+    if not SNAPSHOT_ENABLED:
+        return {}
+    try:
+        return build_snapshot(display_days=DISPLAY_MAX_DAYS)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Snapshot publish failed: {e}")
+        return {}
+
+
+def extract_all(landing: LandingZone = None, pool: TransformPool = None,
+                sources=None, countries=None, strict: bool = False) -> list:
+    """
+    Runs the extractors and returns the combined normalized job dicts.
+    Raw responses are written to `landing` when one is given; CPU-heavy
+    parsing runs on `pool` when one is given. `sources` limits the run to
+    some of EXTRACTORS and `countries` the Adzuna slice. A failing source is
+    logged and skipped, unless `strict` (a shard run), where it is raised.
+    """
+    counts = {}
+    all_raw_jobs = []
+    for source in sources or EXTRACTORS:
+        try:
+            jobs = EXTRACTORS[source](landing, pool, countries)
+        except Exception as e:
+            if strict:
+                raise
+            logger.error(f"{source.capitalize()} extraction failed: {e}")
+            jobs = []
+        counts[source] = len(jobs)
+        all_raw_jobs.extend(jobs)
+
+    breakdown = ' + '.join(f"{count} {source.capitalize()}" for source, count in counts.items())
+    logger.info(f"Extracted {breakdown} = {len(all_raw_jobs)} total. Starting deduplication...")
+    return all_raw_jobs
+
+
+def extract(sources=None, countries=None, strict: bool = False) -> list:
+    """
+    Extract for the selected sources (default all), landing raw payloads
+    when enabled. A sliced run lands under its own run id (e.g.
+    `…Z-adzuna-gb-us`), so shards running side by side never append to the
+    same landing file. Returns the normalized job dicts.
+    """
+    run_id = None
+    if sources or countries:
+        run_id = '-'.join([new_run_id(), *(sources or EXTRACTORS), *(countries or ())])
+    landing = LandingZone(run_id=run_id) if LANDING_ENABLED else None
+    # One "today" for the whole run: date windows don't shift at midnight mid-run
+    with reference_date(), TransformPool() as pool:
+        all_raw_jobs = extract_all(landing, pool, sources=sources, countries=countries, strict=strict)
+    if landing is not None:
+        logger.info(f"🗄️ Raw payloads landed under run id {landing.run_id}.")
+        prune_runs()
+    return all_raw_jobs
+
+
+def ingest(sources=None, countries=None, strict: bool = False) -> int:
+    """Extract + load for the selected sources; returns the number of new jobs committed."""
+    return load_jobs(extract(sources, countries, strict=strict), strict=strict)
+
+
+def transform_landed(landing: LandingZone, pool: TransformPool = None) -> list:
+    """Rebuild normalized job dicts from a landed run's raw payloads."""
+    all_raw_jobs = []
+    for source in landing.sources():
+        replayer = REPLAYERS.get(source)
+        if replayer is None:
+            logger.warning(f"No replayer registered for landed source '{source}', skipping.")
+            continue
+        jobs = replayer(landing.read(source), pool=pool)
+        logger.info(f"Replayed {len(jobs)} {source} jobs from run {landing.run_id}.")
+        all_raw_jobs.extend(jobs)
+    return all_raw_jobs
+
+
+def _insert_new(rows: list) -> int:
+    """
+    Inserts `rows`, skipping any that already exist; returns how many went in.
+    Rows are grouped by their keys (sources fill different columns) so each
+    executemany gets uniform parameters and unset columns keep their defaults.
+    """
+    conflict_insert = CONFLICT_INSERTS.get(db.session.get_bind().dialect.name)
+    groups = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+
+    inserted = 0
+    for group in groups.values():
+        if conflict_insert is None:
+            db.session.execute(insert(Job.__table__), group)
+            inserted += len(group)
+            continue
+        stmt = (
+            conflict_insert(Job.__table__)
+            .on_conflict_do_nothing(index_elements=['source', 'source_job_id'])
+            .returning(Job.__table__.c.id)
+        )
+        inserted += len(db.session.execute(stmt, group).all())
+    return inserted
 
-    all_raw_jobs = adzuna_jobs + careers24_jobs + remotive_jobs
-    logger.info(
-        f"Extracted {len(adzuna_jobs)} Adzuna + "
-        f"{len(careers24_jobs)} Careers24 + "
-        f"{len(remotive_jobs)} Remotive = {len(all_raw_jobs)} total. "
-        f"Starting deduplication..."
-    )
 
-    # ── 2. TRANSFORM & LOAD ─────────────────────────────────────────────────
+def load_jobs(all_raw_jobs: list, strict: bool = False) -> int:
+    """
+    Inserts jobs not already stored under the same (source, source_job_id)
+    and bumps `last_seen_at` on the stored ones the batch saw again.
+    Safe to run from several processes at once (parallel shards): existing
+    keys are filtered with one query per batch, and the insert itself skips
+    rows another process committed in the meantime instead of failing.
+    Returns the number of new jobs committed.
+    """
     new_count = 0
 
-    for job_data in all_raw_jobs:
-        exists = Job.query.filter_by(
-            source=job_data.get('source'),
-            source_job_id=job_data.get('source_job_id'),
-        ).first()
+    for start in range(0, len(all_raw_jobs), LOAD_BATCH_SIZE):
+        batch = all_raw_jobs[start:start + LOAD_BATCH_SIZE]
+        keys = {(job_data.get('source'), job_data.get('source_job_id')) for job_data in batch}
+        existing = set(
+            db.session.query(Job.source, Job.source_job_id)
+            .filter(tuple_(Job.source, Job.source_job_id).in_(keys))
+            .all()
+        )
+        seen = set(existing)
 
-        if not exists:
+        rows = []
+        for job_data in batch:
+            key = (job_data.get('source'), job_data.get('source_job_id'))
+            if key in seen:
+                continue
+            seen.add(key)
             try:
-                new_job = Job(**job_data)
-                db.session.add(new_job)
-                new_count += 1
+                unknown = set(job_data) - JOB_COLUMNS
+                if unknown:
+                    raise TypeError(f"unexpected fields {sorted(unknown)}")
+                rows.append(dict(job_data, description=prepare_description(job_data.get('description'))))
             except Exception as e:
                 logger.error(f"Failed to prepare job '{job_data.get('title', 'Unknown')}': {e}")
 
-    try:
-        db.session.commit()
-        logger.info(f"✅ Committed {new_count} new jobs to the database.")
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Database commit failed: {e}")
+        if not rows and not existing:
+            continue
+        try:
+            # Shared lock: first_seen_at is stamped and committed before any rollup/alert watermark passes it
+            with watermark_lock():
+                if existing:
+                    (Job.query
+                     .filter(tuple_(Job.source, Job.source_job_id).in_(existing))
+                     .update({'last_seen_at': datetime.utcnow()}, synchronize_session=False))
+                inserted = _insert_new(rows) if rows else 0
+                db.session.commit()
+            new_count += inserted
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Database commit failed: {e}")
+            if strict:
+                raise
+
+    logger.info(f"✅ Committed {new_count} new jobs to the database.")
+    return new_count
 
-    # ── 3. DEACTIVATE old jobs (5-month threshold) ──────────────────────────
+
+@track_pipeline_run
+def run_etl() -> int:
+    """
+    Main ETL (Extract, Transform, Load) pipeline.
+    Sources: Adzuna API (SA + Global) · Careers24 scraper · Remotive.io API
+    Returns the number of new jobs committed to the database.
+    """
+    logger.info("=== Starting ETL Pipeline ===")
+
+    # ── 1–2. EXTRACT (raw payloads land on disk for replay), TRANSFORM & LOAD
+    new_count = ingest()
+
+    # ── 3. LINK cross-source near-duplicates (MinHash/LSH) ─────────────────
+    link_duplicates()
+
+    # ── 4. TAG skills from title + description ──────────────────────────────
+    tag_skills()
+
+    # ── 5. RESOLVE free-text locations to canonical city/province/country ──
+    normalize_locations()
+
+    # ── 6. ALERT saved searches matching this run's new jobs ───────────────
+    send_alerts()
+
+    # ── 7. DEACTIVATE old jobs (5-month threshold) ──────────────────────────
     deactivate_old_jobs(max_days=DISPLAY_MAX_DAYS)
 
-    # ── 4. DELETE very old jobs + enforce row limit (6-month threshold) ─────
+    # ── 8. RETIRE dead links (bounded, rate-limited probe slice) ────────────
+    check_links()
+
+    # ── 9. NORMALIZE salaries to annual ZAR + refresh percentiles ───────────
+    normalize_salaries()
+
+    # ── 10. ROLL UP the day's changes (before retention deletes anything) ────
+    update_rollups()
+
+    # ── 11. DELETE very old jobs + enforce row limit (6-month threshold) ────
     cleanup_old_jobs(max_days=DELETE_MAX_DAYS, max_rows=HARD_ROW_LIMIT)
 
+    # ── 12. INDEX surviving jobs for "similar jobs" (new rows only) ────────
+    build_similarity()
+
+    # ── 13. PUBLISH the read-only snapshot the web workers serve from ──────
+    publish_snapshot()
+
+    return new_count
+
+
+def replay_run(run_id: str = 'latest', root: str = None) -> int:
+    """
+    Transform-only replay: re-runs transform + load over a landed run
+    without any HTTP. `latest` replays the newest run of every shard
+    (see `latest_runs`). Retention is not applied.
+    Returns the number of new jobs committed.
+    """
+    run_ids = latest_runs(root) if run_id == 'latest' else [run_id]
+    if not run_ids:
+        raise FileNotFoundError(f"No landed runs found in {root or 'LANDING_DIR'}")
+    landings = [LandingZone.open(landed, root=root) for landed in run_ids]
+    logger.info(f"=== Replaying landed runs {', '.join(landing.run_id for landing in landings)} ===")
+    all_raw_jobs = []
+    with reference_date(), TransformPool() as pool:
+        for landing in landings:
+            all_raw_jobs.extend(transform_landed(landing, pool))
+    new_count = load_jobs(all_raw_jobs)
+    link_duplicates()
+    tag_skills()
+    normalize_locations()
+    normalize_salaries()
+    update_rollups()
+    build_similarity()
+    publish_snapshot()
     return new_count
 
 
+def _run_alerts() -> int:
+    queued = match_new_jobs()
+    deliver_alerts()
+    return queued
+
+
+def _run_salaries() -> int:
+    updated = normalize_job_salaries()
+    refresh_salary_percentiles()
+    return updated
+
+
+def _run_publish() -> dict:
+    return build_snapshot(display_days=DISPLAY_MAX_DAYS) if SNAPSHOT_ENABLED else {}
+
+
+# Post-load stages in run_etl order (the `--stage` selector). Unlike the
+# wrappers above these raise, so a shard can report the failure.
+STAGES = {
+    'link': link_near_duplicates,
+    'tag': tag_job_skills,
+    'resolve': normalize_job_locations,
+    'alert': _run_alerts,
+    'deactivate': lambda: deactivate_old_jobs(max_days=DISPLAY_MAX_DAYS),
+    'retire': check_job_links,
+    'salaries': _run_salaries,
+    'rollup': update_daily_rollups,
+    'retention': lambda: _cleanup_old_jobs_core(max_days=DELETE_MAX_DAYS, max_rows=HARD_ROW_LIMIT),
+    'similarity': build_similarity_index,
+    'publish': _run_publish,
+}
+# Selector shorthands for several stages
+STAGE_GROUPS = {
+    'post': list(STAGES),
+    'enrich': ['link', 'tag', 'resolve', 'salaries'],
+    # After an incremental load (see ingestion/scheduler.py) …
+    'incremental': ['link', 'tag', 'resolve', 'alert', 'salaries', 'rollup', 'similarity', 'publish'],
+    # … and the daily retention pass that goes with it
+    'maintenance': ['deactivate', 'retire', 'rollup', 'retention', 'similarity', 'publish'],
+}
+
+
+def resolve_stages(names) -> list:
+    """Expands groups and orders `names` as run_etl would; ValueError on unknown names."""
+    wanted = set()
+    for name in names or ():
+        if name in STAGE_GROUPS:
+            wanted.update(STAGE_GROUPS[name])
+        elif name in STAGES:
+            wanted.add(name)
+        else:
+            raise ValueError(f"unknown stage '{name}' (expected one of {', '.join([*STAGES, *STAGE_GROUPS])})")
+    return [name for name in STAGES if name in wanted]
+
+
+def run_shard(sources=None, countries=None, stages=None) -> dict:
+    """
+    One independently runnable slice of a pipeline run: extract + load for
+    `sources` (Adzuna limited to `countries`), then the selected post-load
+    `stages` in run order. Loads from concurrent shards are safe (see
+    load_jobs); the post-load stages should run once, after the loads.
+
+    The first failing step stops the shard. Returns {'ok', 'seconds',
+    'steps': [{'step', 'ok', 'seconds', 'result' | 'error'}]}.
+    """
+    for source in sources or ():
+        if source not in EXTRACTORS:
+            raise ValueError(f"unknown source '{source}' (expected one of {', '.join(EXTRACTORS)})")
+    for country in countries or ():
+        if country not in ADZUNA_COUNTRIES:
+            raise ValueError(f"unknown country '{country}' (expected one of {', '.join(ADZUNA_COUNTRIES)})")
+    if countries and 'adzuna' not in (sources or ()):
+        raise ValueError("countries only apply to the adzuna source")
+
+    steps = [('load', lambda: ingest(sources, countries, strict=True))] if sources else []
+    steps += [(name, STAGES[name]) for name in resolve_stages(stages)]
+
+    report = {'ok': True, 'steps': []}
+    started = time.perf_counter()
+    for name, fn in steps:
+        step_start = time.perf_counter()
+        step = {'step': name}
+        try:
+            step['result'] = fn()
+            step['ok'] = True
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Shard step '{name}' failed: {e}")
+            step.update(ok=False, error=str(e))
+            report['ok'] = False
+        step['seconds'] = round(time.perf_counter() - step_start, 3)
+        report['steps'].append(step)
+        if not step['ok']:
+            break
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
 if __name__ == "__main__":
     from app import create_app
     app = create_app()
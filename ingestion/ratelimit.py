@@ -0,0 +1,34 @@
+"""
+ingestion/ratelimit.py
+
+Polite per-host request spacing for the concurrent fetchers.
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Thread-safe limiter that spaces request *starts* to the same host at
+    least `min_interval` seconds apart. Workers reserve the next free slot
+    under a lock and sleep outside it, so different hosts never block
+    each other.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Block until `url`'s host may be hit again. Returns seconds slept."""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
@@ -0,0 +1,212 @@
+"""
+ingestion/rollups.py
+
+Incremental daily rollups for trend charts.
+
+`daily_job_rollups` holds one row per day × source × dimension/key
+(dimension 'all', 'category' or 'skill') with three counters:
+
+  - new_jobs         canonical jobs posted that day (by posted_date)
+  - active_jobs      active canonical jobs as of the last run that day
+  - deactivated_jobs jobs retired that day (age cutoff or dead link)
+
+Each run folds in only what changed since the stored watermark — rows first
+seen or deactivated after it — by adding to the affected days, and
+refreshes today's active snapshot. Runs hold `watermark_lock` exclusively
+(see ingestion/locks.py), so concurrent loads can't slip rows under it.
+Counts are never recomputed from the jobs table, so history survives
+retention deletes. The first run after the table is created backfills from
+every stored job.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app.models import db, Job, JobSkill, DailyJobRollup, RollupWatermark
+from ingestion.locks import watermark_lock
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = 'daily_job_rollups'
+TREND_WINDOWS = (14, 90, 365)
+ROLLUP_BATCH_SIZE = 500
+
+# Same title keywords as the listing sidebar categories
+CATEGORY_KEYWORDS = {
+    'junior_dev': 'junior developer',
+    'graduate':   'graduate',
+    'intern':     'intern',
+    'data':       'data',
+    'cyber':      'cyber',
+    'cloud':      'cloud',
+    'ict_grad':   'ict',
+    'is_grad':    'information systems',
+}
+
+COUNTERS = ('new_jobs', 'active_jobs', 'deactivated_jobs')
+
+
+def categories_for(title: str) -> list:
+    title = (title or '').lower()
+    return [category for category, keyword in CATEGORY_KEYWORDS.items() if keyword in title]
+
+
+def dimension_keys(title: str, skills=()) -> list:
+    """Every (dimension, key) a job counts towards."""
+    keys = [('all', '')]
+    keys.extend(('category', category) for category in categories_for(title))
+    keys.extend(('skill', skill) for skill in skills)
+    return keys
+
+
+def _skills_by_job(ids: list) -> dict:
+    skills = defaultdict(list)
+    for start in range(0, len(ids), ROLLUP_BATCH_SIZE):
+        chunk = ids[start:start + ROLLUP_BATCH_SIZE]
+        for job_id, skill in (
+            db.session.query(JobSkill.job_id, JobSkill.skill)
+            .filter(JobSkill.job_id.in_(chunk))
+            .all()
+        ):
+            skills[job_id].append(skill)
+    return skills
+
+
+def _tally(rows, counter: str, deltas: dict) -> None:
+    """rows: (id, source, title, day) → adds 1 to `counter` for every key."""
+    rows = list(rows)
+    skills = _skills_by_job([row[0] for row in rows])
+    for job_id, source, title, day in rows:
+        for dimension, key in dimension_keys(title, skills.get(job_id, ())):
+            deltas[(day, source, dimension, key)][counter] += 1
+
+
+def _get_watermark():
+    row = db.session.get(RollupWatermark, WATERMARK)
+    return row.value if row else None
+
+
+def update_daily_rollups(now: datetime = None) -> int:
+    """
+    Folds job changes since the last watermark into `daily_job_rollups`
+    and refreshes today's active snapshot. Returns the number of rollup
+    rows written. Holds the watermark lock exclusively, so no load can
+    commit rows stamped before `now` once they have been counted.
+    """
+    with watermark_lock(exclusive=True):
+        return _fold_changes(now or datetime.utcnow())
+
+
+def _fold_changes(now: datetime) -> int:
+    since = _get_watermark()
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    # New canonical jobs, attributed to their posting day
+    new_query = (
+        db.session.query(Job.id, Job.source, Job.title, Job.posted_date, Job.first_seen_at)
+        .filter(Job.canonical_job_id.is_(None))
+        .filter(Job.first_seen_at <= now)
+    )
+    if since is not None:
+        new_query = new_query.filter(Job.first_seen_at > since)
+    _tally(
+        ((job_id, source, title, posted or first_seen.date())
+         for job_id, source, title, posted, first_seen in new_query.all()),
+        'new_jobs', deltas,
+    )
+
+    # Deactivations since the watermark, attributed to the day they happened
+    deactivated_query = (
+        db.session.query(Job.id, Job.source, Job.title, Job.deactivated_at)
+        .filter(Job.canonical_job_id.is_(None))
+        .filter(Job.deactivated_at.isnot(None))
+        .filter(Job.deactivated_at <= now)
+    )
+    if since is not None:
+        deactivated_query = deactivated_query.filter(Job.deactivated_at > since)
+    _tally(
+        ((job_id, source, title, stamp.date()) for job_id, source, title, stamp in deactivated_query.all()),
+        'deactivated_jobs', deltas,
+    )
+
+    # Today's active snapshot replaces (not adds to) any earlier run today
+    today = now.date()
+    snapshot = defaultdict(int)
+    active_rows = (
+        db.session.query(Job.id, Job.source, Job.title)
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .all()
+    )
+    active_skills = _skills_by_job([row.id for row in active_rows])
+    for job_id, source, title in active_rows:
+        for dimension, key in dimension_keys(title, active_skills.get(job_id, ())):
+            snapshot[(today, source, dimension, key)] += 1
+
+    # Upsert only the affected days
+    days = {key[0] for key in deltas} | {today}
+    existing = {
+        (row.day, row.source, row.dimension, row.key): row
+        for row in DailyJobRollup.query.filter(DailyJobRollup.day.in_(days)).all()
+    }
+    for pk, row in existing.items():
+        if pk[0] == today:
+            row.active_jobs = 0
+
+    written = 0
+    for pk in set(deltas) | set(snapshot):
+        row = existing.get(pk)
+        if row is None:
+            day, source, dimension, key = pk
+            row = DailyJobRollup(day=day, source=source, dimension=dimension, key=key,
+                                 new_jobs=0, active_jobs=0, deactivated_jobs=0)
+            db.session.add(row)
+        if pk in deltas:
+            row.new_jobs += deltas[pk]['new_jobs']
+            row.deactivated_jobs += deltas[pk]['deactivated_jobs']
+        if pk in snapshot:
+            row.active_jobs = snapshot[pk]
+        written += 1
+
+    db.session.merge(RollupWatermark(name=WATERMARK, value=now))
+    db.session.commit()
+    logger.info(f"📈 Daily rollups updated: {written} rows across {len(days)} days.")
+    return written
+
+
+def trend_series(window: int = 14, dimension: str = 'all', key: str = '',
+                 source: str = None, today=None) -> list:
+    """
+    One entry per day in the window (oldest first, gaps zero-filled):
+    {'date', 'new', 'active', 'deactivated'}, summed over sources unless
+    `source` is given.
+    """
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=window - 1)
+    query = (
+        db.session.query(
+            DailyJobRollup.day,
+            func.sum(DailyJobRollup.new_jobs),
+            func.sum(DailyJobRollup.active_jobs),
+            func.sum(DailyJobRollup.deactivated_jobs),
+        )
+        .filter(DailyJobRollup.dimension == dimension)
+        .filter(DailyJobRollup.key == key)
+        .filter(DailyJobRollup.day >= start)
+        .filter(DailyJobRollup.day <= today)
+    )
+    if source:
+        query = query.filter(DailyJobRollup.source == source)
+    totals = {day: (new, active, gone) for day, new, active, gone in query.group_by(DailyJobRollup.day).all()}
+
+    series = []
+    for offset in range(window):
+        day = start + timedelta(days=offset)
+        new, active, gone = totals.get(day, (0, 0, 0))
+        series.append({
+            'date': day.isoformat(),
+            'new': int(new or 0),
+            'active': int(active or 0),
+            'deactivated': int(gone or 0),
+        })
+    return series
@@ -0,0 +1,178 @@
+"""
+ingestion/salary.py
+
+Salary normalization.
+
+Adzuna reports `salary_min`/`salary_max` in the currency of the country
+searched (ZAR for `adzuna_sa`, GBP for `adzuna_gb`, ...), and SA listings
+are often monthly rather than annual. This stage converts every raw range
+into annual amounts in one base currency (ZAR by default) using a local
+rate table, and stores them in the indexed `salary_annual_min/max`
+columns, so salary filters and sorts are plain index range scans.
+
+Period is inferred once per range, from its upper bound in the base
+currency: below `HOURLY_MAX` the range is taken as hourly, below
+`MONTHLY_MAX` as monthly, otherwise annual, and both bounds are scaled
+alike. `MONTHLY_MAX` stays low (R60k): a R60k–R100k figure is as likely a
+modest annual salary as a senior monthly one, and without a signal it is
+left annual. When only one bound is known it is used for both.
+
+The rate table can be overridden with a JSON file (`SALARY_RATES_PATH`):
+
+    {"base": "ZAR", "rates": {"ZAR": 1, "USD": 18.2, ...}}
+
+where each rate is the value of one unit of that currency in the base.
+After changing rates run `python run_pipeline.py --renormalize-salaries`.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from sqlalchemy import or_
+from app.models import db, Job, SalaryPercentile
+from app.stats_utils import percentile
+from ingestion.rollups import categories_for
+
+logger = logging.getLogger(__name__)
+
+SALARY_RATES_PATH = os.environ.get('SALARY_RATES_PATH')
+
+DEFAULT_RATES = {
+    'base': 'ZAR',
+    'rates': {
+        'ZAR': 1.0,
+        'USD': 18.0,
+        'GBP': 23.0,
+        'EUR': 19.5,
+        'AUD': 11.8,
+        'CAD': 13.1,
+    },
+}
+
+# Currency each salaried source reports in
+SOURCE_CURRENCY = {
+    'adzuna_sa': 'ZAR',
+    'adzuna_gb': 'GBP',
+    'adzuna_us': 'USD',
+    'adzuna_au': 'AUD',
+    'adzuna_de': 'EUR',
+    'adzuna_nl': 'EUR',
+    'adzuna_ca': 'CAD',
+}
+
+# Period thresholds in the base currency (defaults assume ZAR)
+HOURLY_MAX  = float(os.environ.get('SALARY_HOURLY_MAX', 1_500))
+MONTHLY_MAX = float(os.environ.get('SALARY_MONTHLY_MAX', 60_000))
+HOURS_PER_YEAR = 2080
+
+PERCENTILES = (10, 25, 50, 75, 90)
+PERCENTILE_MIN_SAMPLE = 5
+SALARY_BATCH_SIZE = 500
+
+
+def load_rates(path: str = None) -> dict:
+    path = path or SALARY_RATES_PATH
+    if path:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    return DEFAULT_RATES
+
+
+def _periods_per_year(high: float) -> int:
+    """How many of the range's periods make a year, judged from its upper bound."""
+    if high < HOURLY_MAX:
+        return HOURS_PER_YEAR
+    if high < MONTHLY_MAX:
+        return 12
+    return 1
+
+
+def normalize_salary(source: str, salary_min, salary_max, rates: dict = None):
+    """
+    (currency, annual_min, annual_max) in the base currency, or
+    (currency, None, None) when there is no usable salary.
+    """
+    rates = rates or load_rates()
+    currency = SOURCE_CURRENCY.get(source, rates['base'])
+    rate = rates['rates'].get(currency)
+    amounts = [a for a in (salary_min, salary_max) if a]
+    if rate is None or not amounts:
+        return currency, None, None
+
+    low, high = min(amounts) * rate, max(amounts) * rate
+    periods = _periods_per_year(high)
+    return currency, round(low * periods, 2), round(high * periods, 2)
+
+
+def normalize_job_salaries(force: bool = False, batch_size: int = SALARY_BATCH_SIZE) -> int:
+    """
+    Fills the annual columns for rows with a raw salary but no normalized
+    value (new rows, or every salaried row when `force`). Returns rows updated.
+    """
+    rates = load_rates()
+    updated = 0
+    last_id = ''
+
+    while True:
+        query = (
+            db.session.query(Job.id, Job.source, Job.salary_min, Job.salary_max)
+            .filter(or_(Job.salary_min.isnot(None), Job.salary_max.isnot(None)))
+            .filter(Job.id > last_id)
+        )
+        if not force:
+            query = query.filter(Job.salary_currency.is_(None))
+        batch = query.order_by(Job.id.asc()).limit(batch_size).all()
+        if not batch:
+            break
+
+        for job_id, source, salary_min, salary_max in batch:
+            currency, annual_min, annual_max = normalize_salary(source, salary_min, salary_max, rates)
+            Job.query.filter_by(id=job_id).update({
+                'salary_currency': currency,
+                'salary_annual_min': annual_min,
+                'salary_annual_max': annual_max,
+            }, synchronize_session=False)
+        db.session.commit()
+
+        updated += len(batch)
+        last_id = batch[-1].id
+
+    if updated:
+        logger.info(f"💰 Normalized salaries on {updated} jobs.")
+    return updated
+
+
+def refresh_salary_percentiles(min_sample: int = PERCENTILE_MIN_SAMPLE) -> int:
+    """
+    Recomputes `salary_percentiles` for active canonical jobs — per source,
+    per category and overall — from each range's midpoint. Returns the
+    number of groups stored.
+    """
+    groups = {}
+    rows = (
+        db.session.query(Job.source, Job.title, Job.salary_annual_min, Job.salary_annual_max)
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .filter(Job.salary_annual_min.isnot(None))
+        .all()
+    )
+    for source, title, annual_min, annual_max in rows:
+        midpoint = (annual_min + annual_max) / 2
+        for key in [(source, 'all'), ('all', 'all')] + [('all', c) for c in categories_for(title)]:
+            groups.setdefault(key, []).append(midpoint)
+
+    SalaryPercentile.query.delete(synchronize_session=False)
+    computed_at = datetime.utcnow()
+    stored = 0
+    for (source, category), values in groups.items():
+        if len(values) < min_sample:
+            continue
+        values.sort()
+        p10, p25, p50, p75, p90 = (round(percentile(values, p), 2) for p in PERCENTILES)
+        db.session.add(SalaryPercentile(
+            source=source, category=category, sample_size=len(values),
+            p10=p10, p25=p25, p50=p50, p75=p75, p90=p90, computed_at=computed_at,
+        ))
+        stored += 1
+    db.session.commit()
+    return stored
@@ -0,0 +1,282 @@
+"""
+ingestion/scheduler.py
+
+Per-source ingestion scheduler.
+
+Instead of one daily run of every source, each schedule entry — an ingest
+shard (see ingestion/shards.py) or a set of post-load stages — gets its own
+cadence:
+
+  - `interval`: seconds between runs, each one moved by up to ±`jitter`
+    (a fraction of the interval) so sources don't hit upstream or the DB
+    in lockstep; first runs after a start are spread over a few minutes
+  - `quota`: runs allowed per rolling 24 hours (e.g. the Adzuna API
+    budget); a job over quota waits until its oldest run ages out
+  - incremental: a shard extracts, then fingerprints what it got; when the
+    upstream listing is unchanged since its last load, the load and the
+    stages after it are skipped, otherwise the new rows get the
+    'incremental' stages (tag, resolve, alert, …, publish)
+  - probes: sources with a cheap change probe (pipeline.PROBES; Careers24
+    reads page 1 of each keyword) are probed first, and an unchanged probe
+    skips the full extract too. For the others the fingerprint saves only
+    the DB writes and stages: their extract is already one page per query
+
+Jobs run one at a time. Next-run times, quotas and fingerprints persist in
+`state.json` under SCHEDULER_DIR, so a restart picks up where it left off.
+A lock file there keeps to one running scheduler per host, whether it runs
+standalone or inside the web workers:
+
+    python run_pipeline.py schedule            # loop forever
+    python run_pipeline.py schedule --once     # run what's due (e.g. from cron every 5 min)
+    SCHEDULER_ENABLED=1 gunicorn run:app       # on a thread in one web worker
+
+Intervals, jitter and quotas can be overridden per job with a JSON file
+(SCHEDULE_FILE), e.g. {"remotive": {"interval": 1800}}.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from app.models import db
+from ingestion.extractors.adzuna import GLOBAL_COUNTRIES
+from ingestion.pipeline import extract, load_jobs, run_shard, resolve_stages, EXTRACTORS, PROBES
+from ingestion.shards import parse_shard
+
+try:
+    import fcntl
+except ImportError:   # not on Windows: no cross-process lock, run a single scheduler
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_DIR = os.environ.get('SCHEDULER_DIR', os.path.join('data', 'scheduler'))
+SCHEDULE_FILE = os.environ.get('SCHEDULE_FILE')
+TICK_SECONDS = 30             # longest sleep between checks for due jobs
+STARTUP_SPREAD_SECONDS = 300  # first runs of never-run jobs are spread over this window
+QUOTA_WINDOW_SECONDS = 24 * 3600
+
+HOUR = 3600
+DAY = 24 * HOUR
+# job → ingest `shard` or post-load `stages`, interval (s), jitter (fraction), runs per 24h
+DEFAULT_SCHEDULE = {
+    'remotive': {'shard': 'remotive', 'interval': HOUR, 'jitter': 0.1, 'quota': 24},
+    'careers24': {'shard': 'careers24', 'interval': 6 * HOUR, 'jitter': 0.15, 'quota': 6},
+    'adzuna_sa': {'shard': 'adzuna:za', 'interval': DAY, 'jitter': 0.05, 'quota': 2},
+    'adzuna_global': {'shard': 'adzuna:' + ','.join(GLOBAL_COUNTRIES), 'interval': DAY, 'jitter': 0.05,
+                      'quota': 1},
+    'maintenance': {'stages': ['maintenance'], 'interval': DAY, 'jitter': 0.05, 'quota': 2},
+}
+
+
+def load_schedule(path: str = None) -> dict:
+    """DEFAULT_SCHEDULE with the overrides from `path` (default SCHEDULE_FILE); ValueError if invalid."""
+    schedule = {name: dict(job) for name, job in DEFAULT_SCHEDULE.items()}
+    path = path or SCHEDULE_FILE
+    if path:
+        with open(path, encoding='utf-8') as fh:
+            for name, overrides in json.load(fh).items():
+                schedule.setdefault(name, {}).update(overrides)
+    for name, job in schedule.items():
+        if ('shard' in job) == ('stages' in job):
+            raise ValueError(f"schedule job '{name}' needs exactly one of 'shard' or 'stages'")
+        if 'shard' in job and parse_shard(job['shard'])[0] not in EXTRACTORS:
+            raise ValueError(f"schedule job '{name}': unknown source in '{job['shard']}'")
+        resolve_stages(job.get('stages'))
+        if job.get('interval', 0) <= 0 or not 0 <= job.get('jitter', 0) < 1 or job.get('quota', 0) < 1:
+            raise ValueError(f"schedule job '{name}' needs interval > 0, 0 <= jitter < 1 and quota >= 1")
+    return schedule
+
+
+def fingerprint(jobs: list) -> str:
+    """Order-independent digest of an extracted listing (keys, titles, posted dates)."""
+    lines = sorted(
+        f"{job.get('source')}\x1f{job.get('source_job_id')}\x1f{job.get('title')}\x1f{job.get('posted_date')}"
+        for job in jobs
+    )
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def acquire_lock(root: str = None, blocking: bool = False):
+    """
+    Takes the scheduler lock under `root`; returns the open lock file (keep
+    it open to hold the lock) or None when another process holds it.
+    """
+    root = root or SCHEDULER_DIR
+    os.makedirs(root, exist_ok=True)
+    fh = open(os.path.join(root, 'scheduler.lock'), 'a')
+    if fcntl is None:
+        return fh
+    try:
+        fcntl.flock(fh, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except OSError:
+        fh.close()
+        return None
+    return fh
+
+
+class Scheduler:
+    """Runs schedule jobs when due and persists their state; see the module docstring."""
+
+    def __init__(self, schedule: dict = None, root: str = None, clock=time.time, rng: random.Random = None):
+        self.schedule = schedule or load_schedule()
+        self.root = root or SCHEDULER_DIR
+        self.state_path = os.path.join(self.root, 'state.json')
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.state = self._load_state()
+        now = self.clock()
+        for name in self.schedule:
+            entry = self.state.setdefault(name, {})
+            entry.setdefault('next_run_at', now + self.rng.uniform(0, STARTUP_SPREAD_SECONDS))
+            entry.setdefault('runs', [])
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, encoding='utf-8') as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Scheduler state unreadable ({e}); starting fresh.")
+            return {}
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(self.state, fh, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def next_run_after(self, name: str, now: float) -> float:
+        job = self.schedule[name]
+        return now + job['interval'] * (1 + self.rng.uniform(-job['jitter'], job['jitter']))
+
+    def due(self, now: float = None) -> list:
+        """Jobs whose next run time has passed, most overdue first."""
+        now = self.clock() if now is None else now
+        names = [name for name in self.schedule if self.state[name]['next_run_at'] <= now]
+        return sorted(names, key=lambda name: self.state[name]['next_run_at'])
+
+    def next_due_at(self) -> float:
+        return min(self.state[name]['next_run_at'] for name in self.schedule)
+
+    def run_due(self) -> dict:
+        """Runs every due job (one at a time); returns {job: status}."""
+        results = {}
+        for name in self.due():
+            entry = self.state[name]
+            now = self.clock()
+            entry['runs'] = [t for t in entry['runs'] if t > now - QUOTA_WINDOW_SECONDS]
+            if len(entry['runs']) >= self.schedule[name]['quota']:
+                entry['next_run_at'] = entry['runs'][0] + QUOTA_WINDOW_SECONDS
+                results[name] = entry['last_status'] = 'quota'
+                logger.warning(f"⏰ {name}: daily quota used up, next run deferred.")
+                self.save()
+                continue
+
+            started = time.perf_counter()
+            outcome = self.run_job(name)
+            entry['runs'].append(now)
+            entry.update(
+                last_run_at=now,
+                last_status=outcome['status'],
+                last_new_jobs=outcome.get('new_jobs'),
+                last_seconds=round(time.perf_counter() - started, 3),
+                next_run_at=self.next_run_after(name, self.clock()),
+            )
+            results[name] = outcome['status']
+            logger.info(f"⏰ {name}: {outcome['status']} in {entry['last_seconds']}s.")
+            self.save()
+        return results
+
+    def run_job(self, name: str) -> dict:
+        """One run of `name`; returns {'status': ok/unchanged/failed, 'new_jobs'}."""
+        job = self.schedule[name]
+        if 'stages' in job:
+            return {'status': 'ok' if run_shard(stages=job['stages'])['ok'] else 'failed'}
+
+        entry = self.state[name]
+        source, countries = parse_shard(job['shard'])
+        probe = self.probe(name, source, countries)
+        if probe is not None and probe == entry.get('probe'):
+            logger.info(f"⏰ {name}: newest upstream listings unchanged, skipping the extract.")
+            return {'status': 'unchanged', 'new_jobs': 0}
+        try:
+            jobs = extract([source], countries, strict=True)
+            digest = fingerprint(jobs)
+            if digest == entry.get('fingerprint'):
+                entry['probe'] = probe
+                logger.info(f"⏰ {name}: upstream unchanged since the last load, skipping.")
+                return {'status': 'unchanged', 'new_jobs': 0}
+            new_jobs = load_jobs(jobs, strict=True)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Scheduled job '{name}' failed: {e}")
+            return {'status': 'failed'}
+
+        entry.update(fingerprint=digest, probe=probe)
+        if new_jobs and not run_shard(stages=['incremental'])['ok']:
+            return {'status': 'failed', 'new_jobs': new_jobs}
+        return {'status': 'ok', 'new_jobs': new_jobs}
+
+    def probe(self, name: str, source: str, countries) -> str:
+        """Fingerprint of `source`'s change probe, or None (no probe, or it failed)."""
+        if source not in PROBES:
+            return None
+        try:
+            return fingerprint(PROBES[source](countries))
+        except Exception as e:
+            logger.warning(f"⏰ {name}: change probe failed ({e}), running the full extract.")
+            return None
+
+    def run_forever(self, stop: threading.Event = None) -> None:
+        stop = stop or threading.Event()
+        logger.info(f"⏰ Scheduler started: {', '.join(self.schedule)}.")
+        while not stop.is_set():
+            self.run_due()
+            stop.wait(min(max(0.0, self.next_due_at() - self.clock()), TICK_SECONDS))
+
+
+def start_scheduler(app, stop: threading.Event = None) -> threading.Thread:
+    """
+    Runs the scheduler on a daemon thread of `app`'s process. Every web
+    worker starts one, but only the worker holding the lock runs jobs; the
+    others keep retrying, so one takes over if that worker goes away.
+    """
+    stop = stop or threading.Event()
+
+    def target():
+        lock = None
+        while lock is None and not stop.is_set():
+            lock = acquire_lock()
+            if lock is None:
+                stop.wait(TICK_SECONDS)
+        if lock is None:
+            return
+        with lock, app.app_context():
+            try:
+                Scheduler().run_forever(stop)
+            except Exception as e:
+                logger.error(f"Scheduler stopped: {e}")
+
+    thread = threading.Thread(target=target, name='ingestion-scheduler', daemon=True)
+    thread.start()
+    return thread
+
+
+def format_state(scheduler: Scheduler) -> str:
+    now = scheduler.clock()
+    lines = [f"{'job':<16} {'next run in':>12} {'last status':>12} {'new':>5} {'runs/24h':>9}"]
+    for name in scheduler.schedule:
+        entry = scheduler.state[name]
+        recent = sum(1 for t in entry['runs'] if t > now - QUOTA_WINDOW_SECONDS)
+        new_jobs = entry.get('last_new_jobs')
+        lines.append(
+            f"{name:<16} {max(0, entry['next_run_at'] - now) / 60:>10.0f}m "
+            f"{entry.get('last_status', '-'):>12} {'-' if new_jobs is None else new_jobs:>5} "
+            f"{recent:>4}/{scheduler.schedule[name]['quota']:<4}"
+        )
+    return '\n'.join(lines)
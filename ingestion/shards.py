@@ -0,0 +1,120 @@
+"""
+ingestion/shards.py
+
+Pipeline shards as independent processes.
+
+A shard is one slice of an ingest run, written `source[:cc,cc]` — e.g.
+`adzuna:gb,us`, `adzuna:za`, `careers24`. `run_fanout` starts every shard
+as its own `run_pipeline.py run` process, so a slow or failing source
+neither blocks nor aborts the others (loads are safe to run side by side,
+see pipeline.load_jobs). Once all loads have finished it runs the post-load
+stages once, in a last process. Each process writes its step report to a
+status file. The combined report has each shard's exit code, duration and
+step timings, so cron can alert on it and rerun just the slice that failed:
+
+    python run_pipeline.py fanout
+    python run_pipeline.py run --source adzuna --countries gb,us
+    python run_pipeline.py run --stage retention
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ingestion.extractors.adzuna import GLOBAL_COUNTRIES
+
+logger = logging.getLogger(__name__)
+
+RUN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'run_pipeline.py')
+DEFAULT_SHARDS = ['adzuna:za', 'adzuna:' + ','.join(GLOBAL_COUNTRIES), 'careers24', 'remotive']
+SHARD_PARALLELISM = int(os.environ.get('SHARD_PARALLELISM', 4))
+SHARD_TIMEOUT = int(os.environ.get('SHARD_TIMEOUT', 1800))   # seconds per shard process
+TIMED_OUT = -1                                                 # exit code recorded for a killed shard
+
+
+def parse_shard(spec: str) -> tuple:
+    """'adzuna:gb,us' → ('adzuna', ['gb', 'us']); 'careers24' → ('careers24', [])."""
+    source, _, countries = spec.partition(':')
+    return source.strip(), [c.strip() for c in countries.split(',') if c.strip()]
+
+
+def shard_args(spec: str) -> list:
+    """`run_pipeline.py run` arguments selecting the shard."""
+    source, countries = parse_shard(spec)
+    args = ['--source', source]
+    if countries:
+        args += ['--countries', ','.join(countries)]
+    return args
+
+
+def run_process(name: str, args: list, timeout: float = SHARD_TIMEOUT, script: str = RUN_SCRIPT) -> dict:
+    """
+    Runs `script run <args>` in a child process and returns
+    {'shard', 'exit_code', 'seconds', 'steps'}; the steps come from the
+    child's status file (empty when it died before writing one).
+    """
+    fd, status_file = tempfile.mkstemp(prefix='shard-', suffix='.json')
+    os.close(fd)
+    started = time.perf_counter()
+    try:
+        try:
+            exit_code = subprocess.run(
+                [sys.executable, script, 'run', *args, '--status-file', status_file], timeout=timeout,
+            ).returncode
+        except subprocess.TimeoutExpired:
+            logger.error(f"Shard '{name}' timed out after {timeout}s.")
+            exit_code = TIMED_OUT
+        try:
+            with open(status_file, encoding='utf-8') as fh:
+                steps = json.load(fh).get('steps', [])
+        except (OSError, ValueError):
+            steps = []
+    finally:
+        os.remove(status_file)
+    return {
+        'shard': name,
+        'exit_code': exit_code,
+        'seconds': round(time.perf_counter() - started, 3),
+        'steps': steps,
+    }
+
+
+def run_fanout(shards=None, then=('post',), parallelism: int = SHARD_PARALLELISM,
+               timeout: float = SHARD_TIMEOUT, script: str = RUN_SCRIPT) -> dict:
+    """
+    Runs the ingest `shards` (default DEFAULT_SHARDS) as parallel processes,
+    then the `then` stages in one more process. The stages run even if a shard
+    failed, so the slices that did load are still enriched and published.
+    Returns {'ok', 'seconds', 'shards': [run_process reports]}.
+    """
+    shards = list(shards or DEFAULT_SHARDS)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+        reports = list(executor.map(lambda spec: run_process(spec, shard_args(spec), timeout, script), shards))
+    if then:
+        reports.append(run_process('stages:' + ','.join(then), ['--stage', ','.join(then)], timeout, script))
+    return {
+        'ok': all(report['exit_code'] == 0 for report in reports),
+        'seconds': round(time.perf_counter() - started, 3),
+        'shards': reports,
+    }
+
+
+def format_steps(steps: list, indent: str = '    ') -> list:
+    lines = []
+    for step in steps:
+        outcome = 'ok' if step['ok'] else f"FAILED: {step.get('error')}"
+        lines.append(f"{indent}{step['step']:<12} {step['seconds']:>8.2f}s  {outcome}")
+    return lines
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'shard':<32} {'exit':>5} {'seconds':>9}"]
+    for shard in report['shards']:
+        lines.append(f"{shard['shard']:<32} {shard['exit_code']:>5} {shard['seconds']:>9.2f}")
+        lines.extend(format_steps(shard['steps']))
+    lines.append(f"{'TOTAL':<32} {'ok' if report['ok'] else 'FAIL':>5} {report['seconds']:>9.2f}")
+    return '\n'.join(lines)
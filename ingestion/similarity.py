@@ -0,0 +1,258 @@
+"""
+ingestion/similarity.py
+
+"Similar jobs" from precomputed hashed TF-IDF vectors.
+
+At the end of each pipeline run every active canonical job's title +
+description is hashed (signed feature hashing, `VECTOR_DIM` buckets) into
+a sublinear term-frequency row. Rows are cached in `tf.npy` keyed by job id,
+so only jobs new since the last build are tokenized; dropped jobs are
+simply left out. IDF weighting and L2 normalization are then re-applied to
+the whole matrix in one vectorized pass and written to a per-build
+`vectors-<build_id>.npy`.
+
+Web workers memory-map that file (shared page cache, no DB access) and
+answer a lookup with one matrix-vector product plus a partial sort.
+`ids.json` — row ids, IDF and the vectors file name — is replaced
+atomically and written last, so readers always see a matching pair and
+reload when it changes; the previous vectors file is kept for readers
+caught mid-swap.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from app.models import db, Job
+from ingestion.locks import build_lock
+from ingestion.utils import strip_html
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_DIR = os.environ.get('SIMILARITY_DIR', os.path.join('data', 'similarity'))
+VECTOR_DIM = int(os.environ.get('SIMILARITY_DIM', 1024))
+TITLE_WEIGHT = 3          # title terms count this many times
+SIMILARITY_BATCH_SIZE = 500
+DEFAULT_TOP_K = 10
+SIMILARITY_KEEP = 2       # vectors files kept: current + previous (readers mid-swap)
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9#+]*')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our the to we will with '
+    'you your this that who all can job role position work team experience company'.split()
+)
+
+
+def tokenize(title: str, description: str = None) -> Counter:
+    """Weighted term counts: title unigrams + bigrams, description unigrams."""
+    counts = Counter()
+    title_tokens = [t for t in _TOKEN_RE.findall((title or '').lower()) if t not in STOPWORDS]
+    for token in title_tokens:
+        counts[token] += TITLE_WEIGHT
+    for first, second in zip(title_tokens, title_tokens[1:]):
+        counts[f'{first} {second}'] += TITLE_WEIGHT
+    for token in _TOKEN_RE.findall((strip_html(description) or '').lower()):
+        if token not in STOPWORDS:
+            counts[token] += 1
+    return counts
+
+
+def hash_vector(counts: Counter, dim: int = VECTOR_DIM) -> np.ndarray:
+    """Signed feature hashing with sublinear TF (1 + log tf)."""
+    row = np.zeros(dim, dtype=np.float32)
+    for term, count in counts.items():
+        h = zlib.crc32(term.encode('utf-8'))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        row[h % dim] += sign * (1.0 + math.log(count))
+    return row
+
+
+def _weight(tf: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """IDF-weight and L2-normalize rows."""
+    weighted = tf * idf
+    norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (weighted / norms).astype(np.float32)
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'wb') as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+def _save_json(path: str, data) -> None:
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def build_similarity_index(root: str = None, dim: int = VECTOR_DIM) -> dict:
+    """
+    Brings the on-disk index in line with the active canonical jobs,
+    hashing only rows that aren't cached yet. Builds take turns under
+    `build_lock`, so overlapping runs never mix caches. Returns build stats.
+    """
+    root = root or SIMILARITY_DIR
+    with build_lock(root):
+        return _build_index(root, dim)
+
+
+def _build_index(root: str, dim: int) -> dict:
+    ids_path, tf_path = os.path.join(root, 'ids.json'), os.path.join(root, 'tf.npy')
+
+    cached_ids, cached_tf = [], np.zeros((0, dim), dtype=np.float32)
+    if os.path.exists(ids_path) and os.path.exists(tf_path):
+        with open(ids_path, encoding='utf-8') as fh:
+            cached_ids = json.load(fh)['ids']
+        cached_tf = np.load(tf_path)
+        if cached_tf.shape != (len(cached_ids), dim):
+            cached_ids, cached_tf = [], np.zeros((0, dim), dtype=np.float32)
+
+    current = [
+        row.id for row in
+        db.session.query(Job.id)
+        .filter(Job.is_active == True)
+        .filter(Job.canonical_job_id.is_(None))
+        .order_by(Job.id.asc())
+        .all()
+    ]
+    current_set = set(current)
+    position = {job_id: i for i, job_id in enumerate(cached_ids)}
+    kept = [job_id for job_id in cached_ids if job_id in current_set]
+    new_ids = [job_id for job_id in current if job_id not in position]
+
+    new_rows = []
+    for start in range(0, len(new_ids), SIMILARITY_BATCH_SIZE):
+        chunk = new_ids[start:start + SIMILARITY_BATCH_SIZE]
+        texts = dict(
+            (job_id, (title, description)) for job_id, title, description in
+            db.session.query(Job.id, Job.title, Job.description).filter(Job.id.in_(chunk)).all()
+        )
+        new_rows.extend(hash_vector(tokenize(*texts[job_id]), dim) for job_id in chunk)
+
+    tf = np.vstack(
+        [cached_tf[[position[job_id] for job_id in kept]]] + ([np.vstack(new_rows)] if new_rows else [])
+    ).astype(np.float32)
+    ids = kept + new_ids
+
+    # Smoothed IDF over hashed buckets; recomputed from the cached TF rows
+    doc_freq = np.count_nonzero(tf, axis=0)
+    idf = (np.log((1 + len(ids)) / (1 + doc_freq)) + 1).astype(np.float32)
+
+    build_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+    vectors_name = f'vectors-{build_id}.npy'
+    _save_npy(tf_path, tf)
+    _save_npy(os.path.join(root, vectors_name), _weight(tf, idf))
+    # ids.json last: it points readers at the new vectors file
+    _save_json(ids_path, {
+        'build_id': build_id, 'dim': dim, 'vectors': vectors_name,
+        'idf': idf.tolist(), 'ids': ids,
+    })
+    # Keep the previous file for readers that read the old ids.json but haven't
+    # mapped its vectors yet; older ones are only held by readers' open inodes
+    builds = sorted(name for name in os.listdir(root) if name.startswith('vectors-') and name.endswith('.npy'))
+    for name in builds[:-SIMILARITY_KEEP]:
+        os.remove(os.path.join(root, name))
+
+    stats = {'jobs': len(ids), 'hashed': len(new_ids), 'dropped': len(cached_ids) - len(kept)}
+    logger.info(
+        f"🧭 Similarity index: {stats['jobs']} jobs ({stats['hashed']} hashed, "
+        f"{stats['dropped']} dropped)."
+    )
+    return stats
+
+
+class SimilarityIndex:
+    """Read side: memory-mapped vectors + id lookup."""
+
+    def __init__(self, root: str):
+        ids_path = os.path.join(root, 'ids.json')
+        self.root = root
+        self.stamp = _stamp(ids_path)
+        with open(ids_path, encoding='utf-8') as fh:
+            meta = json.load(fh)
+        self.build_id = meta['build_id']
+        self.dim = meta['dim']
+        self.ids = meta['ids']
+        self.position = {job_id: i for i, job_id in enumerate(self.ids)}
+        self.idf = np.asarray(meta['idf'], dtype=np.float32)
+        if self.ids:
+            self.vectors = np.load(os.path.join(root, meta['vectors']), mmap_mode='r')
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+
+    def vector_for_text(self, title: str, description: str = None) -> np.ndarray:
+        return _weight(hash_vector(tokenize(title, description), self.dim), self.idf)
+
+    def top_k(self, query: np.ndarray, k: int = DEFAULT_TOP_K, exclude: str = None) -> list:
+        """[(job_id, cosine score)] best first."""
+        if not self.ids:
+            return []
+        scores = np.asarray(self.vectors @ query)
+        if exclude in self.position:
+            scores[self.position[exclude]] = -np.inf
+        k = min(k, len(self.ids) - (1 if exclude in self.position else 0))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.ids[i], float(scores[i])) for i in best if scores[i] > 0]
+
+
+def _stamp(path: str) -> tuple:
+    # os.replace gives every build a new inode, even within one mtime tick
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(root: str = None):
+    """The current on-disk index (reloaded when a newer build lands), or None."""
+    global _index
+    root = root or SIMILARITY_DIR
+    ids_path = os.path.join(root, 'ids.json')
+    if not os.path.exists(ids_path):
+        return None
+    # A stat per lookup; the files are only re-read when a new build landed
+    stamp = _stamp(ids_path)
+    with _index_lock:
+        if _index is None or _index.root != root or _index.stamp != stamp:
+            try:
+                _index = SimilarityIndex(root)
+            except FileNotFoundError:
+                # Builds landed between reading ids.json and mapping its vectors: read the newest
+                _index = SimilarityIndex(root)
+        return _index
+
+
+def similar_job_ids(job_id: str, k: int = DEFAULT_TOP_K, root: str = None) -> list:
+    """
+    Top-k (job_id, score) for a job. Indexed jobs are looked up by row;
+    others (new since the last build, or inactive) are vectorized on the fly.
+    Returns None when the job doesn't exist.
+    """
+    index = get_index(root)
+    if index is None:
+        exists = db.session.query(Job.id).filter(Job.id == job_id).first() is not None
+        return [] if exists else None
+    row = index.position.get(job_id)
+    if row is not None:
+        query = np.asarray(index.vectors[row])
+    else:
+        job = db.session.query(Job.title, Job.description).filter(Job.id == job_id).first()
+        if job is None:
+            return None
+        query = index.vector_for_text(job.title, job.description)
+    return index.top_k(query, k, exclude=job_id)
@@ -0,0 +1,157 @@
+"""
+ingestion/skills.py
+
+Ingest-time skill tagging.
+
+Each job's title + description is matched once against a skill dictionary
+(canonical skill → aliases) and the canonical tags are written to the
+indexed `job_skills` table. Skill counts, `/api/jobs?skill=...` filters and
+co-occurrence then become index lookups instead of per-skill ILIKE scans.
+
+The dictionary can be overridden with a JSON file (`SKILL_DICTIONARY_PATH`)
+of the same shape. Its checksum is stored on every tagged row
+(`jobs.skills_version`), so editing the dictionary re-tags existing rows on
+the next run — which is also how the initial backfill happens.
+"""
+import json
+import logging
+import os
+import re
+import zlib
+from sqlalchemy import or_
+from app.models import db, Job, JobSkill
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILL_DICTIONARY = {
+    'python':           ['python', 'django', 'flask', 'pandas'],
+    'sql':              ['sql', 't-sql', 'tsql', 'pl/sql', 'mysql', 'postgresql', 'postgres', 'sql server'],
+    'java':             ['java', 'spring boot'],
+    'javascript':       ['javascript', 'js', 'es6'],
+    'typescript':       ['typescript'],
+    'c#':               ['c#', 'csharp'],
+    '.net':             ['.net', 'dotnet', 'asp.net'],
+    'php':              ['php', 'laravel'],
+    'react':            ['react', 'reactjs', 'react.js'],
+    'angular':          ['angular', 'angularjs'],
+    'node.js':          ['node.js', 'nodejs'],
+    'aws':              ['aws', 'amazon web services'],
+    'azure':            ['azure', 'microsoft azure'],
+    'gcp':              ['gcp', 'google cloud'],
+    'docker':           ['docker'],
+    'kubernetes':       ['kubernetes', 'k8s'],
+    'git':              ['git', 'github', 'gitlab'],
+    'linux':            ['linux', 'unix'],
+    'power bi':         ['power bi', 'powerbi'],
+    'tableau':          ['tableau'],
+    'excel':            ['ms excel', 'microsoft excel', 'advanced excel'],
+    'spark':            ['spark', 'pyspark'],
+    'airflow':          ['airflow'],
+    'etl':              ['etl', 'elt'],
+    'cyber security':   ['cyber security', 'cybersecurity', 'information security', 'infosec'],
+    'networking':       ['networking', 'ccna', 'tcp/ip'],
+    'machine learning': ['machine learning', 'ml engineer', 'deep learning'],
+}
+
+# Display labels where `.title()` would read wrong
+SKILL_LABELS = {
+    'sql': 'SQL', 'aws': 'AWS', 'gcp': 'GCP', 'c#': 'C#', '.net': '.NET',
+    'php': 'PHP', 'etl': 'ETL', 'power bi': 'Power BI', 'node.js': 'Node.js',
+    'javascript': 'JavaScript', 'typescript': 'TypeScript',
+}
+
+SKILL_DICTIONARY_PATH = os.environ.get('SKILL_DICTIONARY_PATH')
+TAG_BATCH_SIZE = 500
+
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+
+def load_dictionary(path: str = None) -> dict:
+    path = path or SKILL_DICTIONARY_PATH
+    if path:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    return DEFAULT_SKILL_DICTIONARY
+
+
+class SkillMatcher:
+    """One compiled alternation over every alias; matches map back to canonical skills."""
+
+    def __init__(self, dictionary: dict):
+        self.dictionary = dictionary
+        self.alias_to_skill = {
+            alias.lower(): skill
+            for skill, aliases in dictionary.items()
+            for alias in aliases
+        }
+        # Longest aliases first so "sql server" wins over "sql", "react.js" over "react"
+        aliases = sorted(self.alias_to_skill, key=len, reverse=True)
+        self.pattern = re.compile(
+            r'(?<![a-z0-9])(' + '|'.join(re.escape(a) for a in aliases) + r')(?![a-z0-9])'
+        )
+        checksum = zlib.crc32(json.dumps(dictionary, sort_keys=True).encode('utf-8'))
+        self.version = checksum & 0x7fffffff
+
+    def extract(self, *texts) -> set:
+        text = _HTML_TAG.sub(' ', ' '.join(t for t in texts if t)).lower()
+        return {self.alias_to_skill[m] for m in self.pattern.findall(text)}
+
+    def canonical(self, name: str):
+        """Canonical skill for a user-supplied name/alias, or None."""
+        return self.alias_to_skill.get((name or '').strip().lower())
+
+
+_matcher = None
+
+
+def get_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = SkillMatcher(load_dictionary())
+    return _matcher
+
+
+def skill_label(skill: str) -> str:
+    return SKILL_LABELS.get(skill, skill.title())
+
+
+def tag_job_skills(batch_size: int = TAG_BATCH_SIZE) -> int:
+    """
+    Tags every job whose `skills_version` doesn't match the current
+    dictionary (new rows, and all rows after a dictionary change).
+    Returns the number of jobs tagged.
+    """
+    matcher = get_matcher()
+    tagged = 0
+    last_id = ''
+
+    while True:
+        batch = (
+            db.session.query(Job.id, Job.title, Job.description)
+            .filter(or_(Job.skills_version.is_(None), Job.skills_version != matcher.version))
+            .filter(Job.id > last_id)
+            .order_by(Job.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        ids = [row.id for row in batch]
+        JobSkill.query.filter(JobSkill.job_id.in_(ids)).delete(synchronize_session=False)
+        db.session.add_all(
+            JobSkill(job_id=row.id, skill=skill)
+            for row in batch
+            for skill in matcher.extract(row.title, row.description)
+        )
+        Job.query.filter(Job.id.in_(ids)).update(
+            {'skills_version': matcher.version}, synchronize_session=False
+        )
+        db.session.commit()
+
+        tagged += len(batch)
+        last_id = ids[-1]
+
+    if tagged:
+        logger.info(f"🏷️ Tagged skills on {tagged} jobs.")
+    return tagged
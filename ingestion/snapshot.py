@@ -0,0 +1,327 @@
+"""
+ingestion/snapshot.py
+
+Read-optimized SQLite snapshot of what the web tier reads.
+
+The pipeline's last stage (PUBLISH) copies the active jobs, their skill
+tags, the trend rollups and the salary percentiles from the primary
+database into a fresh SQLite file, then:
+
+  - builds the indexes after the bulk load (compact b-trees), plus an
+    FTS5 trigram index over titles so `?q=` / `?type=` substring searches
+    are index lookups instead of LIKE scans;
+  - precomputes the aggregates page views would otherwise recount
+    (sidebar category counts per board, dataset totals) into
+    `snapshot_stats`;
+  - ANALYZEs and VACUUMs it, publishes it as `jobs-<generation>.db` and
+    atomically replaces `current.json` to point at it.
+
+Builds hold `build_lock` on the snapshot directory, so overlapping publish
+stages (scheduler, /refresh, cron) take turns instead of racing for the
+same generation, and every temporary file name is unique to its build.
+
+Web workers open the current generation read-only and memory-mapped (see
+`get_snapshot` and app/snapshot.py), reopen when `current.json` changes,
+and never touch the primary database for those reads — so a pipeline run
+competing for the connection budget no longer slows page views.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from sqlalchemy import case, create_engine, event, func, select, insert
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.models import db, Job, JobSkill, DailyJobRollup, SalaryPercentile
+from ingestion.locks import build_lock
+from ingestion.rollups import CATEGORY_KEYWORDS, TREND_WINDOWS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.environ.get('SNAPSHOT_ENABLED', '1') in ('1', 'true', 'True')
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join('data', 'snapshot'))
+SNAPSHOT_MMAP_BYTES = int(os.environ.get('SNAPSHOT_MMAP_BYTES', 256 * 1024 * 1024))
+SNAPSHOT_BATCH_SIZE = 2000
+SNAPSHOT_KEEP = 2          # current + previous generation (readers mid-swap)
+STALE_TMP_SECONDS = 24 * 3600   # leftovers of a crashed build are removed after this
+
+# The home board; every other source is on the global board
+SA_BOARD_SOURCES = ('adzuna_sa', 'careers24')
+
+SNAPSHOT_TABLES = (Job.__table__, JobSkill.__table__, DailyJobRollup.__table__, SalaryPercentile.__table__)
+SNAPSHOT_TABLE_NAMES = frozenset(table.name for table in SNAPSHOT_TABLES)
+
+# Extra indexes for the listing queries (active-only data, so no is_active)
+SNAPSHOT_INDEXES = (
+    'CREATE INDEX ix_snapshot_listing ON jobs (canonical_job_id, posted_date)',
+)
+FTS_DDL = "CREATE VIRTUAL TABLE jobs_fts USING fts5(title, content='jobs', tokenize='trigram')"
+
+
+def board_key(board: str, cutoff) -> str:
+    """snapshot_stats key of a board's sidebar counts for one freshness cutoff."""
+    return f'categories:{board}:{cutoff.isoformat()}'
+
+
+def _set_build_pragmas(dbapi_conn, _record):
+    # A throwaway file until it is published: no journal, no fsync per page
+    cursor = dbapi_conn.cursor()
+    cursor.execute('PRAGMA journal_mode=OFF')
+    cursor.execute('PRAGMA synchronous=OFF')
+    cursor.close()
+
+
+def _read_pointer(root: str):
+    path = os.path.join(root, 'current.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _save_json(path: str, data) -> None:
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _copy(conn, table, query) -> int:
+    """Streams `query` from the primary database into `table`."""
+    copied = 0
+    result = db.session.execute(query.execution_options(yield_per=SNAPSHOT_BATCH_SIZE))
+    for rows in result.partitions():
+        conn.execute(insert(table), [row._asdict() for row in rows])
+        copied += len(rows)
+    return copied
+
+
+def _board_counts(conn, cutoff) -> dict:
+    """Sidebar category counts per board, as the pages compute them."""
+    jobs = Job.__table__
+    counts = {}
+    for board, source_filter in (
+        ('sa', jobs.c.source.in_(SA_BOARD_SOURCES)),
+        ('global', jobs.c.source.notin_(SA_BOARD_SOURCES)),
+    ):
+        row = conn.execute(
+            select(func.count(), *[
+                func.sum(case((jobs.c.title.ilike(f'%{keyword}%'), 1), else_=0))
+                for keyword in CATEGORY_KEYWORDS.values()
+            ])
+            .where(jobs.c.posted_date >= cutoff)
+            .where(jobs.c.canonical_job_id.is_(None))
+            .where(source_filter)
+        ).one()
+        counts[board_key(board, cutoff)] = {
+            'all': row[0],
+            **{category: int(value or 0) for category, value in zip(CATEGORY_KEYWORDS, row[1:])},
+        }
+    return counts
+
+
+def _dataset_totals() -> dict:
+    """Totals over every stored job (the snapshot itself only has active ones)."""
+    return {
+        'total_jobs_scraped': Job.query.count(),
+        'active_jobs_now': Job.query.filter_by(is_active=True).filter(Job.canonical_job_id.is_(None)).count(),
+        'linked_duplicates': Job.query.filter(Job.canonical_job_id.isnot(None)).count(),
+        'by_source': dict(db.session.query(Job.source, func.count(Job.id)).group_by(Job.source).all()),
+    }
+
+
+def _create_fts(conn) -> bool:
+    try:
+        conn.exec_driver_sql(FTS_DDL)
+        conn.exec_driver_sql("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        return True
+    except Exception as e:
+        # Trigram tokenizer needs SQLite 3.34+; searches fall back to LIKE
+        logger.warning(f"Snapshot FTS index unavailable: {e}")
+        return False
+
+
+def _prune(root: str, generation: int) -> None:
+    """Drops generations older than SNAPSHOT_KEEP and temp files a crashed build left behind."""
+    stale_before = time.time() - STALE_TMP_SECONDS
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.endswith('.tmp'):
+            try:
+                if os.path.getmtime(path) < stale_before:
+                    os.remove(path)
+            except OSError:
+                pass
+        elif name.startswith('jobs-') and name.endswith('.db'):
+            try:
+                old = int(name[len('jobs-'):-len('.db')])
+            except ValueError:
+                continue
+            if old <= generation - SNAPSHOT_KEEP:
+                os.remove(os.path.join(root, name))
+
+
+def build_snapshot(root: str = None, display_days: int = 150) -> dict:
+    """
+    Builds the next snapshot generation from the primary database and
+    publishes it atomically. `display_days` is the boards' freshness window
+    (for the precomputed sidebar counts). Returns build stats.
+    """
+    root = root or SNAPSHOT_DIR
+    with build_lock(root):
+        return _build_snapshot(root, display_days)
+
+
+def _build_snapshot(root: str, display_days: int) -> dict:
+    pointer = _read_pointer(root)
+    generation = (pointer['generation'] if pointer else 0) + 1
+    name = f'jobs-{generation}.db'
+    tmp_path = os.path.join(root, f'{name}.{uuid.uuid4().hex}.tmp')
+
+    now = datetime.utcnow()
+    cutoff = (now - timedelta(days=display_days)).date()
+    jobs, skills = Job.__table__, JobSkill.__table__
+    rollups = DailyJobRollup.__table__
+    queries = {
+        'jobs': select(jobs).where(jobs.c.is_active == True),
+        'job_skills': (
+            select(skills)
+            .select_from(skills.join(jobs, jobs.c.id == skills.c.job_id))
+            .where(jobs.c.is_active == True)
+        ),
+        'daily_job_rollups': select(rollups).where(rollups.c.day >= now.date() - timedelta(days=max(TREND_WINDOWS))),
+        'salary_percentiles': select(SalaryPercentile.__table__),
+    }
+
+    engine = create_engine(f'sqlite:///{tmp_path}')
+    event.listen(engine, 'connect', _set_build_pragmas)
+    try:
+        with engine.begin() as conn:
+            for table in SNAPSHOT_TABLES:
+                conn.execute(CreateTable(table))
+            rows = {table.name: _copy(conn, table, queries[table.name]) for table in SNAPSHOT_TABLES}
+
+            # Indexes after the load: built bottom-up, so densely packed
+            for table in SNAPSHOT_TABLES:
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index))
+            for ddl in SNAPSHOT_INDEXES:
+                conn.exec_driver_sql(ddl)
+            has_fts = _create_fts(conn)
+
+            stats = {'totals': _dataset_totals(), **_board_counts(conn, cutoff)}
+            conn.exec_driver_sql('CREATE TABLE snapshot_stats (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.exec_driver_sql(
+                'INSERT INTO snapshot_stats (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value)) for key, value in stats.items()],
+            )
+            meta = {
+                'generation': generation, 'built_at': now.isoformat(timespec='seconds'),
+                'cutoff': cutoff.isoformat(), 'fts': int(has_fts), 'rows': rows,
+            }
+            conn.exec_driver_sql('CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.exec_driver_sql(
+                'INSERT INTO snapshot_meta (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value)) for key, value in meta.items()],
+            )
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.exec_driver_sql('ANALYZE')
+            conn.exec_driver_sql('VACUUM')
+    except Exception:
+        engine.dispose()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    engine.dispose()
+
+    with open(tmp_path, 'rb') as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, os.path.join(root, name))
+    # current.json last: it points readers at the new generation
+    _save_json(os.path.join(root, 'current.json'), {'generation': generation, 'file': name})
+    _prune(root, generation)
+
+    size_kb = os.path.getsize(os.path.join(root, name)) // 1024
+    logger.info(
+        f"📸 Published snapshot generation {generation}: {rows['jobs']} jobs, "
+        f"{rows['job_skills']} skill tags, {size_kb} KB{'' if has_fts else ' (no FTS)'}."
+    )
+    return {'generation': generation, 'size_kb': size_kb, **rows}
+
+
+class Snapshot:
+    """Read side: one published generation, opened read-only and memory-mapped."""
+
+    def __init__(self, root: str):
+        pointer_path = os.path.join(root, 'current.json')
+        self.root = root
+        self.stamp = _stamp(pointer_path)
+        with open(pointer_path, encoding='utf-8') as fh:
+            pointer = json.load(fh)
+        self.generation = pointer['generation']
+        self.path = os.path.abspath(os.path.join(root, pointer['file']))
+        self.tables = SNAPSHOT_TABLE_NAMES
+
+        # immutable=1: the file never changes once published, so SQLite
+        # skips locking and change detection entirely
+        self.engine = create_engine(
+            f'sqlite:///file:{quote(self.path)}?mode=ro&immutable=1&uri=true',
+            connect_args={'check_same_thread': False},
+        )
+        event.listen(self.engine, 'connect', _set_read_pragmas)
+        with self.engine.connect() as conn:
+            self.meta = {
+                key: json.loads(value)
+                for key, value in conn.exec_driver_sql('SELECT key, value FROM snapshot_meta')
+            }
+            self.stats = {
+                key: json.loads(value)
+                for key, value in conn.exec_driver_sql('SELECT key, value FROM snapshot_stats')
+            }
+        self.has_fts = bool(self.meta.get('fts'))
+
+    def close(self) -> None:
+        # Connections still checked out finish their request on the old file
+        self.engine.dispose()
+
+
+def _set_read_pragmas(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f'PRAGMA mmap_size={SNAPSHOT_MMAP_BYTES}')
+    cursor.close()
+
+
+def _stamp(path: str) -> tuple:
+    # os.replace gives every publish a new inode, even within one mtime tick
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(root: str = None):
+    """The current published snapshot (reopened when a newer one lands), or None."""
+    global _snapshot
+    root = root or SNAPSHOT_DIR
+    pointer_path = os.path.join(root, 'current.json')
+    if not os.path.exists(pointer_path):
+        return None
+    # A stat per request; the file is only reopened when a new generation landed
+    stamp = _stamp(pointer_path)
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.root != root or _snapshot.stamp != stamp:
+            previous = _snapshot
+            try:
+                _snapshot = Snapshot(root)
+            except Exception as e:
+                logger.warning(f"Snapshot unreadable, serving from the primary database: {e}")
+                return None
+            if previous is not None:
+                previous.close()
+            logger.info(f"📸 Serving snapshot generation {_snapshot.generation}.")
+        return _snapshot
@@ -1,81 +1,157 @@
 # ingestion/utils.py
+"""
+Text and date helpers shared by the extractors.
+
+Patterns are compiled once at import. Date strings are classified through
+a bounded memo (Careers24 repeats the same handful — "Today", "2 days ago",
+"30 June 2025" — on every card), and the reference date comes from
+`reference_date()` for the length of a run instead of the clock on every
+call. The list-in/list-out variants (`parse_relative_dates`,
+`titles_outdated`, `clean_texts`) read the clock once per batch.
+"""
+import html
+import os
 import re
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Stored descriptions are HTML-stripped and capped at this many characters
+DESCRIPTION_MAX_CHARS = int(os.environ.get('DESCRIPTION_MAX_CHARS', 4000))
+# Distinct date strings remembered by parse_relative_date
+DATE_CACHE_SIZE = int(os.environ.get('DATE_CACHE_SIZE', 4096))
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_YEAR_RE = re.compile(r'20\d{2}')
+_DIGITS_RE = re.compile(r'\d+')
+# Shapes strptime could accept for '%d %B %Y' / '%Y-%m-%d'; anything else skips the (raising) parse
+_LONG_DATE_RE = re.compile(r'\s?\d{1,2}\s+[^\W\d_]+\s+\d{4}')
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
 
-def is_title_outdated(text):
+# Set by `reference_date()` for the duration of a run. A context variable,
+# not a global: the scheduler thread and a /refresh thread may run at once.
+_reference_today = ContextVar('reference_today', default=None)
+
+
+@contextmanager
+def reference_date(today: date = None):
+    """Pins "today" (default: the current UTC date) for every helper inside the block, in this thread."""
+    token = _reference_today.set(today or datetime.utcnow().date())
+    try:
+        yield _reference_today.get()
+    finally:
+        _reference_today.reset(token)
+
+
+def utc_today() -> date:
+    return _reference_today.get() or datetime.utcnow().date()
+
+
+def is_title_outdated(text, current_year=None):
     """
     Returns True if the title contains an old year (e.g., 'Graduate Programme 2017').
     Logic: If year found is more than 1 year in the past, it's outdated.
     """
     if not text:
         return False
-        
-    current_year = datetime.now().year
-    cutoff_year = current_year - 1 # Allow last year (for late postings), but nothing older
-    
-    # Find all 4-digit numbers starting with "20" (e.g., 2012, 2023)
-    found_years = re.findall(r'20\d{2}', text)
-    
-    for year_str in found_years:
-        year = int(year_str)
-        # If title says 2017 and we are in 2025 -> Reject
-        if year < cutoff_year:
-            return True
-            
-    return False
+
+    # Allow last year (for late postings), but nothing older
+    cutoff_year = (current_year or utc_today().year) - 1
+
+    # Any 4-digit number starting with "20" (e.g., 2012, 2023) before the cutoff
+    return any(int(year) < cutoff_year for year in _YEAR_RE.findall(text))
+
+
+def titles_outdated(titles, current_year=None) -> list:
+    """Batch `is_title_outdated`: one flag per title."""
+    current_year = current_year or utc_today().year
+    return [is_title_outdated(title, current_year) for title in titles]
+
 
 def clean_text(text):
+    """Collapses runs of whitespace to single spaces and trims."""
     if not text: return None
-    return re.sub(r'\s+', ' ', text).strip()
+    # Same whitespace set as re's \s, without the regex engine
+    return ' '.join(text.split())
 
-def parse_relative_date(date_text):
-    """
-    Parses '2 days ago', 'Today', '30 June 2017', etc.
-    """
-    if not date_text: return datetime.utcnow().date()
-    
+
+def clean_texts(texts) -> list:
+    """Batch `clean_text`."""
+    return [clean_text(text) for text in texts]
+
+
+def strip_html(text):
+    """Drops tags, decodes entities and collapses whitespace."""
+    if not text: return None
+    return clean_text(html.unescape(_HTML_TAG_RE.sub(' ', text)))
+
+
+def prepare_description(text, max_chars=DESCRIPTION_MAX_CHARS):
+    """Normalizes a raw description for storage: plain text, length-capped."""
+    text = strip_html(text)
+    if text and len(text) > max_chars:
+        text = text[:max_chars - 1].rstrip() + '…'
+    return text
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _classify_date(date_text):
+    """A date string → its absolute date, or the number of days before today it means."""
     text = date_text.lower()
-    today = datetime.utcnow().date()
-    
+
     # Handle "Today", "Yesterday", "Hours ago"
-    if 'today' in text or 'hours' in text or 'minutes' in text: return today
-    if 'yesterday' in text: return today - timedelta(days=1)
-    
-    # Handle explicit dates (e.g., "30 June 2017" or "2025-11-09")
-    try:
-        # Try parsing standard formats
-        return datetime.strptime(date_text, '%d %B %Y').date()
-    except ValueError:
-        pass
+    if 'today' in text or 'hours' in text or 'minutes' in text: return 0
+    if 'yesterday' in text: return 1
 
-    try:
-        return datetime.strptime(date_text, '%Y-%m-%d').date()
-    except ValueError:
-        pass
+    # Handle explicit dates (e.g., "30 June 2017" or "2025-11-09")
+    for pattern, fmt in ((_LONG_DATE_RE, '%d %B %Y'), (_ISO_DATE_RE, '%Y-%m-%d')):
+        if pattern.fullmatch(date_text):
+            try:
+                return datetime.strptime(date_text, fmt).date()
+            except ValueError:
+                pass
 
     # Handle "30+ days ago"
-    match = re.search(r'(\d+)', text)
+    match = _DIGITS_RE.search(text)
     if match and 'ago' in text:
-        days_ago = int(match.group(1))
-        return today - timedelta(days=days_ago)
+        return int(match.group())
+
+    return 0
+
 
-    return today
+def parse_relative_date(date_text, today=None):
+    """
+    Parses '2 days ago', 'Today', '30 June 2017', etc.
+    """
+    today = today or utc_today()
+    if not date_text: return today
+
+    parsed = _classify_date(date_text)
+    return parsed if isinstance(parsed, date) else today - timedelta(days=parsed)
+
+
+def parse_relative_dates(date_texts, today=None) -> list:
+    """Batch `parse_relative_date` against a single reference date."""
+    today = today or utc_today()
+    return [parse_relative_date(text, today) for text in date_texts]
 
-def is_date_valid(date_obj, max_age_days=60):
+
+def is_date_valid(date_obj, max_age_days=60, today=None):
     """
     Returns False if the date is in the past (expired) OR too old.
     """
     if not date_obj: return False
-    
-    today = datetime.utcnow().date()
-    
+
+    today = today or utc_today()
+
     # RULE 1: If it's in the future (e.g. Closing Date), it's VALID.
     if date_obj >= today:
         return True
-        
+
     # RULE 2: If it's in the past, is it RECENT? (Posted within last 60 days)
     delta = today - date_obj
     if delta.days > max_age_days:
         return False # Too old (e.g. 2017)
-        
-    return True
\ No newline at end of file
+
+    return True
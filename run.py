@@ -1,6 +1,7 @@
 # run.py
 from app import create_app, db
 from app.models import Job
+from app.schema import upgrade_schema
 
 app = create_app()
 
@@ -9,23 +10,11 @@ app = create_app()
 # We use a special context processor or just run it on startup (simplest for MVP).
 with app.app_context():
     try:
-        db.create_all() # Creates the tables in Postgres if they don't exist
+        # Creates the tables in Postgres if they don't exist, then applies
+        # the quick column/index migrations listed in app/schema.py
+        upgrade_schema()
     except Exception as e:
-        print(f"Schema create_all error (safe to ignore if tables exist): {e}")
-
-    # Automatic quick migrations for new columns
-    from sqlalchemy import text
-    try:
-        db.session.execute(text('ALTER TABLE jobs ADD COLUMN salary_min FLOAT;'))
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-
-    try:
-        db.session.execute(text('ALTER TABLE jobs ADD COLUMN salary_max FLOAT;'))
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
+        print(f"Schema upgrade error (safe to ignore if tables exist): {e}")
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
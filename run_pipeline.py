@@ -1,17 +1,181 @@
 # run_pipeline.py
+import argparse
+import json
+import sys
 from app import create_app
-from ingestion.pipeline import run_etl
+from app.schema import upgrade_schema
+from ingestion.pipeline import run_etl, replay_run, compact_descriptions, run_shard, resolve_stages, EXTRACTORS
+from ingestion.extractors.adzuna import ADZUNA_COUNTRIES
+from ingestion import shards, scheduler
+from ingestion.liveness import check_job_links
+from ingestion.salary import normalize_job_salaries, refresh_salary_percentiles
 
 # 1. Create the app to get access to the DB config
 app = create_app()
 
-# 2. Push the application context
-# This allows the script to use 'db.session' and your models
-if __name__ == "__main__":
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the JobTracker ETL pipeline.")
+    parser.add_argument(
+        '--replay', metavar='RUN_ID', nargs='?', const='latest',
+        help="Replay transform+load from a landed run (default: latest = newest run per shard) without any HTTP.",
+    )
+    parser.add_argument(
+        '--compact-descriptions', action='store_true',
+        help="Backfill: rewrite stored descriptions as stripped (optionally compressed) text.",
+    )
+    parser.add_argument(
+        '--check-links', action='store_true',
+        help="Only run the link liveness check over the next slice of active jobs.",
+    )
+    parser.add_argument(
+        '--renormalize-salaries', action='store_true',
+        help="Recompute annual base-currency salaries for every row (after editing the rate table).",
+    )
+    parser.add_argument(
+        '--landing-dir', metavar='PATH',
+        help="Landing zone root to replay from (defaults to LANDING_DIR).",
+    )
+
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    run = commands.add_parser(
+        'run', help="Run one shard: extract+load the selected sources and/or the selected stages.",
+    )
+    run.add_argument(
+        '--source', type=_csv, action='extend', default=[],
+        help="Sources to extract and load (adzuna, careers24, remotive; repeatable or comma-separated).",
+    )
+    run.add_argument(
+        '--countries', type=_csv, default=[],
+        help="Adzuna country slice, e.g. gb,us ('za' = the SA search).",
+    )
+    run.add_argument(
+        '--stage', type=_csv, action='extend', default=[],
+        help="Post-load stages to run, in pipeline order (e.g. retention; 'post' = all, 'enrich').",
+    )
+    run.add_argument('--status-file', metavar='PATH', help="Write the shard's step report here as JSON.")
+
+    fanout = commands.add_parser(
+        'fanout', help="Run ingest shards as parallel processes, then the post-load stages once.",
+    )
+    fanout.add_argument(
+        '--shard', action='append', metavar='SOURCE[:CC,CC]',
+        help=f"Shard to run (repeatable; default: {' '.join(shards.DEFAULT_SHARDS)}).",
+    )
+    fanout.add_argument(
+        '--then', type=_csv, default=['post'],
+        help="Stages to run after the loads ('none' to skip; default: post).",
+    )
+    fanout.add_argument('--parallel', type=int, default=shards.SHARD_PARALLELISM, help="Shards run at once.")
+    fanout.add_argument('--timeout', type=float, default=shards.SHARD_TIMEOUT, help="Seconds per shard process.")
+    fanout.add_argument('--status-file', metavar='PATH', help="Write the combined report here as JSON.")
+
+    schedule = commands.add_parser(
+        'schedule', help="Run each source on its own interval/jitter/quota (see ingestion/scheduler.py).",
+    )
+    schedule.add_argument('--once', action='store_true', help="Run the jobs that are due, then exit.")
+    schedule.add_argument('--status', action='store_true', help="Print the persisted schedule state and exit.")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        if not (args.source or args.stage):
+            run.error("select --source and/or --stage")
+        _check_slice(run, args.source, args.countries)
+        _check_stages(run, args.stage)
+    if args.command == 'fanout':
+        for spec in args.shard or ():
+            _check_slice(fanout, *shards.parse_shard(spec))
+        if args.then == ['none']:
+            args.then = []
+        _check_stages(fanout, args.then)
+    return args
+
+
+def _check_slice(parser, sources, countries) -> None:
+    sources = [sources] if isinstance(sources, str) else sources
+    unknown = [s for s in sources if s not in EXTRACTORS] + [c for c in countries if c not in ADZUNA_COUNTRIES]
+    if unknown:
+        parser.error(f"unknown source/country: {', '.join(unknown)}")
+    if countries and sources != ['adzuna']:
+        parser.error("countries only apply to the adzuna source")
+
+
+def _check_stages(parser, names) -> None:
+    try:
+        resolve_stages(names)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def _csv(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def write_status(path: str, report: dict) -> None:
+    if path:
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, default=str)
+
+
+def run_scheduler(once: bool = False, status: bool = False) -> int:
+    if status:
+        print(scheduler.format_state(scheduler.Scheduler()))
+        return 0
+    lock = scheduler.acquire_lock()
+    if lock is None:
+        print("Another scheduler holds the lock; not starting.")
+        return 1
+    with lock:
+        runner = scheduler.Scheduler()
+        if once:
+            results = runner.run_due()
+            print(scheduler.format_state(runner))
+            return 1 if 'failed' in results.values() else 0
+        runner.run_forever()
+    return 0
+
+
+def main(argv=None) -> int:
+    """Runs the selected command; returns the process exit code."""
+    args = parse_args(argv)
     with app.app_context():
-        print("Starting ETL Pipeline...")
         try:
-            run_etl()
-            print("ETL Pipeline completed successfully.")
+            upgrade_schema()
+            if args.command == 'run':
+                report = run_shard(sources=args.source, countries=args.countries, stages=args.stage)
+                write_status(args.status_file, report)
+                print('\n'.join(shards.format_steps(report['steps'], indent='')))
+                return 0 if report['ok'] else 1
+            if args.command == 'fanout':
+                report = shards.run_fanout(args.shard, then=args.then, parallelism=args.parallel,
+                                           timeout=args.timeout)
+                write_status(args.status_file, report)
+                print(shards.format_report(report))
+                return 0 if report['ok'] else 1
+            if args.command == 'schedule':
+                return run_scheduler(once=args.once, status=args.status)
+            if args.compact_descriptions:
+                print(f"Compacted {compact_descriptions()} descriptions.")
+            elif args.check_links:
+                print(f"Link check: {check_job_links()}")
+            elif args.renormalize_salaries:
+                print(f"Renormalized {normalize_job_salaries(force=True)} salaries.")
+                refresh_salary_percentiles()
+            elif args.replay:
+                print(f"Replaying landed run '{args.replay}'...")
+                new_jobs = replay_run(args.replay, root=args.landing_dir)
+                print(f"Replay completed: {new_jobs} new jobs loaded.")
+            else:
+                print("Starting ETL Pipeline...")
+                run_etl()
+                print("ETL Pipeline completed successfully.")
         except Exception as e:
-            print(f"ETL Pipeline Failed: {e}")
\ No newline at end of file
+            print(f"ETL Pipeline Failed: {e}")
+            return 1
+    return 0
+
+
+# 2. Push the application context
+# This allows the script to use 'db.session' and your models
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+tests/conftest.py
+
+Shared fixtures: an app bound to an in-memory SQLite database, and job
+factories for seeding it.
+"""
+import pytest
+from datetime import date, timedelta
+from app import create_app
+from app.config import Config
+from app.models import db, Job
+from app.profiling import capture_queries
+from ingestion import archive, locks, similarity, snapshot
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    HEALTH_PROBE_INTERVAL = 0     # no background prober thread; probe inline
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    """Keep retention's archive writes out of the working tree."""
+    path = str(tmp_path / 'archive')
+    monkeypatch.setattr(archive, 'ARCHIVE_DIR', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def similarity_dir(tmp_path, monkeypatch):
+    """Same for the similar-jobs index files."""
+    path = str(tmp_path / 'similarity')
+    monkeypatch.setattr(similarity, 'SIMILARITY_DIR', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def lock_dir(tmp_path, monkeypatch):
+    """And for the writers/watermark lock file."""
+    path = str(tmp_path / 'locks')
+    monkeypatch.setattr(locks, 'LOCK_DIR', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    """And for the published read snapshots."""
+    path = str(tmp_path / 'snapshot')
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', path)
+    return path
+
+
+def _job_fields(source_job_id, title='Junior Developer', source='careers24', days_ago=0, **fields):
+    fields.setdefault('url', f'https://example.com/{source_job_id}')
+    fields.setdefault('posted_date', date.today() - timedelta(days=days_ago))
+    fields.setdefault('is_active', True)
+    return dict(source=source, source_job_id=str(source_job_id), title=title, **fields)
+
+
+@pytest.fixture
+def raw_job():
+    """
+    Factory for extracted job dicts (what load_jobs takes): an active
+    careers24 'Junior Developer' posted `days_ago` days ago; any column
+    can be overridden by keyword.
+    """
+    return _job_fields
+
+
+@pytest.fixture
+def make_job():
+    """Same defaults as `raw_job`, as an unsaved Job row."""
+    return lambda *args, **kwargs: Job(**_job_fields(*args, **kwargs))
+
+
+@pytest.fixture
+def assert_max_queries(app, client):
+    """
+    Request helper that fails when a route issues more than `limit` SQL
+    statements, listing repeated statement shapes (N+1 suspects).
+    """
+    def check(url, limit, method='get', **kwargs):
+        with capture_queries(db.engine) as profile:
+            response = getattr(client, method)(url, **kwargs)
+        repeated = '\n'.join(f'  {n}× {fp}' for fp, n in profile.repeated(2).items())
+        assert profile.count <= limit, (
+            f"{method.upper()} {url} issued {profile.count} queries (budget {limit})\n{repeated}"
+        )
+        return response
+    return check
@@ -0,0 +1,158 @@
+"""
+tests/test_admission.py
+
+Tests for admission control: token buckets (memory and database
+backends), per-client keys, request costs, the concurrency gate and the
+429 responses on /api and /refresh.
+Run with: python -m pytest tests/ -v
+"""
+import pytest
+from app import create_app
+from app.admission import DatabaseBackend, MemoryBackend, Policy, parse_rate
+from app.models import db
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def make_client():
+    """Builds an app with config overrides; returns its test client."""
+    contexts = []
+
+    def build(**overrides):
+        config = type('AdmissionConfig', (TestConfig,), overrides)
+        app = create_app(config)
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        db.create_all()
+        return app.test_client()
+
+    yield build
+    for context in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        context.pop()
+
+
+def _statuses(client, url, times, **kwargs):
+    return [client.get(url, **kwargs).status_code for _ in range(times)]
+
+
+class TestBuckets:
+
+    def test_parse_rate(self):
+        assert parse_rate('120/minute') == 2.0
+        assert parse_rate('4/hour') == 4 / 3600
+        for bad in ('fast', '10/fortnight', '0/second'):
+            with pytest.raises(ValueError):
+                parse_rate(bad)
+
+    def test_memory_bucket_refills_over_time(self):
+        backend, policy = MemoryBackend(), Policy(rate=1.0, burst=2)
+        assert [backend.take('c', policy, 1, now=100.0) for _ in range(2)] == [0.0, 0.0]
+        assert backend.take('c', policy, 1, now=100.0) == pytest.approx(1.0)
+        assert backend.take('c', policy, 1, now=101.0) == 0.0
+        assert backend.take('other', policy, 2, now=101.0) == 0.0
+
+    def test_memory_backend_evicts_idle_buckets(self):
+        backend, policy = MemoryBackend(max_buckets=2), Policy(rate=1.0, burst=1)
+        for key in ('a', 'b', 'c'):
+            backend.take(key, policy, 1, now=0.0)
+        assert list(backend._buckets) == ['b', 'c']
+
+    def test_database_bucket_is_shared_by_workers(self, app):
+        worker_a, worker_b = DatabaseBackend(db.engine), DatabaseBackend(db.engine)
+        policy = Policy(rate=0.5, burst=3)
+        assert worker_a.take('api:ip:1', policy, 2, now=10.0) == 0.0
+        assert worker_b.take('api:ip:1', policy, 1, now=10.0) == 0.0
+        assert worker_a.take('api:ip:1', policy, 1, now=10.0) == pytest.approx(2.0)
+        assert worker_b.take('api:ip:1', policy, 1, now=12.0) == 0.0
+
+
+class TestApiLimits:
+
+    def test_client_is_refused_with_retry_after(self, make_client):
+        client = make_client(RATE_LIMIT_API='6/minute', RATE_LIMIT_API_BURST=3)
+        assert _statuses(client, '/api/jobs', 3) == [200, 200, 200]
+
+        response = client.get('/api/jobs')
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '10'
+        assert response.get_json()['reason'] == 'rate limit'
+        assert client.get('/api/health').status_code == 200      # monitoring is exempt
+
+    def test_large_pages_cost_more(self, make_client):
+        client = make_client(RATE_LIMIT_API='1/minute', RATE_LIMIT_API_BURST=5)
+        assert _statuses(client, '/api/jobs?limit=200', 2) == [200, 429]
+        assert client.get('/api/jobs?limit=50').status_code == 200
+
+    def test_clients_have_separate_buckets(self, make_client):
+        client = make_client(RATE_LIMIT_API='1/minute', RATE_LIMIT_API_BURST=1)
+        abuser = {'X-Forwarded-For': '203.0.113.9'}
+        assert _statuses(client, '/api/stats', 2, headers=abuser) == [200, 429]
+        assert client.get('/api/stats', headers={'X-Forwarded-For': '198.51.100.7'}).status_code == 200
+
+    def test_only_known_api_keys_get_their_own_bucket(self, make_client):
+        client = make_client(RATE_LIMIT_API='1/minute', RATE_LIMIT_API_BURST=1, RATE_LIMIT_API_KEYS='partner')
+        assert client.get('/api/stats').status_code == 200
+        assert client.get('/api/stats', headers={'X-API-Key': 'made-up'}).status_code == 429
+        assert client.get('/api/stats', headers={'X-API-Key': 'partner'}).status_code == 200
+
+    def test_database_backend(self, make_client):
+        client = make_client(RATE_LIMIT_BACKEND='database', RATE_LIMIT_API='1/minute', RATE_LIMIT_API_BURST=2)
+        assert _statuses(client, '/api/skills', 3) == [200, 200, 429]
+
+    def test_disabled(self, make_client):
+        client = make_client(ADMISSION_ENABLED=False, RATE_LIMIT_API='1/minute', RATE_LIMIT_API_BURST=1)
+        assert _statuses(client, '/api/jobs', 3) == [200, 200, 200]
+
+
+class TestGateAndRefresh:
+
+    def test_busy_gate_refuses_expensive_requests(self, make_client):
+        client = make_client(ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0)
+        gate = client.application.extensions['admission'].gate
+        assert gate.acquire()              # an expensive request in flight
+        try:
+            response = client.get('/api/trends')
+            assert response.status_code == 429
+            assert response.get_json()['reason'] == 'busy'
+            assert client.get('/api/jobs/none').status_code == 404    # ungated routes unaffected
+        finally:
+            gate.release()
+        assert client.get('/api/trends').status_code == 200
+
+    def test_busy_gate_refuses_html_pages(self, make_client):
+        client = make_client(ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0)
+        gate = client.application.extensions['admission'].gate
+        assert gate.acquire()
+        try:
+            assert [client.get(url).status_code for url in ('/', '/global?q=data', '/stats')] == [429] * 3
+            assert client.get('/tracker').status_code == 200
+        finally:
+            gate.release()
+        assert client.get('/stats').status_code == 200
+
+    def test_refresh_is_rate_limited(self, make_client, monkeypatch):
+        from app.web import routes
+        monkeypatch.setattr(routes, 'threading', type('T', (), {'Thread': _NoThread}))
+        client = make_client(RATE_LIMIT_REFRESH='1/hour', RATE_LIMIT_REFRESH_BURST=1)
+        assert client.post('/refresh').status_code == 302
+        routes._pipeline_state['running'] = False
+        response = client.post('/refresh')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 3000
+        assert response.headers['Location'] == '/'
+        assert response.mimetype == 'text/html'
+        with client.session_transaction() as session:
+            assert 'Refresh limit reached' in session['_flashes'][-1][1]
+
+
+class _NoThread:
+    """Stands in for the background pipeline thread."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
@@ -0,0 +1,114 @@
+"""
+tests/test_alerts.py
+
+Tests for saved searches, inverted-index matching and the alert outbox.
+Run with: python -m pytest tests/ -v
+"""
+import json
+from datetime import datetime, timedelta
+from app.models import db, Job, SavedSearch, AlertOutbox
+from ingestion import alerts
+from ingestion.alerts import SearchIndex, query_terms, job_terms, match_new_jobs, deliver_alerts
+from ingestion.pipeline import delete_jobs
+
+T0 = datetime(2025, 6, 1, 8, 0)
+
+
+class TestSearchIndex:
+
+    def test_all_terms_must_match(self):
+        index = SearchIndex([
+            ('py-dbn', 'Junior Python Durban', T0),
+            ('py', 'python', T0),
+            ('java', 'java developer', T0),
+        ])
+        terms = job_terms('Junior Python Developer', 'Durban, KwaZulu-Natal')
+        assert sorted(index.match(terms)) == ['py', 'py-dbn']
+        assert index.match(job_terms('Java Intern')) == []
+
+    def test_terms(self):
+        assert query_terms('Junior C# developer in the Cape') == {'junior', 'c#', 'developer', 'cape'}
+        assert 'remote' in job_terms('Data Analyst', is_remote=True)
+        assert query_terms('   ') == frozenset()
+
+
+class TestMatchNewJobs:
+
+    def _run(self, app, make_job):
+        with app.app_context():
+            # First run only starts the clock
+            assert match_new_jobs(now=T0) == 0
+            later = T0 + timedelta(hours=1)
+            db.session.add_all([
+                SavedSearch(id='s1', query='junior python durban', created_at=T0),
+                SavedSearch(id='s2', query='remote analyst', created_at=T0),
+                make_job('old', 'Junior Python Developer', location='Durban', first_seen_at=T0 - timedelta(days=1)),
+                make_job('new', 'Junior Python Developer', location='Durban', first_seen_at=later),
+                make_job('rem', 'Data Analyst', location='Anywhere', first_seen_at=later, is_remote=True),
+                make_job('jhb', 'Junior Python Developer', location='Johannesburg', first_seen_at=later),
+            ])
+            db.session.commit()
+            return match_new_jobs(now=T0 + timedelta(hours=2))
+
+    def test_matches_only_new_jobs(self, app, make_job):
+        assert self._run(app, make_job) == 2
+        with app.app_context():
+            pairs = set(
+                db.session.query(AlertOutbox.search_id, Job.source_job_id)
+                .join(Job, Job.id == AlertOutbox.job_id)
+                .all()
+            )
+            assert pairs == {('s1', 'new'), ('s2', 'rem')}
+            # The watermark moved: nothing is matched twice
+            assert match_new_jobs(now=T0 + timedelta(hours=3)) == 0
+
+    def test_search_ignores_jobs_from_before_it_was_saved(self, app, make_job):
+        with app.app_context():
+            match_new_jobs(now=T0)
+            db.session.add_all([
+                SavedSearch(id='late', query='python', created_at=T0 + timedelta(hours=2)),
+                make_job('early', 'Python Developer', first_seen_at=T0 + timedelta(hours=1)),
+            ])
+            db.session.commit()
+            assert match_new_jobs(now=T0 + timedelta(hours=3)) == 0
+
+    def test_file_delivery(self, app, make_job, tmp_path, monkeypatch):
+        outbox = tmp_path / 'outbox.jsonl'
+        monkeypatch.setattr(alerts, 'ALERT_DELIVERY', 'file')
+        monkeypatch.setattr(alerts, 'ALERT_OUTBOX_FILE', str(outbox))
+        self._run(app, make_job)
+        with app.app_context():
+            assert deliver_alerts() == 2
+            assert deliver_alerts() == 0
+            assert AlertOutbox.query.filter(AlertOutbox.delivered_at.is_(None)).count() == 0
+        digests = [json.loads(line) for line in outbox.read_text().splitlines()]
+        assert sorted(d['search']['id'] for d in digests) == ['s1', 's2']
+
+    def test_deleting_jobs_clears_outbox(self, app, make_job):
+        self._run(app, make_job)
+        with app.app_context():
+            ids = [job.id for job in Job.query.all()]
+            delete_jobs(ids)
+            db.session.commit()
+            assert AlertOutbox.query.count() == 0
+
+
+class TestSavedSearchAPI:
+
+    def test_create_get_delete(self, app, client):
+        created = client.post('/api/searches', json={'query': 'junior python durban', 'notify': 'me@example.com'})
+        assert created.status_code == 201
+        search_id = created.get_json()['id']
+
+        data = client.get(f'/api/searches/{search_id}').get_json()
+        assert data['query'] == 'junior python durban'
+        assert data['alerts'] == []
+
+        assert client.delete(f'/api/searches/{search_id}').status_code == 200
+        assert client.get(f'/api/searches/{search_id}').status_code == 404
+
+    def test_validation(self, client):
+        assert client.post('/api/searches', json={'query': ''}).status_code == 400
+        assert client.post('/api/searches', json={'query': 'the of'}).status_code == 400
+        assert client.post('/api/searches', json={'query': ' '.join(f't{i}' for i in range(9))}).status_code == 400
+        assert client.post('/api/searches', json={'query': 'python', 'notify': 5}).status_code == 400
@@ -0,0 +1,97 @@
+"""
+tests/test_archive.py
+
+Tests for the cold archive tier written by retention.
+Run with: python -m pytest tests/ -v
+"""
+import os
+from datetime import date
+import pytest
+from app.models import db, Job, JobSkill
+from ingestion import archive
+from ingestion.pipeline import cleanup_old_jobs, delete_jobs
+
+
+def _seed(make_job):
+    jobs = [
+        make_job(f'a{n}', 'Junior Data Analyst', source=source, posted_date=posted_date,
+                 description='SQL and Power BI')
+        for n, source, posted_date in [
+            (1, 'adzuna_sa', date(2025, 3, 2)),
+            (2, 'careers24', date(2025, 3, 20)),
+            (3, 'adzuna_sa', date(2025, 4, 1)),
+        ]
+    ]
+    db.session.add_all(jobs)
+    db.session.flush()
+    db.session.add_all([
+        JobSkill(job_id=jobs[0].id, skill='sql'),
+        JobSkill(job_id=jobs[0].id, skill='power bi'),
+        JobSkill(job_id=jobs[1].id, skill='sql'),
+    ])
+    db.session.commit()
+    return [job.id for job in jobs]
+
+
+class TestArchive:
+
+    @pytest.mark.parametrize('fmt', ['jsonl', 'parquet'])
+    def test_round_trip_and_monthly_counts(self, app, make_job, archive_dir, fmt):
+        if fmt == 'parquet':
+            pytest.importorskip('pyarrow')
+        with app.app_context():
+            ids = _seed(make_job)
+            assert archive.archive_jobs(ids, fmt=fmt) == 3
+
+        assert [key for key, _ in archive.list_partitions()] == ['2025-03', '2025-04']
+        records = {r['source_job_id']: r for r in archive.iter_archive()}
+        assert records['a1']['skills'] == ['power bi', 'sql']
+        assert records['a1']['description'] == 'SQL and Power BI'
+
+        assert archive.monthly_counts('source') == {
+            '2025-03': {'adzuna_sa': 1, 'careers24': 1},
+            '2025-04': {'adzuna_sa': 1},
+        }
+        assert archive.monthly_counts('skill') == {'2025-03': {'sql': 2, 'power bi': 1}}
+        assert archive.monthly_counts('source', start='2025-04') == {'2025-04': {'adzuna_sa': 1}}
+
+    def test_reads_are_deduplicated_by_id(self, app, make_job):
+        with app.app_context():
+            ids = _seed(make_job)
+            archive.archive_jobs(ids, fmt='jsonl')
+            archive.archive_jobs(ids, fmt='jsonl')
+        assert len(list(archive.iter_archive())) == 3
+
+    def test_delete_jobs_archives_first(self, app, make_job, archive_dir):
+        with app.app_context():
+            ids = _seed(make_job)
+            delete_jobs(ids[:1])
+            db.session.commit()
+            assert Job.query.count() == 2
+            assert JobSkill.query.count() == 1
+        assert [r['source_job_id'] for r in archive.iter_archive()] == ['a1']
+
+    def test_failed_archive_aborts_deletion(self, app, make_job, monkeypatch):
+        def broken(ids):
+            raise OSError('disk full')
+        monkeypatch.setattr(archive, 'archive_jobs', broken)
+        with app.app_context():
+            ids = _seed(make_job)
+            db.session.add(make_job('old', days_ago=400))
+            db.session.commit()
+            cleanup_old_jobs(max_days=180, max_rows=100)
+            assert Job.query.count() == len(ids) + 1
+
+    def test_archive_api(self, app, client, make_job):
+        with app.app_context():
+            archive.archive_jobs(_seed(make_job), fmt='jsonl')
+        data = client.get('/api/archive/monthly?by=skill&to=2025-03').get_json()
+        assert data == {'by': 'skill', 'months': [{'month': '2025-03', 'counts': {'sql': 2, 'power bi': 1}}]}
+        assert client.get('/api/archive/monthly?by=title').status_code == 400
+
+    def test_disabled_archive_writes_nothing(self, app, make_job, archive_dir, monkeypatch):
+        monkeypatch.setattr(archive, 'ARCHIVE_ENABLED', False)
+        with app.app_context():
+            delete_jobs(_seed(make_job))
+            db.session.commit()
+        assert not os.path.exists(archive_dir)
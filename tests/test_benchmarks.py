@@ -0,0 +1,80 @@
+"""
+tests/test_benchmarks.py
+
+Sanity checks for the benchmark suite (inputs, comparison, ETL harness).
+Run with: python -m pytest tests/ -v
+"""
+from app.models import Job
+from benchmarks import data, loadtest, seed, suite
+
+
+def _report(**seconds):
+    return {'meta': {'commit': 'x'}, 'results': {name: {'seconds': s} for name, s in seconds.items()}}
+
+
+class TestSyntheticData:
+
+    def test_inputs_are_reproducible(self):
+        assert data.titles(50) == data.titles(50)
+        assert data.adzuna_items(5) == data.adzuna_items(5)
+        assert data.careers24_pages(30) == data.careers24_pages(30)
+
+    def test_landed_records_split(self):
+        records = data.landed_records(200)
+        assert sum(len(r['payload']) for r in records['adzuna']) == 100
+        assert sum(len(r['payload']) for r in records['remotive']) == 50
+        assert sum(r['payload'].count('class="job-card"') for r in records['careers24']) == 50
+
+
+class TestCompare:
+
+    def test_flags_beyond_threshold(self):
+        rows = suite.compare(_report(a=1.0, b=1.0, c=1.0, gone=1.0), _report(a=1.25, b=1.05, c=0.5), 0.10)
+        assert [(name, verdict) for name, *_, verdict in rows] == [
+            ('a', 'regression'), ('b', 'ok'), ('c', 'improvement'),
+        ]
+
+
+class TestHarness:
+
+    def test_case_reports_best_run(self):
+        calls = []
+        result = suite.Case('noop', lambda state: calls.append(state), 10, setup=lambda: 'ready').run(3)
+        assert calls == ['ready'] * 3
+        assert result['ops'] == 10 and result['repeat'] == 3
+
+    def test_etl_case_loads_without_http(self):
+        case = suite.etl_case(40)
+        state = case.setup()
+        try:
+            from app.models import Job
+            from ingestion import pipeline
+            assert pipeline.run_etl() > 0
+            assert Job.query.count() > 0
+        finally:
+            case.teardown(state)
+
+
+class TestSeedAndLoad:
+
+    def test_seed_distribution_and_clear(self, app):
+        seed.seed_jobs(400, derive=False)
+        shares = {source: count for source, count, _ in seed.summarize()}
+        assert sum(shares.values()) == 400
+        assert shares['careers24'] > shares['remotive'] > shares['adzuna_au']
+        assert Job.query.filter(Job.salary_min.isnot(None), Job.source == 'careers24').count() == 0
+        assert seed.clear_synthetic() == 400
+        assert Job.query.count() == 0
+
+    def test_load_reports_percentiles_per_route(self, app):
+        seed.seed_jobs(150)
+        server, base_url = loadtest.serve_app(app)
+        try:
+            report = loadtest.run_load(base_url, concurrency=2, total_requests=40)
+        finally:
+            server.shutdown()
+        assert report['overall']['requests'] == 40
+        assert report['overall']['errors'] == 0
+        for route in report['routes'].values():
+            assert route['p50_ms'] <= route['p95_ms'] <= route['p99_ms'] <= route['max_ms']
+        assert 'TOTAL' in loadtest.format_report(report)
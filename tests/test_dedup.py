@@ -0,0 +1,115 @@
+"""
+tests/test_dedup.py
+
+Tests for MinHash/LSH near-duplicate linking.
+Run with: python -m pytest tests/ -v
+"""
+from datetime import date, datetime, timedelta
+from app.models import db, Job, JobSignature
+from ingestion.dedup import (
+    LSHIndex, link_near_duplicates, normalize_text, signature_for, similarity,
+)
+from ingestion.pipeline import deactivate_old_jobs, delete_jobs
+
+
+def _seen(minutes):
+    return datetime(2026, 7, 1) + timedelta(minutes=minutes)
+
+
+class TestSignatures:
+
+    def test_normalize_strips_company_suffixes(self):
+        assert normalize_text('IT Graduate', 'Acme (Pty) Ltd') == normalize_text('IT Graduate', 'Acme')
+
+    def test_near_identical_titles_are_similar(self):
+        a = signature_for('ICT Graduate Programme 2026', 'Standard Bank')
+        b = signature_for('ICT Graduate Programme 2026 - Johannesburg', 'Standard Bank Group')
+        c = signature_for('Junior QA Tester', 'Takealot')
+        assert similarity(a, b) > similarity(a, c)
+        assert similarity(a, a) == 1.0
+
+    def test_lsh_index_returns_only_confident_matches(self):
+        index = LSHIndex()
+        index.add('a', signature_for('Graduate Data Analyst', 'Discovery'))
+        index.add('b', signature_for('Junior Java Developer', 'Entelect'))
+        assert index.query(signature_for('Graduate Data Analyst', 'Discovery Ltd')) == ['a']
+
+
+class TestLinkNearDuplicates:
+
+    def test_links_cross_source_duplicate_to_earliest(self, app, make_job):
+        first = make_job('1', 'ICT Graduate Programme', source='adzuna_sa', company='Standard Bank',
+                         first_seen_at=_seen(0))
+        dupe = make_job('2', 'ICT Graduate Programme', company='Standard Bank (Pty) Ltd', first_seen_at=_seen(5))
+        other = make_job('3', 'Junior Java Developer', company='Entelect', first_seen_at=_seen(6))
+        db.session.add_all([first, dupe, other])
+        db.session.commit()
+
+        assert link_near_duplicates() == 1
+        assert dupe.canonical_job_id == first.id
+        assert first.canonical_job_id is None
+        assert other.canonical_job_id is None
+
+    def test_only_new_rows_are_hashed(self, app, make_job):
+        db.session.add(make_job('1', 'ICT Graduate Programme', source='adzuna_sa', company='Standard Bank',
+                                first_seen_at=_seen(0)))
+        db.session.commit()
+        link_near_duplicates()
+
+        later = make_job('9', 'ICT Graduate Programme', source='adzuna_gb', company='Standard Bank',
+                         first_seen_at=_seen(10))
+        db.session.add(later)
+        db.session.commit()
+
+        assert link_near_duplicates() == 1
+        assert JobSignature.query.count() == 2
+        assert link_near_duplicates() == 0
+
+    def test_deleting_canonical_promotes_surviving_duplicate(self, app, make_job):
+        jobs = [
+            make_job('1', 'IT Graduate', source='adzuna_sa', company='Vodacom', first_seen_at=_seen(0)),
+            make_job('2', 'IT Graduate', company='Vodacom', first_seen_at=_seen(1)),
+            make_job('3', 'IT Graduate', source='adzuna_gb', company='Vodacom', first_seen_at=_seen(2)),
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+        link_near_duplicates()
+
+        delete_jobs([jobs[0].id])
+        db.session.commit()
+
+        remaining = {j.source_job_id: j.canonical_job_id for j in Job.query.all()}
+        assert remaining['2'] is None
+        assert remaining['3'] == jobs[1].id
+        assert JobSignature.query.count() == 2
+
+    def test_inactive_jobs_are_not_canonical_candidates(self, app, make_job):
+        expired = make_job('1', 'IT Graduate', source='adzuna_sa', company='Vodacom', first_seen_at=_seen(0))
+        expired.is_active = False
+        db.session.add(expired)
+        db.session.commit()
+        link_near_duplicates()
+
+        repost = make_job('2', 'IT Graduate', company='Vodacom', first_seen_at=_seen(10))
+        db.session.add(repost)
+        db.session.commit()
+
+        assert link_near_duplicates() == 0
+        assert repost.canonical_job_id is None
+
+    def test_deactivating_canonical_promotes_live_duplicate(self, app, make_job):
+        jobs = [
+            make_job('1', 'IT Graduate', source='adzuna_sa', company='Vodacom', first_seen_at=_seen(0)),
+            make_job('2', 'IT Graduate', company='Vodacom', first_seen_at=_seen(1)),
+            make_job('3', 'IT Graduate', source='adzuna_gb', company='Vodacom', first_seen_at=_seen(2)),
+        ]
+        jobs[0].posted_date = date.today() - timedelta(days=200)
+        db.session.add_all(jobs)
+        db.session.commit()
+        link_near_duplicates()
+
+        assert deactivate_old_jobs(max_days=150) == 1
+
+        remaining = {j.source_job_id: j.canonical_job_id for j in Job.query.all()}
+        assert remaining['2'] is None
+        assert remaining['3'] == jobs[1].id
@@ -0,0 +1,97 @@
+"""
+tests/test_descriptions.py
+
+Tests for deferred/compressed description storage and the job detail API.
+Run with: python -m pytest tests/ -v
+"""
+from app import models
+from app.models import db, Job
+from ingestion import pipeline
+from ingestion.utils import prepare_description, strip_html
+
+
+class TestPrepareDescription:
+
+    def test_strips_tags_and_entities(self):
+        assert strip_html('<p>SQL &amp; <b>Python</b></p>\n<ul><li>Excel</li></ul>') == 'SQL & Python Excel'
+
+    def test_caps_length(self):
+        text = prepare_description('word ' * 100, max_chars=50)
+        assert len(text) <= 50
+        assert text.endswith('…')
+
+    def test_cap_is_idempotent(self):
+        once = prepare_description('word ' * 100, max_chars=50)
+        assert prepare_description(once, max_chars=50) == once
+
+    def test_none_passes_through(self):
+        assert prepare_description(None) is None
+
+
+class TestCompressedText:
+
+    def test_round_trip_compressed(self, app, make_job, monkeypatch):
+        monkeypatch.setattr(models, 'DESCRIPTION_COMPRESSION', True)
+        text = 'Build dashboards in Power BI and SQL. ' * 20
+        with app.app_context():
+            db.session.add(make_job('c1', description=text))
+            db.session.commit()
+            raw = db.session.execute(db.text("SELECT description FROM jobs")).scalar()
+            assert raw.startswith(models.CompressedText.PREFIX)
+            assert len(raw) < len(text)
+
+            db.session.expunge_all()
+            assert Job.query.one().description == text
+
+    def test_short_values_stay_plain(self, app, make_job, monkeypatch):
+        monkeypatch.setattr(models, 'DESCRIPTION_COMPRESSION', True)
+        with app.app_context():
+            db.session.add(make_job('c2', description='Short text'))
+            db.session.commit()
+            raw = db.session.execute(db.text("SELECT description FROM jobs")).scalar()
+            assert raw == 'Short text'
+
+    def test_compact_descriptions_backfill(self, app, make_job):
+        with app.app_context():
+            db.session.add(make_job('c3', description='<p>Learn <b>Docker</b></p>'))
+            db.session.commit()
+            assert pipeline.compact_descriptions() == 1
+            assert pipeline.compact_descriptions() == 0
+            db.session.expunge_all()
+            assert Job.query.one().description == 'Learn Docker'
+
+
+class TestJobDetailAPI:
+
+    def _seed(self, app, make_job):
+        with app.app_context():
+            db.session.add(make_job('d1', description='Analyse data with SQL and Python every day.'))
+            db.session.commit()
+            return Job.query.one().id
+
+    def test_listing_omits_description(self, app, client, make_job):
+        self._seed(app, make_job)
+        job = client.get('/api/jobs').get_json()['jobs'][0]
+        assert 'description' not in job
+
+    def test_listing_can_include_description(self, app, client, make_job):
+        self._seed(app, make_job)
+        job = client.get('/api/jobs?include=description').get_json()['jobs'][0]
+        assert job['description'].startswith('Analyse data')
+
+    def test_detail_returns_description(self, app, client, make_job):
+        job_id = self._seed(app, make_job)
+        data = client.get(f'/api/jobs/{job_id}').get_json()
+        assert data['id'] == job_id
+        assert data['description'].startswith('Analyse data')
+
+    def test_detail_missing_job(self, client):
+        response = client.get('/api/jobs/does-not-exist')
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'job not found'}
+
+    def test_listing_page_defers_description_text(self, app, client, make_job):
+        self._seed(app, make_job)
+        html = client.get('/').get_data(as_text=True)
+        assert 'btn-desc-' in html
+        assert 'Analyse data with SQL' not in html
@@ -4,9 +4,13 @@ tests/test_ingestion.py
 Unit tests for the ingestion layer utilities and filters.
 Run with: python -m pytest tests/ -v
 """
+import threading
 import pytest
 from datetime import date, timedelta
-from ingestion.utils import is_title_outdated, clean_text, parse_relative_date, is_date_valid
+from ingestion.utils import (
+    is_title_outdated, clean_text, parse_relative_date, is_date_valid,
+    parse_relative_dates, titles_outdated, clean_texts, reference_date,
+)
 
 
 # ── parse_adzuna_date ──────────────────────────────────────────────────────
@@ -99,6 +103,59 @@ class TestParseRelativeDate:
     def test_none_defaults_to_today(self):
         assert parse_relative_date(None) == date.today()
 
+    def test_explicit_formats(self):
+        assert parse_relative_date("30 June 2017") == date(2017, 6, 30)
+        assert parse_relative_date("2025-11-09") == date(2025, 11, 9)
+        assert parse_relative_date("31 Foo 2020") == date.today()     # malformed: falls back to today
+
+    def test_memo_keeps_relative_dates_relative(self):
+        assert parse_relative_date("2 days ago", today=date(2026, 1, 10)) == date(2026, 1, 8)
+        assert parse_relative_date("2 days ago", today=date(2026, 3, 1)) == date(2026, 2, 27)
+
+    def test_reference_date_pins_today(self):
+        with reference_date(date(2026, 5, 20)):
+            assert parse_relative_date("Today") == date(2026, 5, 20)
+            assert is_date_valid(date(2026, 5, 1), max_age_days=10) is False
+            assert is_title_outdated("Graduate 2024") is True
+        assert parse_relative_date("Today") == date.today()
+
+    def test_reference_date_is_per_thread(self):
+        first_in, second_in, first_out = threading.Event(), threading.Event(), threading.Event()
+        seen = {}
+
+        def first():
+            with reference_date(date(2026, 1, 1)):
+                first_in.set()
+                second_in.wait(5)
+                seen['first'] = parse_relative_date("Today")
+            first_out.set()
+
+        def second():
+            first_in.wait(5)
+            with reference_date(date(2026, 2, 2)):
+                second_in.set()
+                first_out.wait(5)     # the first block has closed while this one is open
+                seen['second'] = parse_relative_date("Today")
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert seen == {'first': date(2026, 1, 1), 'second': date(2026, 2, 2)}
+        assert parse_relative_date("Today") == date.today()
+
+
+class TestBatchHelpers:
+
+    def test_batches_match_single_calls(self):
+        dates = ["Today", "3 days ago", None, "1 March 2026", "yesterday"]
+        assert parse_relative_dates(dates) == [parse_relative_date(d) for d in dates]
+        titles = ["IT Graduate 2017", "Junior Developer", "", f"Intern {date.today().year}"]
+        assert titles_outdated(titles) == [True, False, False, False]
+        assert clean_texts(["  a \n b ", None]) == ["a b", None]
+
 
 # ── is_date_valid ──────────────────────────────────────────────────────────
 
@@ -0,0 +1,63 @@
+"""
+tests/test_job_status.py
+
+Tests for the batch job-status endpoint used by the application tracker.
+Run with: python -m pytest tests/ -v
+"""
+from sqlalchemy import event
+from app.api import routes as api_routes
+from app.models import db, Job
+
+
+def _seed(app, make_job):
+    with app.app_context():
+        db.session.add_all([
+            make_job('111'),
+            make_job('222', 'IT Intern', source='adzuna_sa', is_active=False),
+        ])
+        db.session.commit()
+        return {job.source_job_id: job.id for job in Job.query.all()}
+
+
+class TestJobsStatus:
+
+    def test_lookup_by_ids(self, app, client, make_job):
+        ids = _seed(app, make_job)
+        data = client.post('/api/jobs/status', json={'ids': [ids['111'], ids['222'], 'gone']}).get_json()
+        status = {job['source_job_id']: job['is_active'] for job in data['jobs']}
+        assert status == {'111': True, '222': False}
+        assert data['missing'] == {'ids': ['gone'], 'keys': []}
+        assert 'last_seen_at' in data['jobs'][0]
+
+    def test_lookup_by_source_keys(self, app, client, make_job):
+        _seed(app, make_job)
+        data = client.post('/api/jobs/status', json={
+            'keys': [['careers24', '111'], ['careers24', '999']],
+        }).get_json()
+        assert [job['source_job_id'] for job in data['jobs']] == ['111']
+        assert data['missing']['keys'] == [['careers24', '999']]
+
+    def test_single_query(self, app, client, make_job):
+        ids = _seed(app, make_job)
+        statements = []
+        with app.app_context():
+            engine = db.engine
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            client.post('/api/jobs/status', json={'ids': list(ids.values()), 'keys': [['careers24', '111']]})
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+
+    def test_limits_and_validation(self, client, monkeypatch):
+        monkeypatch.setattr(api_routes, 'JOB_STATUS_MAX_ITEMS', 2)
+        assert client.post('/api/jobs/status', json={'ids': ['a', 'b', 'c']}).status_code == 400
+        assert client.post('/api/jobs/status', json={'ids': 'abc'}).status_code == 400
+        assert client.post('/api/jobs/status', json={'keys': [['only-one']]}).status_code == 400
+        assert client.post('/api/jobs/status', json={'keys': ['ab']}).status_code == 400
+        assert client.post('/api/jobs/status', json={}).get_json()['count'] == 0
+
+    def test_tracker_page(self, client):
+        html = client.get('/tracker').get_data(as_text=True)
+        assert '/api/jobs/status' in html
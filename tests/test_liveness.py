@@ -0,0 +1,116 @@
+"""
+tests/test_liveness.py
+
+Tests for the link liveness checker (no network: probes are stubbed).
+Run with: python -m pytest tests/ -v
+"""
+from datetime import datetime, timedelta
+from app.models import db, Job
+from ingestion import liveness
+from ingestion.liveness import classify_response, check_job_links, select_candidates, ALIVE, DEAD, UNKNOWN
+
+
+class TestClassifyResponse:
+
+    def test_gone_statuses_are_dead(self):
+        assert classify_response(404) == DEAD
+        assert classify_response(410) == DEAD
+
+    def test_not_found_redirect_is_dead(self):
+        assert classify_response(200, 'https://www.careers24.com/jobs/?error=expired', True) == DEAD
+        assert classify_response(200, 'https://www.adzuna.co.za/search?q=developer', True) == DEAD
+        assert classify_response(200, 'https://acme.example/careers/job-not-found', True) == DEAD
+
+    def test_redirect_to_bare_listing_page_is_dead(self):
+        posting = 'https://acme.example/jobs/junior-developer-123'
+        assert classify_response(200, 'https://acme.example/jobs/', True, posting) == DEAD
+        assert classify_response(200, 'https://acme.example/jobs?page=1', True, posting) == DEAD
+
+    def test_redirect_to_posting_is_alive(self):
+        assert classify_response(200, 'https://acme.example/careers/junior-developer-123', True) == ALIVE
+
+    def test_embedded_ats_posting_is_alive(self):
+        original = 'https://boards.example/acme/jobs/123'
+        assert classify_response(200, 'https://acme.example/careers/jobs?gh_jid=123', True, original) == ALIVE
+        assert classify_response(200, 'https://acme.example/jobs?jobId=77', True, original) == ALIVE
+
+    def test_listing_path_of_the_original_url_is_alive(self):
+        original = 'http://acme.example/careers/jobs?lang=en'
+        assert classify_response(200, 'https://acme.example/careers/jobs/', True, original) == ALIVE
+
+    def test_pattern_only_applies_after_redirect(self):
+        assert classify_response(200, 'https://acme.example/jobs/', False) == ALIVE
+
+    def test_server_errors_are_inconclusive(self):
+        assert classify_response(503) == UNKNOWN
+        assert classify_response(429) == UNKNOWN
+
+
+class TestCheckJobLinks:
+
+    def _stub_probes(self, monkeypatch, outcomes):
+        probed = []
+
+        def fake_probe(session, limiter, url):
+            probed.append(url)
+            return outcomes.get(url.rsplit('/', 1)[-1], ALIVE)
+
+        monkeypatch.setattr(liveness, 'probe_url', fake_probe)
+        monkeypatch.setattr(liveness, 'LIVENESS_MIN_INTERVAL', 0)
+        return probed
+
+    def test_dead_links_are_deactivated(self, app, make_job, monkeypatch):
+        self._stub_probes(monkeypatch, {'gone': DEAD, 'flaky': UNKNOWN})
+        with app.app_context():
+            db.session.add_all([make_job('ok'), make_job('gone'), make_job('flaky')])
+            db.session.commit()
+
+            counts = check_job_links(max_probes=10)
+
+            assert counts == {ALIVE: 1, DEAD: 1, UNKNOWN: 1}
+            active = {j.source_job_id: j.is_active for j in Job.query.all()}
+            assert active == {'ok': True, 'gone': False, 'flaky': True}
+            assert Job.query.filter(Job.last_checked_at.is_(None)).count() == 0
+
+    def test_probes_bounded_slice_in_priority_order(self, app, make_job, monkeypatch):
+        probed = self._stub_probes(monkeypatch, {})
+        recent_check = datetime.utcnow() - timedelta(hours=1)
+        stale_check = datetime.utcnow() - timedelta(days=3)
+        with app.app_context():
+            db.session.add_all([
+                make_job('fresh-unchecked', days_ago=1),
+                make_job('old-unchecked', days_ago=30),
+                make_job('stale', days_ago=60, last_checked_at=stale_check),
+                make_job('recent', days_ago=90, last_checked_at=recent_check),
+                make_job('inactive', days_ago=100, is_active=False),
+            ])
+            db.session.commit()
+
+            order = [row.url.rsplit('/', 1)[-1] for row in select_candidates(10)]
+            assert order == ['old-unchecked', 'fresh-unchecked', 'stale']
+
+            check_job_links(max_probes=2, concurrency=1)
+            assert sorted(u.rsplit('/', 1)[-1] for u in probed) == ['fresh-unchecked', 'old-unchecked']
+            # Next run picks up where this one stopped
+            assert [row.url.rsplit('/', 1)[-1] for row in select_candidates(10)] == ['stale']
+
+    def test_disabled_when_max_probes_zero(self, app, make_job, monkeypatch):
+        probed = self._stub_probes(monkeypatch, {})
+        with app.app_context():
+            db.session.add(make_job('ok'))
+            db.session.commit()
+            assert check_job_links(max_probes=0) == {ALIVE: 0, DEAD: 0, UNKNOWN: 0}
+            assert probed == []
+
+    def test_dead_canonical_hands_over_to_live_duplicate(self, app, make_job, monkeypatch):
+        self._stub_probes(monkeypatch, {'gone': DEAD})
+        with app.app_context():
+            canonical, duplicate = make_job('gone'), make_job('repost')
+            db.session.add_all([canonical, duplicate])
+            db.session.commit()
+            duplicate.canonical_job_id = canonical.id
+            db.session.commit()
+
+            check_job_links(max_probes=10)
+
+            assert db.session.get(Job, duplicate.id).canonical_job_id is None
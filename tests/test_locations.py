@@ -0,0 +1,99 @@
+"""
+tests/test_locations.py
+
+Tests for gazetteer-backed location normalization and location filters.
+Run with: python -m pytest tests/ -v
+"""
+from app.models import db, Job
+from ingestion.locations import resolve_location, location_label, normalize_job_locations, Location
+
+
+class TestResolveLocation:
+
+    def test_city_implies_province_and_country(self):
+        assert resolve_location('Johannesburg, Gauteng') == Location('Johannesburg', 'Gauteng', 'ZA', False)
+        assert resolve_location('Joburg') == Location('Johannesburg', 'Gauteng', 'ZA', False)
+
+    def test_suburb_aliases(self):
+        assert resolve_location('Sandton').province == 'Gauteng'
+        assert resolve_location('Port Elizabeth').city == 'Gqeberha'
+
+    def test_province_only(self):
+        assert resolve_location('KwaZulu-Natal') == Location(None, 'KwaZulu-Natal', 'ZA', False)
+
+    def test_source_tags(self):
+        assert resolve_location('South Africa') == Location(None, None, 'ZA', False)
+        assert resolve_location('SA') == Location(None, None, 'ZA', False)
+        assert resolve_location('Remote (GB)') == Location(None, None, 'GB', True)
+        assert resolve_location('Remote — USA Only') == Location(None, None, 'US', True)
+        assert resolve_location('Remote — Worldwide') == Location(None, None, None, True)
+
+    def test_unknown(self):
+        assert resolve_location('Atlantis') == Location(None, None, None, False)
+        assert resolve_location(None) == Location(None, None, None, False)
+
+    def test_labels(self):
+        assert location_label('Durban', 'KwaZulu-Natal', 'ZA', False) == 'Durban'
+        assert location_label(None, None, 'GB', True) == 'Remote (United Kingdom)'
+        assert location_label(None, None, None, True) == 'Remote'
+
+
+class TestNormalizeJobLocations:
+
+    def test_backfill_is_incremental(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([
+                make_job('a', location='Johannesburg'),
+                make_job('b', location='Johannesburg, Gauteng'),
+            ])
+            db.session.commit()
+            assert normalize_job_locations() == 2
+            assert normalize_job_locations() == 0
+            assert {j.location_city for j in Job.query.all()} == {'Johannesburg'}
+
+
+class TestLocationFilters:
+
+    def _seed(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([
+                make_job('jhb1', location='Johannesburg'),
+                make_job('jhb2', location='Johannesburg, Gauteng'),
+                make_job('pta', location='Pretoria'),
+                make_job('cpt', location='Cape Town, Western Cape'),
+                make_job('gb', location='Remote (GB)', source='adzuna_gb'),
+                make_job('odd', location='Atlantis Business Park'),
+            ])
+            db.session.commit()
+            normalize_job_locations()
+
+    def _ids(self, client, query):
+        return sorted(j['url'].rsplit('/', 1)[-1] for j in client.get(f'/api/jobs?{query}').get_json()['jobs'])
+
+    def test_location_resolves_to_canonical_key(self, app, client, make_job):
+        self._seed(app, make_job)
+        assert self._ids(client, 'location=joburg') == ['jhb1', 'jhb2']
+        assert self._ids(client, 'location=gauteng') == ['jhb1', 'jhb2', 'pta']
+        assert self._ids(client, 'location=remote') == ['gb']
+
+    def test_unknown_location_falls_back_to_text(self, app, client, make_job):
+        self._seed(app, make_job)
+        assert self._ids(client, 'location=atlantis') == ['odd']
+
+    def test_exact_filters(self, app, client, make_job):
+        self._seed(app, make_job)
+        assert self._ids(client, 'province=Western Cape') == ['cpt']
+        assert self._ids(client, 'country=gb') == ['gb']
+        assert self._ids(client, 'remote=0&country=ZA') == ['cpt', 'jhb1', 'jhb2', 'pta']
+
+    def test_location_aggregates(self, app, client, make_job):
+        self._seed(app, make_job)
+        data = client.get('/api/locations?by=province').get_json()
+        assert data['locations'][0] == {'province': 'Gauteng', 'label': 'Gauteng', 'count': 3}
+        assert data['remote'] == 1
+        assert client.get('/api/locations?by=street').status_code == 400
+
+    def test_stats_chart_merges_variants(self, app, client, make_job):
+        self._seed(app, make_job)
+        html = client.get('/stats').get_data(as_text=True)
+        assert 'Johannesburg, Gauteng' not in html
@@ -0,0 +1,110 @@
+"""
+tests/test_metrics.py
+
+Tests for the Prometheus instrumentation and the /metrics endpoint.
+Run with: python -m pytest tests/ -v
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import pytest
+from prometheus_client import REGISTRY
+from app import metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestRequestMetrics:
+
+    def test_latency_and_status_per_endpoint(self, client):
+        before = _sample('jobtracker_http_requests_total', endpoint='api.get_jobs', method='GET', status='200')
+        client.get('/api/jobs')
+        client.get('/api/jobs?sort=bogus')
+        assert _sample('jobtracker_http_requests_total',
+                       endpoint='api.get_jobs', method='GET', status='200') == before + 1
+        assert _sample('jobtracker_http_requests_total', endpoint='api.get_jobs', method='GET', status='400') >= 1
+        assert _sample('jobtracker_http_request_duration_seconds_count', endpoint='api.get_jobs', method='GET') >= 2
+
+    def test_sql_statements_are_counted_per_request(self, client):
+        count = lambda: _sample('jobtracker_db_queries_per_request_count', endpoint='api.get_trends')
+        total = lambda: _sample('jobtracker_db_queries_per_request_sum', endpoint='api.get_trends')
+        before_count, before_total = count(), total()
+        client.get('/api/trends')
+        assert count() == before_count + 1
+        assert total() == before_total + 1
+
+    def test_unmatched_urls_share_one_label(self, client):
+        before = _sample('jobtracker_http_requests_total', endpoint='unmatched', method='GET', status='404')
+        client.get('/no/such/page')
+        assert _sample('jobtracker_http_requests_total',
+                       endpoint='unmatched', method='GET', status='404') == before + 1
+
+    def test_pool_checkouts(self, client):
+        before = _sample('jobtracker_db_pool_checkouts_total')
+        client.get('/api/trends')
+        assert _sample('jobtracker_db_pool_checkouts_total') > before
+        assert _sample('jobtracker_db_pool_checkout_wait_seconds_count') > 0
+
+
+class TestExposition:
+
+    def test_text_format(self, client):
+        client.get('/api/stats')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        body = response.get_data(as_text=True)
+        assert 'jobtracker_http_request_duration_seconds_bucket{endpoint="api.get_stats"' in body
+
+    def test_unavailable_without_client(self, client, monkeypatch):
+        monkeypatch.setattr(metrics, 'prometheus_client', None)
+        assert client.get('/metrics').status_code == 503
+
+
+class TestPipelineMetrics:
+
+    def test_run_gauges(self):
+        runs = metrics.track_pipeline_run(lambda: 7)
+        assert runs() == 7
+        assert _sample('jobtracker_pipeline_last_run_new_jobs') == 7
+        assert _sample('jobtracker_pipeline_last_run_success') == 1
+
+        @metrics.track_pipeline_run
+        def failing():
+            raise RuntimeError('boom')
+        with pytest.raises(RuntimeError):
+            failing()
+        assert _sample('jobtracker_pipeline_last_run_success') == 0
+        assert _sample('jobtracker_pipeline_running') == 0
+
+
+class TestMultiprocess:
+
+    def test_workers_are_aggregated(self, tmp_path):
+        """Two "workers" write to a shared dir; one scrape sees both."""
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+        worker = textwrap.dedent('''
+            from tests.conftest import TestConfig
+            from app import create_app
+            from app.models import db
+            app = create_app(TestConfig)
+            with app.app_context():
+                db.create_all()
+            app.test_client().get('/api/health')
+        ''')
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', worker], env=env, check=True, cwd=ROOT)
+
+        scrape = textwrap.dedent('''
+            from tests.conftest import TestConfig
+            from app import create_app
+            print(create_app(TestConfig).test_client().get('/metrics').get_data(as_text=True))
+        ''')
+        body = subprocess.run([sys.executable, '-c', scrape], env=env, check=True,
+                              capture_output=True, text=True, cwd=ROOT).stdout
+        assert 'jobtracker_http_requests_total{endpoint="api.health_check",method="GET",status="200"} 2.0' in body
@@ -0,0 +1,268 @@
+"""
+tests/test_pipeline.py
+
+Tests for the pipeline stages: landing zone, replay, load and shards.
+Run with: python -m pytest tests/ -v
+"""
+import json
+import os
+import pytest
+import textwrap
+from datetime import date, datetime
+from app.models import db, Job
+from ingestion import pipeline
+from ingestion.extractors.adzuna import replay_adzuna, transform_adzuna_task
+from ingestion.extractors.scraper import replay_careers24
+from ingestion.landing import LandingZone, latest_runs, list_runs, prune_runs
+from ingestion.parallel import TransformPool
+from ingestion.pipeline import replay_run, load_jobs, resolve_stages, run_shard, _insert_new
+from ingestion.shards import parse_shard, shard_args, run_fanout, TIMED_OUT
+from ingestion.utils import reference_date
+
+
+REMOTIVE_PAYLOAD = [
+    {
+        'id': 101,
+        'title': 'Junior Data Engineer',
+        'company_name': 'Acme',
+        'candidate_required_location': 'Worldwide',
+        'url': 'https://remotive.com/jobs/101',
+        'description': '<p>Great first role for a graduate.</p>',
+        'publication_date': '2026-07-15T14:00:00',
+    },
+    {
+        'id': 102,
+        'title': 'Senior Data Engineer',
+        'company_name': 'Acme',
+        'url': 'https://remotive.com/jobs/102',
+        'description': 'Lead our platform team.',
+        'publication_date': '2026-07-15T14:00:00',
+    },
+]
+
+ADZUNA_PAYLOAD = [
+    {
+        'id': 555,
+        'title': 'Graduate Software Developer',
+        'company': {'display_name': 'Bank ZA'},
+        'redirect_url': 'https://adzuna.co.za/land/555',
+        'description': 'Graduate programme for ICT students.',
+        'created': '2026-07-14T10:00:00Z',
+    },
+]
+
+
+# ── LandingZone ────────────────────────────────────────────────────────────
+
+class TestLandingZone:
+
+    def test_append_and_read_round_trip(self, tmp_path):
+        zone = LandingZone(run_id='20260101T000000Z', root=str(tmp_path))
+        zone.append('remotive', REMOTIVE_PAYLOAD, category='data')
+        zone.append('remotive', [], category='software-dev')
+
+        records = list(LandingZone.open('latest', root=str(tmp_path)).read('remotive'))
+        assert [r['meta']['category'] for r in records] == ['data', 'software-dev']
+        assert records[0]['payload'][0]['id'] == 101
+        assert zone.sources() == ['remotive']
+
+    def test_open_missing_run_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            LandingZone.open('latest', root=str(tmp_path))
+
+    def test_prune_keeps_newest_runs(self, tmp_path):
+        for run_id in ('20260101T000000Z', '20260102T000000Z', '20260103T000000Z'):
+            LandingZone(run_id=run_id, root=str(tmp_path)).append('remotive', [])
+        assert prune_runs(keep=1, root=str(tmp_path)) == 2
+        assert list_runs(str(tmp_path)) == ['20260103T000000Z']
+
+    def test_prune_keeps_newest_runs_of_each_shard(self, tmp_path):
+        runs = ['20260101T000000Z-adzuna', '20260101T010000Z-remotive',
+                '20260101T020000Z-remotive', '20260101T030000Z-remotive']
+        for run_id in runs:
+            LandingZone(run_id=run_id, root=str(tmp_path)).append('remotive', [])
+        assert prune_runs(keep=2, root=str(tmp_path)) == 1
+        assert list_runs(str(tmp_path)) == runs[:1] + runs[2:]
+
+    def test_latest_runs_per_shard(self, tmp_path):
+        for run_id in ('20260101T000000Z-careers24', '20260102T000000Z', '20260103T000000Z-adzuna-gb',
+                       '20260103T010000Z-remotive', '20260103T020000Z-remotive'):
+            LandingZone(run_id=run_id, root=str(tmp_path)).append('remotive', [])
+        # The full run supersedes the older careers24 shard
+        assert latest_runs(str(tmp_path)) == [
+            '20260102T000000Z', '20260103T000000Z-adzuna-gb', '20260103T020000Z-remotive',
+        ]
+
+
+# ── replay_run ─────────────────────────────────────────────────────────────
+
+class TestReplayRun:
+
+    def test_replay_loads_without_http(self, app, tmp_path):
+        zone = LandingZone(run_id='20260101T000000Z', root=str(tmp_path))
+        zone.append('remotive', REMOTIVE_PAYLOAD, category='data')
+        zone.append('adzuna', ADZUNA_PAYLOAD, country='za', what='graduate')
+
+        assert replay_run('latest', root=str(tmp_path)) == 2
+
+        sa_job = Job.query.filter_by(source='adzuna_sa').one()
+        assert sa_job.posted_date == date(2026, 7, 14)
+        assert Job.query.filter_by(source='remotive').one().source_job_id == '101'
+
+    def test_replay_latest_covers_every_shard(self, app, tmp_path):
+        LandingZone(run_id='20260101T000000Z-adzuna', root=str(tmp_path)).append(
+            'adzuna', ADZUNA_PAYLOAD, country='za', what='graduate')
+        LandingZone(run_id='20260101T010000Z-remotive', root=str(tmp_path)).append(
+            'remotive', REMOTIVE_PAYLOAD, category='data')
+
+        assert replay_run('latest', root=str(tmp_path)) == 2
+
+    def test_replay_is_idempotent(self, app, tmp_path):
+        zone = LandingZone(run_id='20260101T000000Z', root=str(tmp_path))
+        zone.append('remotive', REMOTIVE_PAYLOAD, category='data')
+
+        replay_run('latest', root=str(tmp_path))
+        assert replay_run('latest', root=str(tmp_path)) == 0
+        assert Job.query.count() == 1
+
+
+# ── TransformPool ──────────────────────────────────────────────────────────
+
+class TestTransformPool:
+
+    def test_small_batches_stay_in_process(self):
+        with TransformPool(workers=4, min_items=10) as pool:
+            assert pool.map(str.upper, ['a', 'b']) == ['A', 'B']
+            assert pool._executor is None
+
+    def test_single_worker_never_starts_a_pool(self):
+        with TransformPool(workers=1, min_items=0) as pool:
+            assert pool.map(abs, [-1, -2, -3]) == [1, 2, 3]
+            assert pool._executor is None
+
+    def test_pool_matches_in_process_results(self):
+        tasks = [(ADZUNA_PAYLOAD, 'za'), (ADZUNA_PAYLOAD, 'gb')] * 3
+        expected = [transform_adzuna_task(t) for t in tasks]
+        with TransformPool(workers=2, min_items=2) as pool:
+            assert pool.map(transform_adzuna_task, tasks) == expected
+            assert pool._executor is not None
+
+    def test_pool_workers_use_the_pinned_date(self):
+        with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'careers24_search.html'),
+                  encoding='utf-8') as fh:
+            page = {'payload': fh.read(), 'meta': {'status': 200}}
+        adzuna = {'payload': [dict(ADZUNA_PAYLOAD[0], title='Graduate Software Developer 2019')],
+                  'meta': {'country': 'za'}}
+        pinned = date(2020, 1, 1)
+        with reference_date(pinned), TransformPool(workers=2, min_items=2) as pool:
+            pages = replay_careers24([page] * 4, pool=pool)
+            adzuna_jobs = replay_adzuna([adzuna] * 4, pool=pool)
+            assert pool._executor is not None
+        posted = {job['posted_date'] for job in pages}
+        assert pinned in posted and date.today() not in posted     # 'Today' cards
+        assert len(adzuna_jobs) == 1     # 2019 is only "last year" under the pin
+
+
+# ── load_jobs ──────────────────────────────────────────────────────────────
+
+class TestLoadJobs:
+
+    def test_skips_stored_and_repeated_keys(self, app, raw_job):
+        assert load_jobs([raw_job(1, description='<p>Entry level.</p>'), raw_job(2), raw_job(2)]) == 2
+        assert load_jobs([raw_job(1), raw_job(3)]) == 1
+        assert Job.query.count() == 3
+        assert Job.query.filter_by(source_job_id='1').one().description == 'Entry level.'
+
+    def test_rows_with_different_columns_share_a_batch(self, app, raw_job):
+        jobs = [raw_job(1), raw_job(2, source='adzuna_sa', salary_min=10000.0), raw_job(3)]
+        assert load_jobs(jobs) == 3
+        assert Job.query.filter_by(source='adzuna_sa').one().salary_min == 10000.0
+        assert Job.query.filter_by(source_job_id='3').one().is_active is True
+
+    def test_bad_job_is_skipped_not_fatal(self, app, raw_job):
+        assert load_jobs([raw_job(1, bogus='x'), raw_job(2)]) == 1
+        assert Job.query.one().source_job_id == '2'
+
+    def test_jobs_seen_again_bump_last_seen_at(self, app, raw_job):
+        load_jobs([raw_job(1), raw_job(2)])
+        stale = datetime(2020, 1, 1)
+        Job.query.update({'last_seen_at': stale})
+        db.session.commit()
+        assert load_jobs([raw_job(1)]) == 0
+        seen = {job.source_job_id: job.last_seen_at for job in Job.query.all()}
+        assert seen['1'] > stale and seen['2'] == stale
+
+    def test_row_inserted_concurrently_is_ignored(self, app, raw_job):
+        # Another shard committed the key between our existence check and insert
+        load_jobs([raw_job(1)])
+        rows = [dict(raw_job(1), description='late'), raw_job(2)]
+        assert _insert_new(rows) == 1
+        assert Job.query.count() == 2
+
+
+# ── Shards ─────────────────────────────────────────────────────────────────
+
+FAKE_PIPELINE = textwrap.dedent("""
+    import json, sys
+    args = sys.argv[1:]
+    status = args[args.index('--status-file') + 1]
+    name = args[args.index('--source') + 1] if '--source' in args else 'stages'
+    ok = name != 'careers24'
+    with open(status, 'w') as fh:
+        json.dump({'ok': ok, 'steps': [{'step': name, 'ok': ok, 'seconds': 0.0}]}, fh)
+    if name == 'remotive':
+        import time; time.sleep(5)
+    sys.exit(0 if ok else 1)
+""")
+
+
+class TestShards:
+
+    def test_stages_run_in_pipeline_order(self):
+        assert resolve_stages(['retention', 'link']) == ['link', 'retention']
+        assert resolve_stages(['post']) == list(pipeline.STAGES)
+        with pytest.raises(ValueError):
+            resolve_stages(['nope'])
+
+    def test_shard_specs(self):
+        assert parse_shard('adzuna:gb, us') == ('adzuna', ['gb', 'us'])
+        assert shard_args('adzuna:gb,us') == ['--source', 'adzuna', '--countries', 'gb,us']
+        assert shard_args('careers24') == ['--source', 'careers24']
+
+    def test_run_shard_loads_selected_source_only(self, app, raw_job, monkeypatch):
+        monkeypatch.setattr(pipeline, 'LANDING_ENABLED', False)
+        monkeypatch.setattr(pipeline, 'fetch_remotive_jobs', lambda landing=None: [raw_job(1, source='remotive')])
+        monkeypatch.setattr(pipeline, 'scrape_careers24', lambda **kwargs: pytest.fail('not selected'))
+        calls = []
+        monkeypatch.setitem(pipeline.STAGES, 'tag', lambda: calls.append('tag') or 1)
+
+        report = run_shard(sources=['remotive'], stages=['tag'])
+        assert report['ok'] is True
+        assert [(s['step'], s['result']) for s in report['steps']] == [('load', 1), ('tag', 1)]
+        assert calls == ['tag'] and Job.query.count() == 1
+
+    def test_failing_step_stops_the_shard(self, app, monkeypatch):
+        monkeypatch.setattr(pipeline, 'LANDING_ENABLED', False)
+        monkeypatch.setattr(pipeline, 'fetch_remotive_jobs', lambda landing=None: 1 / 0)
+        report = run_shard(sources=['remotive'], stages=['tag'])
+        assert report['ok'] is False
+        assert [s['step'] for s in report['steps']] == ['load']
+        assert 'division by zero' in report['steps'][0]['error']
+
+    def test_failing_retention_stage_is_reported(self, app, monkeypatch):
+        monkeypatch.setattr(pipeline, 'delete_jobs', lambda ids: 1 / 0)
+        report = run_shard(stages=['retention'])
+        assert report['ok'] is False
+        assert 'division by zero' in report['steps'][0]['error']
+        pipeline.cleanup_old_jobs()      # the run_etl wrapper still only logs
+
+    def test_fanout_reports_each_shard(self, tmp_path):
+        script = tmp_path / 'fake_pipeline.py'
+        script.write_text(FAKE_PIPELINE)
+        report = run_fanout(['adzuna:gb', 'careers24', 'remotive'], then=['post'], timeout=2,
+                            script=str(script))
+        codes = {shard['shard']: shard['exit_code'] for shard in report['shards']}
+        assert codes == {'adzuna:gb': 0, 'careers24': 1, 'remotive': TIMED_OUT, 'stages:post': 0}
+        assert report['ok'] is False
+        assert report['shards'][0]['steps'][0]['step'] == 'adzuna'
+        assert json.loads(json.dumps(report)) == report
@@ -0,0 +1,128 @@
+"""
+tests/test_query_budgets.py
+
+Per-route SQL query budgets (fails CI when a change adds queries) and the
+debug SQL profiler.
+Run with: python -m pytest tests/ -v
+"""
+import json
+import logging
+from datetime import date, timedelta
+import pytest
+from app import create_app
+from app.models import db, Job
+from app.profiling import fingerprint
+from ingestion.locations import normalize_job_locations
+from ingestion.rollups import update_daily_rollups
+from ingestion.salary import normalize_job_salaries, refresh_salary_percentiles
+from ingestion.skills import tag_job_skills
+from tests.conftest import TestConfig
+
+TITLES = ['Junior Python Developer', 'Graduate Data Analyst', 'IT Support Intern',
+          'Junior Java Engineer', 'Entry Level Accountant', 'Junior Web Designer']
+LOCATIONS = ['Johannesburg', 'Cape Town', 'Durban', 'Remote (GB)']
+
+
+def _seed(count: int = 40):
+    """Enough variety that any per-row query would show up in the counts."""
+    db.session.add_all(
+        Job(
+            source=('careers24', 'adzuna_sa', 'remotive')[i % 3], source_job_id=str(i),
+            title=TITLES[i % len(TITLES)], location=LOCATIONS[i % len(LOCATIONS)],
+            description='Python, SQL, Excel and Git.', url=f'https://example.com/{i}',
+            posted_date=date.today() - timedelta(days=i % 10), is_active=True,
+            salary_min=15000 + i * 100, salary_max=20000 + i * 100,
+        )
+        for i in range(count)
+    )
+    db.session.commit()
+    tag_job_skills()
+    normalize_job_locations()
+    normalize_job_salaries()
+    refresh_salary_percentiles()
+    update_daily_rollups()
+
+
+# Route → max SQL statements. Raise a budget only with a reason.
+ROUTE_BUDGETS = {
+    '/': 13,
+    '/?q=junior&page=2': 13,
+    '/global': 13,
+    '/stats': 7,
+    '/tracker': 0,
+    '/api/jobs': 2,
+    '/api/jobs?skill=python&location=durban&sort=salary_desc': 2,
+    '/api/stats': 4,
+    '/api/skills?with=python': 2,
+    '/api/locations': 2,
+    '/api/trends': 1,
+    '/api/health': 0,
+    '/api/pool': 0,
+}
+ROUTES = list(ROUTE_BUDGETS)
+
+
+@pytest.mark.parametrize('url', ROUTES)
+def test_route_query_budget(app, assert_max_queries, url):
+    _seed()
+    response = assert_max_queries(url, ROUTE_BUDGETS[url])
+    assert response.status_code == 200
+
+
+def test_budget_failure_names_repeated_statements(app, assert_max_queries):
+    _seed()
+    with pytest.raises(AssertionError, match=r'issued \d+ queries \(budget 0\)'):
+        assert_max_queries('/api/jobs', 0)
+
+
+class TestFingerprint:
+
+    def test_literals_and_params_collapse(self):
+        a = fingerprint("SELECT count(*) FROM jobs WHERE title LIKE '%python%' AND id = 5")
+        b = fingerprint("SELECT count(*)  FROM jobs WHERE title LIKE '%java%' AND id = 12")
+        assert a == b == 'SELECT count(*) FROM jobs WHERE title LIKE ? AND id = ?'
+
+    def test_in_lists_collapse(self):
+        assert fingerprint('SELECT * FROM jobs WHERE id IN (?, ?, ?)') == \
+            fingerprint('SELECT * FROM jobs WHERE id IN (%(id_1)s)') == 'SELECT * FROM jobs WHERE id IN (...)'
+
+    def test_identifiers_keep_digits(self):
+        assert fingerprint('SELECT p10, anon_1.id FROM t LIMIT 20') == 'SELECT p10, anon_1.id FROM t LIMIT ?'
+
+
+class ProfilingConfig(TestConfig):
+    SQL_PROFILING = True
+    N_PLUS_ONE_THRESHOLD = 3
+    SLOW_QUERY_MS = 0.0
+
+
+class TestProfilingMode:
+
+    @pytest.fixture
+    def profiled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ProfilingConfig, 'SLOW_QUERY_LOG', str(tmp_path / 'slow.jsonl'))
+        app = create_app(ProfilingConfig)
+        with app.app_context():
+            db.create_all()
+            _seed(12)
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    def test_server_timing_header(self, profiled):
+        response = profiled.test_client().get('/api/stats')
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=') and 'queries"' in timing and 'total;dur=' in timing
+        assert int(response.headers['X-SQL-Queries']) >= 1
+
+    def test_n_plus_one_and_slow_log(self, profiled, caplog):
+        with caplog.at_level(logging.WARNING, logger='app.profiling'):
+            profiled.test_client().get('/')
+        # The sidebar counts every category with the same query shape
+        assert any('N+1 suspect on web.index' in r.getMessage() for r in caplog.records)
+        with open(ProfilingConfig.SLOW_QUERY_LOG) as fh:
+            entries = [json.loads(line) for line in fh]
+        assert entries and entries[0]['endpoint'] == 'web.index'
+
+    def test_off_by_default(self, client):
+        assert 'Server-Timing' not in client.get('/api/stats').headers
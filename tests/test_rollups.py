@@ -0,0 +1,154 @@
+"""
+tests/test_rollups.py
+
+Tests for the incremental daily rollups and the trend endpoints.
+Run with: python -m pytest tests/ -v
+"""
+import threading
+from datetime import date, datetime, timedelta
+from app.models import db, Job, JobSkill, DailyJobRollup
+from ingestion.locks import watermark_lock
+from ingestion.pipeline import delete_jobs
+from ingestion.rollups import update_daily_rollups, trend_series, dimension_keys
+
+TODAY = date.today()
+
+
+def _rollup(day, dimension='all', key='', source='careers24'):
+    return db.session.get(DailyJobRollup, (day, source, dimension, key))
+
+
+class TestDimensionKeys:
+
+    def test_categories_and_skills(self):
+        assert dimension_keys('Graduate Data Analyst', ['sql']) == [
+            ('all', ''), ('category', 'graduate'), ('category', 'data'), ('skill', 'sql'),
+        ]
+
+
+class TestUpdateDailyRollups:
+
+    def test_backfill_then_incremental(self, app, make_job):
+        with app.app_context():
+            first = make_job('j1', days_ago=3)
+            db.session.add_all([first, make_job('j2', title='Cloud Intern', days_ago=3)])
+            db.session.flush()
+            db.session.add(JobSkill(job_id=first.id, skill='sql'))
+            db.session.commit()
+
+            update_daily_rollups()
+            day = TODAY - timedelta(days=3)
+            assert _rollup(day).new_jobs == 2
+            assert _rollup(day, 'skill', 'sql').new_jobs == 1
+            assert _rollup(day, 'category', 'cloud').new_jobs == 1
+            assert _rollup(TODAY).active_jobs == 2
+
+            # Re-running without changes adds nothing
+            update_daily_rollups()
+            assert _rollup(day).new_jobs == 2
+
+            # Only the new row is folded in on the next run
+            db.session.add(make_job('j3', days_ago=3))
+            db.session.commit()
+            update_daily_rollups()
+            assert _rollup(day).new_jobs == 3
+            assert _rollup(TODAY).active_jobs == 3
+
+    def test_deactivations_and_snapshot(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([make_job('j1'), make_job('j2')])
+            db.session.commit()
+            update_daily_rollups()
+
+            Job.query.filter_by(source_job_id='j1').update(
+                {'is_active': False, 'deactivated_at': datetime.utcnow()}
+            )
+            db.session.commit()
+            update_daily_rollups()
+            assert _rollup(TODAY).deactivated_jobs == 1
+            assert _rollup(TODAY).active_jobs == 1
+
+    def test_duplicates_are_not_counted(self, app, make_job):
+        with app.app_context():
+            canonical = make_job('j1')
+            db.session.add(canonical)
+            db.session.flush()
+            db.session.add(make_job('j2', source='adzuna_sa', canonical_job_id=canonical.id))
+            db.session.commit()
+            update_daily_rollups()
+            assert _rollup(TODAY, source='adzuna_sa') is None
+
+    def test_history_survives_retention(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([make_job('j1', days_ago=5), make_job('j2', days_ago=5)])
+            db.session.commit()
+            update_daily_rollups()
+
+            delete_jobs([job.id for job in Job.query.all()])
+            db.session.commit()
+            update_daily_rollups()
+
+            series = trend_series(14)
+            assert len(series) == 14
+            assert series[-6]['new'] == 2
+            assert series[-1]['active'] == 0
+
+    def test_waits_for_in_flight_loads(self, app, make_job):
+        with app.app_context():
+            update_daily_rollups()
+            written = []
+
+            def stage():
+                with app.app_context():
+                    written.append(update_daily_rollups())
+
+            # A load stamps its row, then the stage starts before the commit
+            with watermark_lock():
+                db.session.add(make_job('late'))
+                db.session.flush()
+                runner = threading.Thread(target=stage)
+                runner.start()
+                runner.join(0.3)
+                assert runner.is_alive()
+                db.session.commit()
+            runner.join(5)
+
+            db.session.expire_all()
+            assert written and _rollup(TODAY).new_jobs == 1
+
+
+class TestTrendEndpoints:
+
+    def _seed(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([
+                make_job('j1', days_ago=1),
+                make_job('j2', 'Graduate Data Analyst', source='adzuna_sa', days_ago=40),
+            ])
+            db.session.commit()
+            update_daily_rollups()
+
+    def test_window_selection(self, app, client, make_job):
+        self._seed(app, make_job)
+        short = client.get('/api/trends').get_json()
+        assert short['window'] == 14
+        assert sum(d['new'] for d in short['days']) == 1
+
+        long = client.get('/api/trends?window=90').get_json()
+        assert len(long['days']) == 90
+        assert sum(d['new'] for d in long['days']) == 2
+
+    def test_filters(self, app, client, make_job):
+        self._seed(app, make_job)
+        data = client.get('/api/trends?window=90&source=adzuna_sa&category=graduate').get_json()
+        assert (data['dimension'], data['key']) == ('category', 'graduate')
+        assert sum(d['new'] for d in data['days']) == 1
+
+    def test_invalid_params(self, client):
+        assert client.get('/api/trends?window=30').status_code == 400
+        assert client.get('/api/trends?category=astronaut').status_code == 400
+
+    def test_stats_page_window(self, app, client, make_job):
+        self._seed(app, make_job)
+        html = client.get('/stats?window=365').get_data(as_text=True)
+        assert 'Last 365 Days' in html
@@ -0,0 +1,105 @@
+"""
+tests/test_salary.py
+
+Tests for salary normalization, percentiles and the salary API filters.
+Run with: python -m pytest tests/ -v
+"""
+import pytest
+from app.models import db, SalaryPercentile
+from ingestion.salary import (
+    normalize_salary, normalize_job_salaries, refresh_salary_percentiles, percentile,
+)
+
+
+class TestNormalizeSalary:
+
+    def test_annual_zar_passes_through(self):
+        assert normalize_salary('adzuna_sa', 240000, 360000) == ('ZAR', 240000, 360000)
+
+    def test_monthly_zar_is_annualized(self):
+        assert normalize_salary('adzuna_sa', 15000, 20000) == ('ZAR', 180000, 240000)
+
+    def test_one_period_for_the_whole_range(self):
+        assert normalize_salary('adzuna_sa', 90000, 110000) == ('ZAR', 90000, 110000)
+        assert normalize_salary('adzuna_sa', 50000, 65000) == ('ZAR', 50000, 65000)
+
+    def test_ambiguous_amounts_stay_annual(self):
+        assert normalize_salary('adzuna_sa', 96000, 96000) == ('ZAR', 96000, 96000)
+
+    def test_foreign_currency_is_converted(self):
+        rates = {'base': 'ZAR', 'rates': {'ZAR': 1.0, 'GBP': 20.0}}
+        assert normalize_salary('adzuna_gb', 25000, 30000, rates) == ('GBP', 500000, 600000)
+
+    def test_hourly_rates(self):
+        rates = {'base': 'ZAR', 'rates': {'ZAR': 1.0, 'USD': 18.0}}
+        assert normalize_salary('adzuna_us', 20, None, rates) == ('USD', 748800, 748800)
+
+    def test_missing_salary_or_rate(self):
+        assert normalize_salary('adzuna_sa', None, None) == ('ZAR', None, None)
+        assert normalize_salary('adzuna_gb', 30000, None, {'base': 'ZAR', 'rates': {'ZAR': 1}}) == ('GBP', None, None)
+
+
+class TestPercentiles:
+
+    def test_interpolation(self):
+        assert percentile([1, 2, 3, 4, 5], 50) == 3
+        assert percentile([10, 20], 25) == pytest.approx(12.5)
+
+    def test_refresh_groups(self, app, make_job):
+        with app.app_context():
+            db.session.add_all(
+                [make_job(f's{i}', salary_min=200000 + i * 10000, salary_max=200000 + i * 10000) for i in range(5)]
+                + [make_job('g1', salary_min=500000, salary_max=500000, title='Graduate Analyst')]
+            )
+            db.session.commit()
+            assert normalize_job_salaries() == 6
+            assert normalize_job_salaries() == 0
+
+            refresh_salary_percentiles(min_sample=5)
+            overall = db.session.get(SalaryPercentile, ('all', 'all'))
+            assert overall.sample_size == 6
+            assert overall.p50 == 225000
+            # Groups below the minimum sample are not published
+            assert db.session.get(SalaryPercentile, ('all', 'graduate')) is None
+
+
+class TestSalaryAPI:
+
+    def _seed(self, app, make_job):
+        with app.app_context():
+            db.session.add_all([
+                make_job('low', salary_min=120000, salary_max=150000),
+                make_job('mid', salary_min=20000, salary_max=25000),   # monthly → 240k–300k
+                make_job('high', salary_min=450000, salary_max=600000),
+                make_job('none'),
+            ])
+            db.session.commit()
+            normalize_job_salaries()
+
+    def _ids(self, client, query):
+        return [j['url'].rsplit('/', 1)[-1] for j in client.get(f'/api/jobs?{query}').get_json()['jobs']]
+
+    def test_range_filters(self, app, client, make_job):
+        self._seed(app, make_job)
+        assert sorted(self._ids(client, 'min_salary=250000')) == ['high', 'mid']
+        assert sorted(self._ids(client, 'max_salary=200000')) == ['low']
+        assert self._ids(client, 'min_salary=200000&max_salary=400000') == ['mid']
+
+    def test_sorting(self, app, client, make_job):
+        self._seed(app, make_job)
+        assert self._ids(client, 'sort=salary_desc') == ['high', 'mid', 'low', 'none']
+        assert self._ids(client, 'sort=salary_asc') == ['low', 'mid', 'high', 'none']
+        assert client.get('/api/jobs?sort=pay').status_code == 400
+
+    def test_normalized_fields_in_payload(self, app, client, make_job):
+        self._seed(app, make_job)
+        job = client.get('/api/jobs?sort=salary_desc&limit=1').get_json()['jobs'][0]
+        assert (job['salary_currency'], job['salary_annual_min']) == ('ZAR', 450000)
+
+    def test_stats_page_shows_percentiles(self, app, client, make_job):
+        with app.app_context():
+            db.session.add_all([make_job(f's{i}', salary_min=300000, salary_max=300000) for i in range(5)])
+            db.session.commit()
+            normalize_job_salaries()
+            refresh_salary_percentiles()
+        assert 'Salary Benchmarks' in client.get('/stats').get_data(as_text=True)
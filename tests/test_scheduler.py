@@ -0,0 +1,160 @@
+"""
+tests/test_scheduler.py
+
+Tests for the per-source ingestion scheduler: cadence, jitter, quotas,
+unchanged-upstream skips and persisted state.
+Run with: python -m pytest tests/ -v
+"""
+import json
+import pytest
+from app.models import Job
+from ingestion import scheduler
+from ingestion.scheduler import Scheduler, fingerprint, load_schedule, acquire_lock, STARTUP_SPREAD_SECONDS
+
+HOUR = 3600
+SCHEDULE = {
+    'remotive': {'shard': 'remotive', 'interval': HOUR, 'jitter': 0.1, 'quota': 2},
+    'maintenance': {'stages': ['maintenance'], 'interval': 24 * HOUR, 'jitter': 0.0, 'quota': 1},
+}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def upstream(monkeypatch, raw_job):
+    """The listing the remotive shard extracts, and the stage runs it triggers."""
+    state = {'jobs': [raw_job(1), raw_job(2)], 'stages': []}
+    monkeypatch.setattr(scheduler, 'extract', lambda sources, countries, strict: list(state['jobs']))
+    monkeypatch.setattr(scheduler, 'run_shard', lambda stages: state['stages'].append(stages) or {'ok': True})
+    return state
+
+
+def _scheduler(tmp_path, clock, schedule=SCHEDULE):
+    return Scheduler(dict(schedule), root=str(tmp_path / 'scheduler'), clock=clock)
+
+
+class TestSchedule:
+
+    def test_fingerprint_ignores_order_but_not_content(self, raw_job):
+        assert fingerprint([raw_job(1), raw_job(2)]) == fingerprint([raw_job(2), raw_job(1)])
+        retitled = raw_job(2, title='Graduate Developer')
+        assert fingerprint([raw_job(1), raw_job(2)]) != fingerprint([raw_job(1), retitled])
+
+    def test_overrides_from_file(self, tmp_path):
+        path = tmp_path / 'schedule.json'
+        path.write_text(json.dumps({'remotive': {'interval': 1800}}))
+        schedule = load_schedule(str(path))
+        assert schedule['remotive']['interval'] == 1800
+        assert schedule['careers24'] == scheduler.DEFAULT_SCHEDULE['careers24']
+
+    def test_invalid_schedule_is_rejected(self, tmp_path):
+        path = tmp_path / 'schedule.json'
+        path.write_text(json.dumps({'bad': {'shard': 'nowhere', 'interval': 60, 'quota': 1}}))
+        with pytest.raises(ValueError):
+            load_schedule(str(path))
+
+
+class TestScheduler:
+
+    def test_first_runs_are_spread_then_jittered(self, app, tmp_path, clock, upstream):
+        runner = _scheduler(tmp_path, clock)
+        assert all(clock.now <= runner.state[name]['next_run_at'] <= clock.now + STARTUP_SPREAD_SECONDS
+                   for name in SCHEDULE)
+        assert runner.due() == []
+
+        clock.now += STARTUP_SPREAD_SECONDS
+        assert runner.run_due() == {'remotive': 'ok', 'maintenance': 'ok'}
+        next_run = runner.state['remotive']['next_run_at'] - clock.now
+        assert 0.9 * HOUR <= next_run <= 1.1 * HOUR
+        assert runner.state['maintenance']['next_run_at'] - clock.now == 24 * HOUR
+
+    def test_unchanged_upstream_skips_the_load(self, app, tmp_path, raw_job, clock, upstream):
+        runner = _scheduler(tmp_path, clock, {'remotive': dict(SCHEDULE['remotive'], quota=24)})
+        clock.now += STARTUP_SPREAD_SECONDS
+        assert runner.run_due() == {'remotive': 'ok'}
+        assert Job.query.count() == 2
+        assert upstream['stages'] == [['incremental']]
+
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'unchanged'}
+        assert upstream['stages'] == [['incremental']]
+
+        upstream['jobs'].append(raw_job(3))
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'ok'}
+        assert runner.state['remotive']['last_new_jobs'] == 1
+
+    def test_unchanged_probe_skips_the_extract(self, app, tmp_path, raw_job, clock, upstream, monkeypatch):
+        extracts = []
+        monkeypatch.setattr(scheduler, 'extract',
+                            lambda sources, countries, strict: extracts.append(sources) or list(upstream['jobs']))
+        monkeypatch.setitem(scheduler.PROBES, 'remotive', lambda countries: upstream['jobs'][-1:])
+        runner = _scheduler(tmp_path, clock, {'remotive': dict(SCHEDULE['remotive'], quota=24)})
+        clock.now += STARTUP_SPREAD_SECONDS
+        assert runner.run_due() == {'remotive': 'ok'}
+
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'unchanged'}
+        assert len(extracts) == 1
+
+        upstream['jobs'].append(raw_job(3))
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'ok'}
+        assert len(extracts) == 2 and Job.query.count() == 3
+
+    def test_failed_probe_falls_back_to_the_extract(self, app, tmp_path, clock, upstream, monkeypatch):
+        monkeypatch.setitem(scheduler.PROBES, 'remotive', lambda countries: 1 / 0)
+        runner = _scheduler(tmp_path, clock, {'remotive': dict(SCHEDULE['remotive'], quota=24)})
+        clock.now += STARTUP_SPREAD_SECONDS
+        assert runner.run_due() == {'remotive': 'ok'}
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'unchanged'}
+        assert runner.state['remotive']['probe'] is None
+
+    def test_quota_defers_until_oldest_run_ages_out(self, app, tmp_path, clock, upstream):
+        runner = _scheduler(tmp_path, clock, {'remotive': SCHEDULE['remotive']})
+        for _ in range(2):
+            clock.now += STARTUP_SPREAD_SECONDS + 2 * HOUR
+            runner.run_due()
+        first = runner.state['remotive']['runs'][0]
+
+        clock.now += 2 * HOUR
+        assert runner.run_due() == {'remotive': 'quota'}
+        assert runner.state['remotive']['next_run_at'] == first + 24 * HOUR
+
+    def test_failed_extract_keeps_fingerprint(self, app, tmp_path, clock, upstream, monkeypatch):
+        runner = _scheduler(tmp_path, clock, {'remotive': SCHEDULE['remotive']})
+        monkeypatch.setattr(scheduler, 'extract', lambda *args, **kwargs: 1 / 0)
+        clock.now += STARTUP_SPREAD_SECONDS
+        assert runner.run_due() == {'remotive': 'failed'}
+        assert 'fingerprint' not in runner.state['remotive']
+
+    def test_state_survives_restart(self, app, tmp_path, clock, upstream):
+        runner = _scheduler(tmp_path, clock)
+        clock.now += STARTUP_SPREAD_SECONDS
+        runner.run_due()
+
+        restarted = _scheduler(tmp_path, clock)
+        assert restarted.state == runner.state
+        assert restarted.due() == []
+
+    def test_one_lock_holder_per_host(self, tmp_path):
+        root = str(tmp_path / 'scheduler')
+        held = acquire_lock(root)
+        assert held is not None
+        assert acquire_lock(root) is None
+        held.close()
+        reacquired = acquire_lock(root)
+        assert reacquired is not None
+        reacquired.close()
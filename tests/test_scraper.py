@@ -0,0 +1,169 @@
+"""
+tests/test_scraper.py
+
+Tests for the Careers24 card parser, run against a saved results page.
+Run with: python -m pytest tests/ -v
+"""
+import os
+import pytest
+from bs4 import BeautifulSoup
+from ingestion.extractors.careers24_parser import parse_cards, extract_card_fields
+from ingestion.extractors import scraper
+from ingestion.extractors.scraper import parse_careers24_page, scrape_careers24, probe_careers24, build_search_url
+from ingestion.ratelimit import HostRateLimiter
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'careers24_search.html')
+
+
+@pytest.fixture(scope='module')
+def page_html():
+    with open(FIXTURE, encoding='utf-8') as fh:
+        return fh.read()
+
+
+class TestParseCards:
+
+    def test_only_job_cards_are_built(self, page_html):
+        cards = parse_cards(page_html, parser='html.parser', limit=0)
+        assert len(cards) == 25
+        assert all('job-card' in card['class'] for card in cards)
+
+    def test_limit_caps_cards(self, page_html):
+        assert len(parse_cards(page_html, parser='html.parser', limit=5)) == 5
+
+    def test_falls_back_to_c24_cards(self):
+        html = '<nav><a href="/x">x</a></nav><article class="c24-job-card"><span class="job-card-title">IT Intern</span></article>'
+        cards = parse_cards(html, parser='html.parser')
+        assert [card.name for card in cards] == ['article']
+
+
+class TestExtractCardFields:
+
+    def _card(self, html):
+        return BeautifulSoup(html, 'html.parser').div
+
+    def test_extracts_every_field(self):
+        card = self._card(
+            '<div class="job-card"><a href="/jobs/adverts/junior-dev-123/"><h3>Junior Dev</h3></a>'
+            '<span class="job-card-company">Acme</span><span class="job-card-location">Durban</span>'
+            '<span class="job-card-date">2 days ago</span></div>'
+        )
+        fields = extract_card_fields(card)
+        assert fields['title'] == 'Junior Dev'
+        assert fields['company'] == 'Acme'
+        assert fields['location'] == 'Durban'
+        assert fields['date'] == '2 days ago'
+        assert fields['href'] == '/jobs/adverts/junior-dev-123/'
+        assert fields['closing'] is None
+
+    def test_h3_takes_precedence_over_title_span(self):
+        card = self._card('<div class="job-card"><span class="job-card-title">Span</span><h3>Heading</h3></div>')
+        assert extract_card_fields(card)['title'] == 'Heading'
+
+    def test_closing_date_text_is_found(self):
+        card = self._card('<div class="job-card"><p>Closing Date: 30 June 2099</p></div>')
+        assert extract_card_fields(card)['closing'] == 'Closing Date: 30 June 2099'
+
+
+class TestParseCareers24Page:
+
+    def test_filters_old_senior_and_expired_cards(self, page_html):
+        jobs = parse_careers24_page(page_html, set(), parser='html.parser')
+        titles = [job['title'] for job in jobs]
+        assert len(jobs) == 19
+        assert not any('Senior' in t or 'Lead' in t for t in titles)
+        assert jobs[0]['source_job_id'] == '2150000'
+        assert jobs[0]['company'] == 'Capitec'
+
+    def test_seen_ids_dedupe_across_pages(self, page_html):
+        seen = set()
+        parse_careers24_page(page_html, seen, parser='html.parser')
+        assert parse_careers24_page(page_html, seen, parser='html.parser') == []
+
+
+class TestParsePageStats:
+
+    def test_reports_cards_and_stale(self, page_html):
+        stats = {}
+        parse_careers24_page(page_html, set(), parser='html.parser', stats=stats)
+        assert stats == {'cards': 25, 'stale': 2}
+
+
+# ── Crawler ────────────────────────────────────────────────────────────────
+
+FRESH_PAGE = (
+    '<div class="job-card"><a href="/jobs/adverts/junior-dev-{id}/"><h3>Junior Dev {id}</h3></a>'
+    '<span class="job-card-date">Today</span></div>'
+)
+STALE_PAGE = (
+    '<div class="job-card"><a href="/jobs/adverts/junior-dev-{id}/"><h3>Junior Dev {id}</h3></a>'
+    '<span class="job-card-date">90 days ago</span></div>'
+)
+
+
+class TestScrapeCareers24:
+
+    def _serve(self, monkeypatch, pages):
+        requested = []
+
+        def fake_fetch(session, limiter, url):
+            requested.append(url)
+            return 200, pages.get(url, '')
+
+        monkeypatch.setattr(scraper, '_fetch_page', fake_fetch)
+        monkeypatch.setattr(scraper, 'MIN_REQUEST_INTERVAL', 0)
+        return requested
+
+    def test_pages_until_stale_or_empty(self, monkeypatch):
+        pages = {
+            build_search_url('data', 1): FRESH_PAGE.format(id=1),
+            build_search_url('data', 2): FRESH_PAGE.format(id=2) + STALE_PAGE.format(id=3),
+            build_search_url('data', 3): FRESH_PAGE.format(id=4),
+            build_search_url('intern', 1): FRESH_PAGE.format(id=5),
+        }
+        requested = self._serve(monkeypatch, pages)
+
+        jobs = scrape_careers24(keywords=['data', 'intern'], max_pages=5)
+
+        assert sorted(j['source_job_id'] for j in jobs) == ['1', '2', '5']
+        assert build_search_url('data', 3) not in requested      # stopped after stale page
+        assert build_search_url('intern', 2) in requested        # empty page ends 'intern'
+        assert build_search_url('intern', 3) not in requested
+
+    def test_dedupes_across_keywords(self, monkeypatch):
+        pages = {
+            build_search_url('data', 1): FRESH_PAGE.format(id=7),
+            build_search_url('graduate', 1): FRESH_PAGE.format(id=7),
+        }
+        self._serve(monkeypatch, pages)
+        jobs = scrape_careers24(keywords=['data', 'graduate'], max_pages=1)
+        assert [j['source_job_id'] for j in jobs] == ['7']
+
+    def test_probe_reads_first_pages_only(self, monkeypatch):
+        pages = {
+            build_search_url('data', 1): FRESH_PAGE.format(id=1),
+            build_search_url('data', 2): FRESH_PAGE.format(id=2),
+            build_search_url('intern', 1): FRESH_PAGE.format(id=3),
+        }
+        requested = self._serve(monkeypatch, pages)
+        jobs = probe_careers24(keywords=['data', 'intern'])
+        assert [j['source_job_id'] for j in jobs] == ['1', '3']
+        assert sorted(requested) == [build_search_url('data'), build_search_url('intern')]
+
+    def test_probe_raises_on_http_error(self, monkeypatch):
+        monkeypatch.setattr(scraper, '_fetch_page', lambda session, limiter, url: (503, ''))
+        with pytest.raises(RuntimeError):
+            probe_careers24(keywords=['data'])
+
+    def test_build_search_url(self):
+        assert build_search_url('data', 1).endswith('kw-data/?sort=dateposted')
+        assert build_search_url('data', 3).endswith('kw-data/?sort=dateposted&page=3')
+
+
+class TestHostRateLimiter:
+
+    def test_spaces_same_host_only(self):
+        limiter = HostRateLimiter(min_interval=0.05)
+        assert limiter.wait('https://a.example/1') == 0
+        assert limiter.wait('https://a.example/2') > 0
+        assert limiter.wait('https://b.example/1') == 0
@@ -0,0 +1,118 @@
+"""
+tests/test_similarity.py
+
+Tests for the precomputed similar-jobs index and its API endpoint.
+Run with: python -m pytest tests/ -v
+"""
+import os
+import numpy as np
+from app.models import db, Job
+from ingestion import similarity
+from ingestion.similarity import tokenize, hash_vector, build_similarity_index, similar_job_ids
+
+
+def _seed(app, make_job):
+    with app.app_context():
+        db.session.add_all([
+            make_job('py1', 'Junior Python Developer', description='<p>Django, REST APIs and PostgreSQL.</p>'),
+            make_job('py2', 'Graduate Python Developer', description='Flask and SQL, REST APIs.'),
+            make_job('acc', 'Junior Accountant', description='Reconciliations, payroll and Excel.'),
+            make_job('old', 'Python Developer Intern', description='Django.', is_active=False),
+        ])
+        db.session.commit()
+        return {job.source_job_id: job.id for job in Job.query.all()}
+
+
+class TestVectors:
+
+    def test_tokenize_weights_title(self):
+        counts = tokenize('Python Developer', '<b>Python</b> and the Django stack')
+        assert counts['python'] == similarity.TITLE_WEIGHT + 1
+        assert counts['python developer'] == similarity.TITLE_WEIGHT
+        assert 'the' not in counts and 'b' not in counts
+
+    def test_hashing_is_deterministic(self):
+        counts = tokenize('Data Analyst', 'SQL')
+        assert np.array_equal(hash_vector(counts, 64), hash_vector(counts, 64))
+        assert not hash_vector(tokenize('', ''), 64).any()
+
+
+class TestBuild:
+
+    def test_incremental_rebuild(self, app, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            assert build_similarity_index() == {'jobs': 3, 'hashed': 3, 'dropped': 0}
+            assert build_similarity_index() == {'jobs': 3, 'hashed': 0, 'dropped': 0}
+
+            db.session.get(Job, ids['acc']).is_active = False
+            db.session.add(make_job('py3', 'Python Engineer'))
+            db.session.commit()
+            assert build_similarity_index() == {'jobs': 3, 'hashed': 1, 'dropped': 1}
+
+    def test_ranks_related_titles_first(self, app, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+            hits = similar_job_ids(ids['py1'])
+        assert hits[0][0] == ids['py2']
+        assert ids['py1'] not in [hit_id for hit_id, _ in hits]
+
+    def test_unindexed_job_is_vectorized(self, app, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+            assert similar_job_ids(ids['old'])[0][0] in (ids['py1'], ids['py2'])
+            assert similar_job_ids('missing') is None
+
+    def test_reader_picks_up_new_builds(self, app, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+            first = similarity.get_index()
+            db.session.add(make_job('py3', 'Python Engineer'))
+            db.session.commit()
+            build_similarity_index()
+            second = similarity.get_index()
+        assert second is not first
+        assert len(second.ids) == 4 and ids['py1'] in second.position
+
+    def test_previous_vectors_survive_one_build(self, app, make_job, similarity_dir):
+        _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+            first = similarity.get_index()
+            build_similarity_index()
+            build_similarity_index()
+        vectors = sorted(name for name in os.listdir(similarity_dir) if name.startswith('vectors-'))
+        assert len(vectors) == similarity.SIMILARITY_KEEP
+        assert f'vectors-{first.build_id}.npy' not in vectors
+
+
+class TestSimilarAPI:
+
+    def test_response(self, app, client, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+        data = client.get(f"/api/jobs/{ids['py1']}/similar?limit=1").get_json()
+        assert data['count'] == 1
+        assert data['similar'][0]['id'] == ids['py2']
+        assert 0 < data['similar'][0]['score'] <= 1
+
+    def test_jobs_deactivated_since_the_build_are_left_out(self, app, client, make_job):
+        ids = _seed(app, make_job)
+        with app.app_context():
+            build_similarity_index()
+            db.session.get(Job, ids['py2']).is_active = False
+            db.session.commit()
+        similar = client.get(f"/api/jobs/{ids['py1']}/similar").get_json()['similar']
+        assert ids['py2'] not in [job['id'] for job in similar]
+
+    def test_no_index_and_unknown_job(self, app, client, make_job):
+        ids = _seed(app, make_job)
+        assert client.get(f"/api/jobs/{ids['py1']}/similar").get_json()['similar'] == []
+        assert client.get('/api/jobs/missing/similar').status_code == 404
+        with app.app_context():
+            build_similarity_index()
+        assert client.get('/api/jobs/missing/similar').status_code == 404
@@ -0,0 +1,85 @@
+"""
+tests/test_skills.py
+
+Tests for ingest-time skill tagging and the skill-backed API filters.
+Run with: python -m pytest tests/ -v
+"""
+from app.models import db, JobSkill
+from ingestion import skills
+from ingestion.skills import SkillMatcher, DEFAULT_SKILL_DICTIONARY, tag_job_skills
+
+
+class TestSkillMatcher:
+
+    matcher = SkillMatcher(DEFAULT_SKILL_DICTIONARY)
+
+    def test_aliases_map_to_canonical_skill(self):
+        assert self.matcher.extract('Junior BI Analyst', 'Dashboards in PowerBI and T-SQL') == {'power bi', 'sql'}
+
+    def test_word_boundaries(self):
+        assert self.matcher.extract('JavaScript Developer') == {'javascript'}
+        assert self.matcher.extract('Digital marketing intern') == set()
+
+    def test_symbols_in_skill_names(self):
+        assert self.matcher.extract('Graduate C# / ASP.NET Developer') == {'c#', '.net'}
+
+    def test_html_is_ignored(self):
+        assert self.matcher.extract('Intern', '<p class="python">Learn <b>Docker</b></p>') == {'docker'}
+
+    def test_canonical_lookup(self):
+        assert self.matcher.canonical('PowerBI') == 'power bi'
+        assert self.matcher.canonical('cobol') is None
+
+
+class TestTagJobSkills:
+
+    def test_tags_description_mentions(self, app, make_job):
+        db.session.add(make_job('1', 'Graduate Developer', description='You will write Python and SQL.'))
+        db.session.commit()
+
+        assert tag_job_skills() == 1
+        assert {s.skill for s in JobSkill.query.all()} == {'python', 'sql'}
+        assert tag_job_skills() == 0      # already tagged at this version
+
+    def test_dictionary_change_retags(self, app, make_job, monkeypatch):
+        db.session.add(make_job('1', 'Junior Rust Developer'))
+        db.session.commit()
+        tag_job_skills()
+        assert JobSkill.query.count() == 0
+
+        monkeypatch.setattr(skills, '_matcher', SkillMatcher({'rust': ['rust']}))
+        assert tag_job_skills() == 1
+        assert [s.skill for s in JobSkill.query.all()] == ['rust']
+
+
+class TestSkillEndpoints:
+
+    def _seed(self, make_job):
+        db.session.add_all([
+            make_job('1', 'Junior Python Developer', description='SQL and Docker'),
+            make_job('2', 'Data Analyst Intern', description='Power BI and SQL'),
+            make_job('3', 'Graduate Java Developer'),
+        ])
+        db.session.commit()
+        tag_job_skills()
+
+    def test_filter_jobs_by_skill_alias(self, client, make_job):
+        self._seed(make_job)
+        data = client.get('/api/jobs?skill=powerbi').get_json()
+        assert [job['title'] for job in data['jobs']] == ['Data Analyst Intern']
+        assert client.get('/api/jobs?skill=sql').get_json()['count'] == 2
+
+    def test_skill_counts_and_cooccurrence(self, client, make_job):
+        self._seed(make_job)
+        counts = {s['skill']: s['count'] for s in client.get('/api/skills').get_json()['skills']}
+        assert counts['sql'] == 2
+        assert counts['java'] == 1
+
+        with_sql = {s['skill']: s['count'] for s in client.get('/api/skills?with=SQL').get_json()['skills']}
+        assert with_sql == {'python': 1, 'docker': 1, 'power bi': 1}
+
+    def test_stats_page_renders_skill_chart(self, client, make_job):
+        self._seed(make_job)
+        response = client.get('/stats')
+        assert response.status_code == 200
+        assert b'Power BI' in response.data
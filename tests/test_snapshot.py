@@ -0,0 +1,134 @@
+"""
+tests/test_snapshot.py
+
+Tests for the published read snapshot and the routes served from it.
+Run with: python -m pytest tests/ -v
+"""
+import os
+import threading
+from app.models import db, Job, JobSkill
+from ingestion import snapshot
+from ingestion.locks import build_lock
+from ingestion.snapshot import build_snapshot, get_snapshot
+
+
+def _seed(make_job):
+    db.session.add_all([
+        make_job('py1', 'Junior Python Developer'),
+        make_job('py2', 'Graduate Data Analyst', source='adzuna_sa', days_ago=2),
+        make_job('rem', 'Python Data Engineer', source='remotive', days_ago=3),
+        make_job('old', 'Python Developer Intern', is_active=False, days_ago=170),
+    ])
+    db.session.commit()
+    db.session.add(JobSkill(job_id=Job.query.filter_by(source_job_id='py1').one().id, skill='python'))
+    db.session.add(JobSkill(job_id=Job.query.filter_by(source_job_id='old').one().id, skill='python'))
+    db.session.commit()
+
+
+def _titles(client, url):
+    return sorted(job['title'] for job in client.get(url).get_json()['jobs'])
+
+
+class TestBuild:
+
+    def test_copies_active_rows_only(self, app, make_job, snapshot_dir):
+        _seed(make_job)
+        stats = build_snapshot()
+        assert stats['generation'] == 1
+        assert (stats['jobs'], stats['job_skills']) == (3, 1)
+
+        current = get_snapshot()
+        assert current.generation == 1
+        assert current.has_fts
+        assert current.stats['totals']['total_jobs_scraped'] == 4
+        assert current.meta['rows']['jobs'] == 3
+
+    def test_generations_are_pruned(self, app, make_job, snapshot_dir):
+        _seed(make_job)
+        for _ in range(3):
+            build_snapshot()
+        assert sorted(name for name in os.listdir(snapshot_dir) if name.endswith('.db')) == [
+            'jobs-2.db', 'jobs-3.db',
+        ]
+        assert get_snapshot().generation == 3
+
+    def test_overlapping_builds_take_turns(self, app, make_job, snapshot_dir):
+        _seed(make_job)
+        other_build = os.path.join(snapshot_dir, 'jobs-1.db.0123abcd.tmp')
+        generations = []
+
+        def publish():
+            with app.app_context():
+                generations.append(build_snapshot()['generation'])
+
+        with build_lock(snapshot_dir):      # another builder is mid-publish
+            with open(other_build, 'w') as fh:
+                fh.write('in progress')
+            runner = threading.Thread(target=publish)
+            runner.start()
+            runner.join(0.3)
+            assert runner.is_alive()
+        runner.join(10)
+        publish()
+
+        assert generations == [1, 2]
+        assert os.path.exists(other_build)       # not this build's file to prune
+
+    def test_no_snapshot_until_published(self, app):
+        assert get_snapshot() is None
+
+
+class TestServing:
+
+    def test_reads_come_from_the_snapshot(self, app, client, make_job, assert_max_queries):
+        _seed(make_job)
+        build_snapshot()
+        db.session.add(make_job('new', 'Junior Python Tester'))
+        db.session.commit()
+
+        # Published rows only, and nothing hits the primary database
+        response = assert_max_queries('/api/jobs?type=python', 0)
+        assert [job['title'] for job in response.get_json()['jobs']] == [
+            'Junior Python Developer', 'Python Data Engineer',
+        ]
+        assert assert_max_queries('/', 0).status_code == 200
+        assert assert_max_queries('/stats', 0).status_code == 200
+
+        app.config['READ_SNAPSHOT'] = False
+        assert 'Junior Python Tester' in _titles(client, '/api/jobs?type=python')
+
+    def test_new_generation_is_picked_up(self, app, client, make_job):
+        _seed(make_job)
+        build_snapshot()
+        assert 'Junior Python Tester' not in _titles(client, '/api/jobs')
+        db.session.add(make_job('new', 'Junior Python Tester'))
+        db.session.commit()
+        build_snapshot()
+        assert 'Junior Python Tester' in _titles(client, '/api/jobs')
+
+    def test_matches_primary_database(self, app, client, make_job):
+        _seed(make_job)
+        build_snapshot()
+        urls = ['/api/jobs?type=ytho', '/api/jobs?type=DATA', '/api/jobs?type=py&skill=python',
+                '/api/skills', '/api/locations']
+        served = {url: client.get(url).get_json() for url in urls}
+        stats = client.get('/api/stats').get_json()
+        home = client.get('/?q=python').data
+
+        app.config['READ_SNAPSHOT'] = False
+        for url in urls:
+            assert client.get(url).get_json() == served[url], url
+        primary_stats = client.get('/api/stats').get_json()
+        assert {**stats, 'generated_at': None} == {**primary_stats, 'generated_at': None}
+        assert client.get('/?q=python').data == home
+
+    def test_stale_board_counts_are_recomputed(self, app, client, make_job, monkeypatch):
+        _seed(make_job)
+        build_snapshot()
+        current = get_snapshot()
+        key = next(key for key in current.stats if key.startswith('categories:sa:'))
+        current.stats[key.replace(key.rsplit(':', 1)[1], '2000-01-01')] = current.stats.pop(key)
+        monkeypatch.setattr(snapshot, 'get_snapshot', lambda root=None: current)
+
+        # No stats for today's cutoff: counted live against the snapshot
+        assert b'Junior Python Developer' in client.get('/').data